@@ -0,0 +1,154 @@
+# app/core/adaptive_limit.py
+
+"""
+외부 호출(YouTube / Gemini) 동시 실행 수를 상황에 맞게 조절하는 제한기 (AIMD)
+
+- 응답이 목표 시간 안에 성공적으로 오면 한도를 천천히 늘리고 (+1 / 현재 한도)
+- 느려지거나 실패하면 한도를 크게 줄입니다. (x decrease_factor)
+- 한도가 꽉 차면 잠깐(queue_timeout) 줄을 서고, 줄이 너무 길거나 그 안에
+  자리가 안 나면 ServerBusyException으로 바로 거절합니다. (무한 대기 방지)
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.core.exceptions import ServerBusyException
+from app.core.metrics import span, upstream_limit, upstream_queued, upstream_rejected
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        name: str,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        queue_timeout: float,
+        max_queue: int,
+        decrease_factor: float = 0.7,
+        ignore_errors: tuple = (),
+    ):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_target = latency_target
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.decrease_factor = decrease_factor
+        # 업스트림 장애가 아닌 "정상적인 실패" (예: 자막 없음)는 성공으로 취급
+        self.ignore_errors = ignore_errors
+
+        # 처음에는 최대치로 시작해서 문제가 생길 때만 줄임
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        # 최근 응답 시간 이동 평균 (Retry-After 안내용)
+        self.latency_ewma = 0.0
+
+        self.rejected = 0
+        self.decreases = 0
+        self._publish()
+
+    def _publish(self) -> None:
+        upstream_limit.set(int(self.limit), upstream=self.name)
+        upstream_queued.set(len(self._waiters), upstream=self.name)
+
+    # ---------------------------------------------------------
+    # 자리 얻기 / 반납
+    # ---------------------------------------------------------
+    def _busy(self) -> ServerBusyException:
+        self.rejected += 1
+        upstream_rejected.inc(upstream=self.name)
+        return ServerBusyException(retry_after=max(1, math.ceil(self.latency_ewma)), upstream=self.name)
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+        self._publish()
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise self._busy()
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._publish()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # 자리를 받은 바로 그 순간에 시간 초과/취소가 겹친 경우
+                if isinstance(e, asyncio.TimeoutError):
+                    return
+                self.release()
+                raise
+            future.cancel()
+            if future in self._waiters:
+                self._waiters.remove(future)
+            self._publish()
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._busy()
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    # ---------------------------------------------------------
+    # 결과에 따라 한도 조절
+    # ---------------------------------------------------------
+    def record(self, latency: float, ok: bool) -> None:
+        self.latency_ewma = latency if self.latency_ewma == 0 else self.latency_ewma * 0.8 + latency * 0.2
+        if ok and latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._wake_waiters()
+        else:
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            self.decreases += 1
+        self._publish()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        async with limiter.slot():
+            await 외부_호출()
+        """
+        with span(f"{self.name}_queue"):
+            await self.acquire()
+        started = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except asyncio.CancelledError:
+            # 클라이언트가 끊은 것은 업스트림 상태와 무관
+            ok = None
+            raise
+        except self.ignore_errors:
+            raise
+        except Exception:
+            ok = False
+            raise
+        finally:
+            if ok is not None:
+                self.record(time.perf_counter() - started, ok)
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "inFlight": self.in_flight,
+            "queued": len(self._waiters),
+            "latencyEwma": round(self.latency_ewma, 3),
+            "rejected": self.rejected,
+            "decreases": self.decreases,
+        }
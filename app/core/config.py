@@ -7,6 +7,264 @@ load_dotenv()
 class Settings(BaseSettings):
     youtube_api_key: str = os.getenv("YOUTUBE_API_KEY", "")
     gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
+
+    # =========================================================
+    # Gemini 모델 설정
+    # =========================================================
+    gemini_model_name: str = os.getenv("GEMINI_MODEL_NAME", "gemini-2.5-flash")
+    gemini_temperature: float = float(os.getenv("GEMINI_TEMPERATURE", "0.4"))
+    gemini_max_output_tokens: int = int(os.getenv("GEMINI_MAX_OUTPUT_TOKENS", "2048"))
+    # JSON으로만 답하도록 강제 (마크다운 코드 블록 방지)
+    gemini_response_mime_type: str = os.getenv("GEMINI_RESPONSE_MIME_TYPE", "application/json")
+    # 형식이 깨진 응답을 고쳐달라고 다시 보낼 때 최대 글자 수
+    gemini_repair_max_chars: int = int(os.getenv("GEMINI_REPAIR_MAX_CHARS", "6000"))
+    # 서버 시작 시 Gemini 연결을 미리 열어둘지 여부
+    gemini_warmup: bool = os.getenv("GEMINI_WARMUP", "true").lower() == "true"
+
+    # =========================================================
+    # Gemini 호출 제어 (워커 1개 기준)
+    # =========================================================
+    # 동시에 날릴 수 있는 Gemini 요청 수 (초과분은 대기)
+    gemini_max_concurrency: int = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+    # Gemini 응답 1회당 최대 대기 시간 (초)
+    gemini_timeout_seconds: float = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+    # 자막이 이 토큰 수(대략치)보다 길면 구간으로 나눠 동시에 분석
+    gemini_window_token_budget: int = int(os.getenv("GEMINI_WINDOW_TOKEN_BUDGET", "1500"))
+    # 구간 하나에서 뽑을 표현 수
+    gemini_expressions_per_window: int = int(os.getenv("GEMINI_EXPRESSIONS_PER_WINDOW", "3"))
+    # 긴 영상에서 최종적으로 돌려줄 최대 표현 수
+    gemini_max_expressions: int = int(os.getenv("GEMINI_MAX_EXPRESSIONS", "10"))
+
+    # =========================================================
+    # 뜻 언어 (targetLang)
+    # =========================================================
+    # 뜻을 만들어 줄 수 있는 언어 (쉼표 구분, 앞쪽이 기본값)
+    supported_target_langs: str = os.getenv("SUPPORTED_TARGET_LANGS", "ko,ja,vi")
+    # 요청 하나에 담을 수 있는 최대 언어 수 (targetLang="ko,ja,vi" -> 한 번의 생성으로 모두 만듦)
+    max_target_langs: int = int(os.getenv("MAX_TARGET_LANGS", "3"))
+    # 자막 원본 언어 (영어 학습 앱이므로 영어 자막만 분석)
+    transcript_source_lang: str = os.getenv("TRANSCRIPT_SOURCE_LANG", "en")
+
+    # =========================================================
+    # 분석 결과 캐시
+    # =========================================================
+    # 결과 유지 시간 (초, 기본 1일)
+    result_cache_ttl_seconds: float = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "86400"))
+    # 메모리(1단계)에 들고 있을 최대 영상 수
+    result_cache_max_entries: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024"))
+    # 영구 저장소 종류: "shared"(워커 공용 캐시) | "sqlite" | "file" | "memory"(영구 저장 안 함)
+    result_cache_backend: str = os.getenv("RESULT_CACHE_BACKEND", "shared")
+    # sqlite면 DB 파일 경로, file이면 디렉토리 경로 (shared는 SHARED_CACHE_PATH 사용)
+    result_cache_path: str = os.getenv("RESULT_CACHE_PATH", ".cache/result_cache.sqlite3")
+    # 서버 시작 시 영구 저장소에서 메모리로 미리 올릴 최근 결과 수 (0이면 안 함)
+    result_cache_preload_entries: int = int(os.getenv("RESULT_CACHE_PRELOAD_ENTRIES", "256"))
+
+    # =========================================================
+    # 자막 저장소 (YouTube 재요청 방지)
+    # =========================================================
+    # 받아온 자막 유지 시간 (초, 기본 7일)
+    transcript_cache_ttl_seconds: float = float(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", "604800"))
+    # "자막 없음/꺼짐" 결과 유지 시간 (초, 기본 1시간 - 나중에 자막이 생길 수 있음)
+    transcript_negative_ttl_seconds: float = float(os.getenv("TRANSCRIPT_NEGATIVE_TTL_SECONDS", "3600"))
+    # 메모리에 들고 있을 최대 영상 수
+    transcript_cache_max_entries: int = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "4096"))
+    # 받아온 자막을 워커 공용 캐시에도 저장 (다른 워커가 같은 영상 자막을 다시 받지 않도록)
+    transcript_cache_shared: bool = os.getenv("TRANSCRIPT_CACHE_SHARED", "true").lower() == "true"
+
+    # =========================================================
+    # 워커 공용 캐시 (같은 서버의 모든 워커가 함께 쓰는 SQLite WAL 파일)
+    # =========================================================
+    shared_cache_path: str = os.getenv("SHARED_CACHE_PATH", ".cache/shared_cache.sqlite3")
+    # 전체 크기 제한 (바이트, 기본 512MB) - 넘으면 오래 안 읽은 항목부터 제거
+    shared_cache_max_bytes: int = int(os.getenv("SHARED_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    # 만료된 항목을 장애 대체용으로 더 남겨두는 시간 (초, 기본 7일) - 지나면 정리 때 삭제
+    shared_cache_stale_seconds: float = float(os.getenv("SHARED_CACHE_STALE_SECONDS", "604800"))
+    # 읽은 시각(LRU 순서) 갱신 간격 (초) - 읽을 때마다 쓰지 않도록
+    shared_cache_touch_seconds: float = float(os.getenv("SHARED_CACHE_TOUCH_SECONDS", "60"))
+    # 워커 하나가 이만큼 쓸 때마다 정리 실행 (0이면 자동 정리 안 함)
+    shared_cache_compact_every: int = int(os.getenv("SHARED_CACHE_COMPACT_EVERY", "500"))
+    # SQLite 메모리 매핑 크기 (바이트, 기본 256MB) - 워커들이 OS 페이지 캐시를 함께 읽음
+    shared_cache_mmap_bytes: int = int(os.getenv("SHARED_CACHE_MMAP_BYTES", str(256 * 1024 * 1024)))
+    # 같은 프롬프트의 Gemini 응답 재사용 (모델 이름 + 프롬프트 + 응답 스키마가 같을 때만)
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    llm_cache_ttl_seconds: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", "604800"))
+
+    # =========================================================
+    # 자막 전처리 (Gemini에 보내기 전 로컬에서 다듬기)
+    # =========================================================
+    prefilter_enabled: bool = os.getenv("PREFILTER_ENABLED", "true").lower() == "true"
+    # 0보다 크면, 다듬은 뒤에도 이 토큰 수를 넘는 자막은 관용구 후보가 많은 문장만 남김
+    prefilter_max_tokens: int = int(os.getenv("PREFILTER_MAX_TOKENS", "0"))
+
+    # =========================================================
+    # 단어 카드 위치 찾기 (start/end/sentence) + 자막 조각 응답
+    # =========================================================
+    # 카드에 붙일 주변 문장의 최대 길이 (글자 수, 넘으면 표현 주변만 잘라냄)
+    anchor_sentence_max_chars: int = int(os.getenv("ANCHOR_SENTENCE_MAX_CHARS", "240"))
+    # includeTranscript 요청 시 각 카드 앞뒤로 함께 보낼 자막 구간 (초)
+    transcript_slice_padding_seconds: float = float(os.getenv("TRANSCRIPT_SLICE_PADDING_SECONDS", "5"))
+
+    # =========================================================
+    # 응답 압축 / HTTP 캐시 헤더
+    # =========================================================
+    # 본문이 이 크기(바이트) 이상이면 gzip/br로 압축 (작은 응답은 압축 이득보다 비용이 큼)
+    response_compress_min_bytes: int = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+    # 분석 결과 응답의 Cache-Control max-age 상한 (초, 결과 캐시의 남은 유효 시간과 둘 중 작은 값)
+    response_max_age_seconds: int = int(os.getenv("RESPONSE_MAX_AGE_SECONDS", "3600"))
+
+    # =========================================================
+    # 운영 실행 (python -m app.serve)
+    # =========================================================
+    serve_host: str = os.getenv("SERVE_HOST", "0.0.0.0")
+    serve_port: int = int(os.getenv("SERVE_PORT", "8000"))
+    # 워커 프로세스 수 (0이면 이 컨테이너/프로세스가 쓸 수 있는 CPU 코어 수)
+    serve_workers: int = int(os.getenv("SERVE_WORKERS", os.getenv("WEB_CONCURRENCY", "0")))
+    # 부모 프로세스에서 앱을 한 번만 import한 뒤 워커를 fork (false면 워커마다 따로 import)
+    serve_preload: bool = os.getenv("SERVE_PRELOAD", "true").lower() == "true"
+    # SIGTERM 후 진행 중인 요청/작업을 기다리는 최대 시간 (초, 넘으면 강제 종료)
+    serve_graceful_timeout_seconds: float = float(os.getenv("SERVE_GRACEFUL_TIMEOUT_SECONDS", "30"))
+    # 연결 대기열 크기 / keep-alive 유지 시간 (초)
+    serve_backlog: int = int(os.getenv("SERVE_BACKLOG", "2048"))
+    serve_keepalive_seconds: int = int(os.getenv("SERVE_KEEPALIVE_SECONDS", "5"))
+
+    # =========================================================
+    # 배치 분석 (/v1/video/analyze:batch)
+    # =========================================================
+    # 배치 요청 하나에서 동시에 받아올 자막 수
+    batch_transcript_fanout: int = int(os.getenv("BATCH_TRANSCRIPT_FANOUT", "5"))
+    # 여러 자막을 한 프롬프트에 묶을 때의 자막 토큰 상한 (대략치)
+    batch_prompt_token_budget: int = int(os.getenv("BATCH_PROMPT_TOKEN_BUDGET", "4000"))
+
+    # =========================================================
+    # 작업(Job) 모드 (/v1/video/jobs)
+    # =========================================================
+    # 작업 큐 SQLite 파일 경로 (여러 워커 프로세스가 함께 사용 가능)
+    job_queue_path: str = os.getenv("JOB_QUEUE_PATH", ".cache/jobs.sqlite3")
+    # API 서버 안에서 작업 워커를 돌릴지 여부 (별도 워커 프로세스만 쓸 때는 false)
+    job_workers_enabled: bool = os.getenv("JOB_WORKERS_ENABLED", "true").lower() == "true"
+    # 프로세스당 동시에 처리할 작업 수
+    job_worker_concurrency: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+    # 최대 시도 횟수 (첫 시도 포함)
+    job_max_attempts: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    # 재시도 대기 시간의 기준값 (초, 시도마다 2배)
+    job_retry_base_seconds: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2"))
+    # 큐가 비어 있을 때 다시 확인하는 주기 (초)
+    job_poll_interval_seconds: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "0.5"))
+    # RUNNING 상태로 이 시간(초) 이상 멈춘 작업은 죽은 것으로 보고 다시 대기열로
+    job_lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+    # 웹훅(callbackUrl) 전송 제한 시간 (초)
+    job_webhook_timeout_seconds: float = float(os.getenv("JOB_WEBHOOK_TIMEOUT_SECONDS", "10"))
+    # callbackUrl로 허용할 호스트 (쉼표 구분, ".example.com"은 하위 도메인 전체)
+    # 비어 있으면 공인 IP로만 연결되는 https 주소는 모두 허용, 목록의 호스트는 내부망 주소여도 허용
+    job_callback_allowed_hosts: str = os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "")
+
+    # =========================================================
+    # 표현 색인 (예전 분석 결과로 아는 표현은 Gemini에 다시 묻지 않음)
+    # =========================================================
+    expression_index_enabled: bool = os.getenv("EXPRESSION_INDEX_ENABLED", "true").lower() == "true"
+    expression_index_path: str = os.getenv("EXPRESSION_INDEX_PATH", ".cache/expression_index.sqlite3")
+    # 색인에 넣고 찾는 표현의 최대 단어 수
+    expression_index_max_ngram: int = int(os.getenv("EXPRESSION_INDEX_MAX_NGRAM", "6"))
+    # 다른 문맥의 뜻을 빌려 쓰려면: 최소 등장 횟수 / 가장 흔한 뜻이 차지해야 하는 비율
+    expression_index_min_hits: int = int(os.getenv("EXPRESSION_INDEX_MIN_HITS", "2"))
+    expression_index_agreement: float = float(os.getenv("EXPRESSION_INDEX_AGREEMENT", "0.8"))
+
+    # =========================================================
+    # 캐시 미리 채우기 (인기 영상 사전 분석, python -m app.services.cache_warmer)
+    # =========================================================
+    # 동시에 분석할 영상 수
+    warm_concurrency: int = int(os.getenv("WARM_CONCURRENCY", "4"))
+    # 남은 유효 시간이 이보다 길면 "신선함"으로 보고 건너뜀 (초, 기본 6시간)
+    warm_min_ttl_seconds: float = float(os.getenv("WARM_MIN_TTL_SECONDS", "21600"))
+    # 진행 상황 파일 (중간에 멈춰도 이어서 실행) / 요약 보고서 경로
+    warm_state_path: str = os.getenv("WARM_STATE_PATH", ".cache/warm/state.json")
+    warm_report_path: str = os.getenv("WARM_REPORT_PATH", ".cache/warm/report.json")
+
+    # =========================================================
+    # 요청 제한 (Token Bucket, 워커 1개 기준)
+    # =========================================================
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    # 사용자(IP)별: 초당 허용 요청 수 / 한 번에 몰아 쓸 수 있는 최대치
+    # (배치 요청은 영상 수만큼 차감 -> 최대치는 배치 최대 영상 수(MAX_BATCH_ITEMS=20) 이상으로)
+    rate_limit_client_rps: float = float(os.getenv("RATE_LIMIT_CLIENT_RPS", "1"))
+    rate_limit_client_burst: float = float(os.getenv("RATE_LIMIT_CLIENT_BURST", "20"))
+    # 서버 전체: 초당 허용 요청 수 / 최대치
+    rate_limit_global_rps: float = float(os.getenv("RATE_LIMIT_GLOBAL_RPS", "50"))
+    rate_limit_global_burst: float = float(os.getenv("RATE_LIMIT_GLOBAL_BURST", "100"))
+    # 기억할 최대 사용자 수 (오래 안 온 사용자부터 잊음)
+    rate_limit_max_clients: int = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+    # 프록시(ngrok, 로드밸런서) 뒤라면 X-Forwarded-For의 첫 IP를 사용자로 봄
+    rate_limit_trust_forwarded: bool = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+
+    # =========================================================
+    # 외부 호출 동시 실행 수 자동 조절 (응답이 느려지거나 실패하면 줄임)
+    # =========================================================
+    # Gemini 최소 동시 호출 수 (최대치는 GEMINI_MAX_CONCURRENCY)
+    gemini_min_concurrency: int = int(os.getenv("GEMINI_MIN_CONCURRENCY", "1"))
+    # 이 시간(초)보다 느린 Gemini 응답은 "과부하 신호"로 봄
+    gemini_latency_target_seconds: float = float(os.getenv("GEMINI_LATENCY_TARGET_SECONDS", "15"))
+    # YouTube 자막 동시 다운로드 수 (전용 스레드 풀 크기 안에서 자동 조절)
+    youtube_min_concurrency: int = int(os.getenv("YOUTUBE_MIN_CONCURRENCY", "2"))
+    youtube_max_concurrency: int = int(os.getenv("YOUTUBE_MAX_CONCURRENCY", "32"))
+    youtube_latency_target_seconds: float = float(os.getenv("YOUTUBE_LATENCY_TARGET_SECONDS", "5"))
+    # 자리가 없을 때 기다릴 최대 시간(초)과 최대 대기 수 -> 넘으면 바로 503
+    upstream_queue_timeout_seconds: float = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT_SECONDS", "5"))
+    upstream_max_queue: int = int(os.getenv("UPSTREAM_MAX_QUEUE", "64"))
+
+    # =========================================================
+    # 외부 호출 안정화 (마감 시간 / 재시도 / 헤징 / 서킷 브레이커)
+    # =========================================================
+    # 분석 요청 하나의 전체 마감 시간 (초). 단계별 시간 제한은 이 안에서 나눠 씀
+    request_deadline_seconds: float = float(os.getenv("REQUEST_DEADLINE_SECONDS", "25"))
+    # 자막 다운로드 1회 최대 시간(초)과, 남은 시간 중 자막 단계가 쓸 수 있는 비율 (나머지는 Gemini 몫)
+    youtube_timeout_seconds: float = float(os.getenv("YOUTUBE_TIMEOUT_SECONDS", "8"))
+    youtube_budget_share: float = float(os.getenv("YOUTUBE_BUDGET_SHARE", "0.4"))
+    # 일시적 오류 시 최대 시도 횟수 (첫 시도 포함)
+    youtube_max_attempts: int = int(os.getenv("YOUTUBE_MAX_ATTEMPTS", "3"))
+    gemini_max_attempts: int = int(os.getenv("GEMINI_MAX_ATTEMPTS", "2"))
+    # 재시도 대기 시간: 0 ~ min(최대치, 기준값 * 2^(n-1)) 사이 무작위
+    upstream_retry_base_seconds: float = float(os.getenv("UPSTREAM_RETRY_BASE_SECONDS", "0.2"))
+    upstream_retry_max_seconds: float = float(os.getenv("UPSTREAM_RETRY_MAX_SECONDS", "2"))
+    # Gemini 응답이 최근 p95보다 늦으면 같은 요청을 하나 더 보낼지 (쿼터를 더 쓰므로 기본 꺼짐)
+    gemini_hedge_enabled: bool = os.getenv("GEMINI_HEDGE_ENABLED", "false").lower() == "true"
+    # p95를 믿을 수 있을 만큼 쌓인 뒤에만 헤징
+    gemini_hedge_min_samples: int = int(os.getenv("GEMINI_HEDGE_MIN_SAMPLES", "20"))
+    # 연속 실패 몇 번이면 호출을 멈출지 / 몇 초 뒤에 시험 호출을 해볼지
+    circuit_failure_threshold: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    circuit_reset_seconds: float = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+    # =========================================================
+    # YouTube 자막 다운로드 연결 설정
+    # =========================================================
+    # 자막 다운로드 전용 스레드 수 (기본 스레드 풀과 분리, 0이면 YOUTUBE_MAX_CONCURRENCY)
+    youtube_fetch_threads: int = int(os.getenv("YOUTUBE_FETCH_THREADS", "0"))
+    # 스레드별로 유지하는 연결 수 (호스트당 keep-alive 연결)
+    youtube_pool_maxsize: int = int(os.getenv("YOUTUBE_POOL_MAXSIZE", "4"))
+    # 요청마다 돌아가며 쓸 프록시 목록 (쉼표 구분, 예: http://user:pw@host1:8080,http://host2:8080)
+    youtube_proxy_urls: str = os.getenv("YOUTUBE_PROXY_URLS", "")
+
+    # =========================================================
+    # 외부 호출 백엔드 선택 (부하 테스트 / 오프라인 개발용 스텁)
+    # =========================================================
+    # 텍스트 생성 엔진: "gemini" | "stub"
+    llm_backend: str = os.getenv("LLM_BACKEND", "gemini")
+    # 자막 제공자: "youtube" | "stub"
+    transcript_provider: str = os.getenv("TRANSCRIPT_PROVIDER", "youtube")
+    # 스텁 난수 시드 (같은 시드면 지연/에러 순서가 항상 같음)
+    stub_seed: int = int(os.getenv("STUB_SEED", "42"))
+    # 스텁 LLM 지연: 중앙값(ms) * 로그정규 흔들림(sigma) + 입력 토큰당 지연(ms)
+    stub_llm_latency_ms: float = float(os.getenv("STUB_LLM_LATENCY_MS", "800"))
+    stub_llm_latency_sigma: float = float(os.getenv("STUB_LLM_LATENCY_SIGMA", "0.0"))
+    stub_llm_per_token_ms: float = float(os.getenv("STUB_LLM_PER_TOKEN_MS", "0.0"))
+    # 스텁 LLM 호출이 실패할 확률 (0~1)
+    stub_llm_error_rate: float = float(os.getenv("STUB_LLM_ERROR_RATE", "0.0"))
+    # 미리 준비한 응답 JSON 파일 (문자열/배열 목록, 비우면 프롬프트에서 결정적으로 생성)
+    stub_llm_responses_path: str = os.getenv("STUB_LLM_RESPONSES_PATH", "")
+    # 스텁 자막 지연(ms, 중앙값) / 흔들림 / 실패 확률 / 조각 수
+    stub_transcript_latency_ms: float = float(os.getenv("STUB_TRANSCRIPT_LATENCY_MS", "100"))
+    stub_transcript_latency_sigma: float = float(os.getenv("STUB_TRANSCRIPT_LATENCY_SIGMA", "0.0"))
+    stub_transcript_error_rate: float = float(os.getenv("STUB_TRANSCRIPT_ERROR_RATE", "0.0"))
+    stub_transcript_snippets: int = int(os.getenv("STUB_TRANSCRIPT_SNIPPETS", "40"))
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,55 @@
+# app/core/deadline.py
+
+"""
+요청 하나의 전체 마감 시간(Deadline Budget)
+
+- 라우터에서 deadline_scope(25)로 감싸면, 그 안에서 실행되는 모든 단계
+  (자막 다운로드, Gemini 호출, 재시도 대기)가 남은 시간만큼만 기다립니다.
+- 단계마다 자기 최대 시간(cap)과 남은 시간 중 작은 값을 쓰고,
+  share를 주면 남은 시간의 일부만 쓰고 나머지는 다음 단계에 남겨둡니다.
+- 마감 시간이 없는 곳(작업 워커 등)에서는 각 단계의 cap만 적용됩니다.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from app.core.exceptions import DeadlineExceededException
+
+# 현재 요청의 마감 시각 (time.monotonic 기준). 없으면 None
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[None]:
+    """지금부터 seconds초 뒤를 마감 시각으로 설정 (이미 더 이른 마감이 있으면 그쪽을 유지)"""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """남은 시간 (초). 마감 시간이 없으면 None"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def stage_timeout(cap: float, share: float = 1.0) -> float:
+    """
+    이번 단계에 쓸 수 있는 시간 = min(cap, 남은 시간 * share)
+    이미 마감 시간이 지났으면 DeadlineExceededException
+    """
+    left = remaining()
+    if left is None:
+        return cap
+    if left <= 0:
+        raise DeadlineExceededException()
+    return min(cap, left * share)
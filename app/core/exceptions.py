@@ -70,4 +70,82 @@ class InvalidLinkException(BusinessException):
         super().__init__(
             code="INVALID_LINK",
             message="유효하지 않은 유튜브 링크입니다. URL을 확인해주세요."
-        )
\ No newline at end of file
+        )
+
+#7. AI 응답이 제한 시간 안에 오지 않을 때
+class AITimeoutException(BusinessException):
+    def __init__(self):
+        super().__init__(
+            code="AI_TIMEOUT",
+            message="AI 분석이 지연되고 있습니다. 잠시 후 다시 시도해주세요.",
+            status_code=504
+        )
+
+#8. 분석 도중 클라이언트(앱)가 연결을 끊었을 때
+class ClientDisconnectedException(BusinessException):
+    def __init__(self):
+        super().__init__(
+            code="CLIENT_CLOSED",
+            message="클라이언트가 요청을 취소했습니다.",
+            status_code=499
+        )
+
+#9. 한 사용자(IP) 또는 서버 전체의 요청 허용량을 넘었을 때
+class RateLimitedException(BusinessException):
+    def __init__(self, retry_after: float = 1):
+        # 몇 초 뒤에 다시 시도하면 되는지 (Retry-After 헤더)
+        self.retry_after = retry_after
+        super().__init__(
+            code="RATE_LIMITED",
+            message="요청이 너무 많습니다. 잠시 후 다시 시도해주세요.",
+            status_code=429
+        )
+
+#10. YouTube/Gemini 호출이 밀려 있어 지금은 처리할 수 없을 때 (줄 서서 기다리지 않고 바로 거절)
+class ServerBusyException(BusinessException):
+    def __init__(self, retry_after: float = 1, upstream: str = ""):
+        self.retry_after = retry_after
+        self.upstream = upstream
+        super().__init__(
+            code="SERVER_BUSY",
+            message="지금은 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            status_code=503
+        )
+
+#11. 외부 서비스(YouTube/Gemini)가 연달아 실패해서 잠시 호출을 멈춘 상태일 때 (Circuit Breaker)
+class UpstreamUnavailableException(BusinessException):
+    def __init__(self, retry_after: float = 1, upstream: str = ""):
+        self.retry_after = retry_after
+        self.upstream = upstream
+        super().__init__(
+            code="UPSTREAM_UNAVAILABLE",
+            message="외부 서비스가 일시적으로 불안정합니다. 잠시 후 다시 시도해주세요.",
+            status_code=503
+        )
+
+#12. 요청 하나에 주어진 전체 처리 시간(마감 시간)을 다 썼을 때
+class DeadlineExceededException(BusinessException):
+    def __init__(self):
+        super().__init__(
+            code="DEADLINE_EXCEEDED",
+            message="분석 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.",
+            status_code=504
+        )
+
+#13. 지원하지 않는 targetLang (또는 한 번에 요청할 수 있는 언어 수 초과)
+class UnsupportedLanguageException(BusinessException):
+    def __init__(self, language: str = ""):
+        self.language = language
+        super().__init__(
+            code="UNSUPPORTED_LANGUAGE",
+            message=f"지원하지 않는 언어입니다: {language}" if language else "지원하지 않는 언어입니다."
+        )
+
+#14. 작업 완료 알림(callbackUrl)으로 쓸 수 없는 주소 (https가 아니거나 내부망/루프백 주소)
+class InvalidCallbackUrlException(BusinessException):
+    def __init__(self, reason: str = ""):
+        self.reason = reason
+        super().__init__(
+            code="INVALID_CALLBACK_URL",
+            message=f"사용할 수 없는 callbackUrl입니다: {reason}" if reason else "사용할 수 없는 callbackUrl입니다."
+        )
@@ -0,0 +1,56 @@
+# app/core/lifecycle.py
+
+"""
+서버(워커 프로세스) 생명주기 상태
+
+- /health : 프로세스가 살아 있는지만 확인 (항상 200, 로드밸런서 liveness용)
+- /ready  : 지금 요청을 받아도 되는지 (시작 작업이 끝났고 종료 중이 아님, 아니면 503)
+            + 캐시/외부 연결이 미리 데워졌는지 함께 보여줌
+- SIGTERM을 받으면 바로 "종료 중(draining)"으로 바뀌어 /ready가 503이 되고,
+  진행 중인 요청/작업은 SERVE_GRACEFUL_TIMEOUT_SECONDS까지 마저 처리합니다.
+"""
+import os
+import time
+from typing import Any, Optional
+
+
+class ServerState:
+    def __init__(self):
+        self.pid = os.getpid()
+        self.started = False
+        self.draining = False
+        # app.main import에 걸린 시간 / lifespan 시작 작업에 걸린 시간 (초)
+        self.import_seconds: Optional[float] = None
+        self.boot_seconds: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        # 시작 시 미리 데운 것들 (예: {"resultCache": 256, "expressionIndex": 1200, "llm": True})
+        self.warm: dict[str, Any] = {}
+
+    def mark_started(self, boot_seconds: float) -> None:
+        self.pid = os.getpid()
+        self.started = True
+        self.draining = False
+        self.boot_seconds = round(boot_seconds, 3)
+        self.ready_at = time.time()
+
+    def begin_drain(self) -> None:
+        """종료 시작: 새 요청은 다른 워커/인스턴스로 가도록 준비 상태를 내림"""
+        self.draining = True
+
+    @property
+    def ready(self) -> bool:
+        return self.started and not self.draining
+
+    def snapshot(self) -> dict:
+        return {
+            "pid": self.pid,
+            "started": self.started,
+            "draining": self.draining,
+            "importSeconds": self.import_seconds,
+            "bootSeconds": self.boot_seconds,
+            "uptimeSeconds": round(time.time() - self.ready_at, 1) if self.ready_at else None,
+            "warm": dict(self.warm),
+        }
+
+
+server_state = ServerState()
@@ -0,0 +1,325 @@
+# app/core/metrics.py
+
+"""
+요청 처리 구간별 소요 시간 측정 + Prometheus 형식 지표(/metrics)
+
+- span("youtube_fetch") 처럼 구간을 감싸면
+  1. quickeng_stage_seconds{stage="youtube_fetch"} 히스토그램에 기록되고
+  2. 현재 HTTP 요청의 Server-Timing 헤더에도 들어갑니다.
+- 지표는 워커 프로세스 단위입니다. (워커가 여러 개면 프로세스마다 따로 집계)
+- 외부 라이브러리 없이 Prometheus 텍스트 형식(0.0.4)만 직접 만들어 냅니다.
+"""
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from starlette.datastructures import MutableHeaders
+
+# 기본 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: list["_Metric"] = []
+# span/run_in_thread는 스레드 안에서도 기록하므로 값 갱신은 잠금 안에서
+_lock = threading.Lock()
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """현재 값 지표. callback을 주면 /metrics 조회 시점에 값을 읽어옵니다."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), callback: Callable[[], float] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+        self.callback = callback
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    @contextmanager
+    def track(self, **labels) -> Iterator[None]:
+        """감싼 구간이 실행되는 동안 1 증가"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        if self.callback is not None:
+            lines.append(f"{self.name} {_format_value(self.callback())}")
+            return lines
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # 라벨 조합 -> (구간별 개수, 합계, 전체 개수)
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render_metrics() -> str:
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# 서버 공통 지표
+# =============================================================================
+http_requests_in_flight = Gauge("quickeng_http_requests_in_flight", "처리 중인 HTTP 요청 수")
+http_request_seconds = Histogram(
+    "quickeng_http_request_seconds", "HTTP 요청 처리 시간 (응답 헤더까지)", ("method", "path", "status")
+)
+stage_seconds = Histogram("quickeng_stage_seconds", "분석 단계별 소요 시간", ("stage",))
+business_errors = Counter("quickeng_business_errors_total", "BusinessException 발생 수 (code별)", ("code",))
+llm_tokens = Counter("quickeng_llm_tokens_total", "LLM 사용 토큰 수 (usage_metadata 기준)", ("model", "kind"))
+llm_in_flight = Gauge("quickeng_llm_in_flight", "응답을 기다리는 중인 LLM 호출 수")
+upstream_limit = Gauge("quickeng_upstream_concurrency_limit", "외부 호출 동시 실행 한도 (자동 조절)", ("upstream",))
+upstream_queued = Gauge("quickeng_upstream_queued", "외부 호출 자리를 기다리는 요청 수", ("upstream",))
+upstream_rejected = Counter("quickeng_upstream_rejected_total", "외부 호출 자리가 없어 거절한 수 (503)", ("upstream",))
+rate_limited = Counter("quickeng_rate_limited_total", "요청 제한으로 거절한 수 (429)")
+degraded_responses = Counter(
+    "quickeng_degraded_responses_total", "외부 장애로 대체 결과(만료 캐시/오프라인 사전)를 보낸 수", ("kind",)
+)
+# LLM 응답 파싱 결과 (응답 형식이 틀린 비율과 복구에 쓴 시간 추적용)
+# outcome: ok(그대로 파싱) / recovered(관대한 파서로 살림) / repaired(후속 요청으로 복구) / failed(AI_PARSE_ERROR)
+llm_parse_results = Counter("quickeng_llm_parse_total", "LLM 응답 파싱 결과 수", ("outcome",))
+# outcome: repaired / failed(고친 응답도 못 씀) / error(후속 요청 자체가 실패)
+llm_repair_seconds = Histogram(
+    "quickeng_llm_repair_seconds", "형식이 깨진 LLM 응답을 고쳐달라는 후속 요청 시간", ("outcome",)
+)
+
+# 스레드 풀 상태 (run_in_thread로 넘긴 작업 기준)
+_thread_pending = 0
+_thread_running = 0
+thread_pool_queue_depth = Gauge(
+    "quickeng_thread_pool_queue_depth", "스레드 풀에서 빈 스레드를 기다리는 작업 수",
+    callback=lambda: _thread_pending,
+)
+thread_pool_active = Gauge(
+    "quickeng_thread_pool_active", "스레드 풀에서 실행 중인 작업 수",
+    callback=lambda: _thread_running,
+)
+thread_queue_seconds = Histogram("quickeng_thread_queue_seconds", "스레드 풀 대기 시간 (제출 -> 실행 시작)")
+
+
+# =============================================================================
+# 구간 측정 (Span) + Server-Timing
+# =============================================================================
+# 현재 HTTP 요청의 (구간 이름, 소요 시간) 목록. 요청 밖(작업 워커 등)에서는 None
+_request_timings: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    stage_seconds.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """감싼 구간의 소요 시간을 기록 (동기/비동기 코드, 스레드 안에서도 사용 가능)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+async def run_in_thread(fn, *args, executor=None):
+    """
+    asyncio.to_thread와 같지만, 스레드 풀 대기열 길이와 대기 시간을 함께 기록합니다.
+    (contextvars도 그대로 넘어가므로 스레드 안의 span도 Server-Timing에 들어감)
+    executor를 주면 기본 스레드 풀 대신 그 풀에서 실행합니다. (예: 자막 다운로드 전용 풀)
+    """
+    global _thread_pending
+    submitted = time.perf_counter()
+    started = False
+    with _lock:
+        _thread_pending += 1
+
+    def call():
+        global _thread_pending, _thread_running
+        nonlocal started
+        with _lock:
+            started = True
+            _thread_pending -= 1
+            _thread_running += 1
+        thread_queue_seconds.observe(time.perf_counter() - submitted)
+        try:
+            return fn(*args)
+        finally:
+            with _lock:
+                _thread_running -= 1
+
+    try:
+        if executor is None:
+            return await asyncio.to_thread(call)
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(executor, context.run, call)
+    finally:
+        # 실행되기 전에 취소된 경우 대기열 수를 되돌림
+        with _lock:
+            if not started:
+                _thread_pending -= 1
+
+
+def server_timing_header(timings: list, total: float) -> str:
+    """같은 구간이 여러 번 나오면(구간 분할 분석 등) 합쳐서 횟수와 함께 표시"""
+    merged: dict[str, list] = {}
+    for stage, seconds in timings:
+        entry = merged.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    parts = []
+    for stage, (seconds, count) in merged.items():
+        part = f"{stage};dur={seconds * 1000:.1f}"
+        if count > 1:
+            part += f';desc="x{count}"'
+        parts.append(part)
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    요청마다 처리 시간/진행 중 요청 수를 기록하고 Server-Timing 헤더를 붙이는 ASGI 미들웨어
+    (스트리밍 응답은 헤더를 보내는 시점까지 끝난 구간만 헤더에 들어갑니다)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: list = []
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing_header(timings, time.perf_counter() - started))
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            http_requests_in_flight.dec()
+            _request_timings.reset(token)
+            # 경로는 라우트 템플릿 기준 (영상 ID 등이 라벨로 새지 않도록)
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                path=getattr(route, "path", "unmatched"),
+                status=str(status),
+            )
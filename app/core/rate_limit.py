@@ -0,0 +1,108 @@
+# app/core/rate_limit.py
+
+"""
+토큰 버킷(Token Bucket) 요청 제한
+
+- 버킷마다 초당 rate개씩 토큰이 차고, 최대 burst개까지 쌓입니다.
+- 요청 1건 = 토큰 1개(배치는 영상 수만큼, 단 버킷 크기(burst)까지만). 토큰이 모자라면 바로 거절하고
+  "몇 초 뒤면 토큰이 찬다"를 Retry-After로 알려줍니다.
+  (버킷보다 큰 요청을 그대로 받으면 버킷이 가득 차도 영원히 통과하지 못하므로 가득 찬 버킷 하나로 계산)
+- 사용자(IP)별 버킷 + 서버 전체 버킷을 둘 다 통과해야 합니다.
+- 워커 프로세스 단위입니다. (워커가 N개면 전체 허용량도 대략 N배)
+"""
+import math
+import time
+from collections import OrderedDict
+
+from app.core.exceptions import RateLimitedException
+from app.core.metrics import rate_limited
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def charge(self, cost: float) -> float:
+        """실제로 쓸 토큰 수 (버킷 크기를 넘지 않게)"""
+        return min(cost, self.burst)
+
+    def wait_time(self, cost: float = 1) -> float:
+        """지금 cost만큼 쓰려면 몇 초 기다려야 하는지 (0이면 바로 가능)"""
+        self._refill(time.monotonic())
+        if self.tokens >= cost:
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (cost - self.tokens) / self.rate
+
+    def take(self, cost: float = 1) -> None:
+        self.tokens -= cost
+
+
+class RateLimiter:
+    """사용자별 + 전체 토큰 버킷"""
+
+    def __init__(
+        self,
+        client_rate: float,
+        client_burst: float,
+        global_rate: float,
+        global_burst: float,
+        max_clients: int = 10000,
+    ):
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_clients = max_clients
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        # 최근에 요청한 사용자부터 max_clients명까지만 기억 (메모리 상한)
+        self._clients: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+        self.allowed = 0
+        self.rejected = 0
+
+    def _client_bucket(self, client_key: str) -> TokenBucket:
+        bucket = self._clients.get(client_key)
+        if bucket is None:
+            bucket = self._clients[client_key] = TokenBucket(self.client_rate, self.client_burst)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(client_key)
+        return bucket
+
+    def check(self, client_key: str, cost: float = 1) -> None:
+        """
+        허용되면 토큰을 쓰고 그대로 반환, 아니면 RateLimitedException
+        (두 버킷 모두 통과할 때만 토큰을 씀 -> 거절된 요청은 허용량을 깎지 않음)
+        cost가 버킷 크기보다 크면 버킷 크기만큼만 씀 (가득 찬 버킷이면 항상 통과)
+        """
+        client = self._client_bucket(client_key)
+        client_cost = client.charge(cost)
+        global_cost = self.global_bucket.charge(cost)
+        wait = max(client.wait_time(client_cost), self.global_bucket.wait_time(global_cost))
+        if wait > 0:
+            self.rejected += 1
+            rate_limited.inc()
+            # 초당 허용량이 0인 버킷(요청 차단)은 기다려도 소용없으므로 최소 1초로 안내
+            retry_after = 1 if math.isinf(wait) else max(1, math.ceil(wait))
+            raise RateLimitedException(retry_after=retry_after)
+
+        client.take(client_cost)
+        self.global_bucket.take(global_cost)
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "clients": len(self._clients),
+        }
@@ -0,0 +1,211 @@
+# app/core/resilience.py
+
+"""
+외부 호출(YouTube / Gemini)을 덜 흔들리게 만드는 도구 모음
+
+1. retry_async   : 일시적인 오류만 골라 지수 백오프 + 지터로 몇 번 더 시도
+                   (요청 마감 시간을 넘길 것 같으면 재시도하지 않음)
+2. CircuitBreaker: 연속으로 실패하면 잠시 호출 자체를 멈추고 바로 503
+                   (죽은 서비스를 계속 두드려서 모든 요청이 타임아웃까지 기다리는 것 방지)
+3. hedged        : 첫 시도가 평소(p95)보다 오래 걸리면 같은 요청을 하나 더 보내고
+                   먼저 성공한 쪽을 사용 (꼬리 지연 줄이기)
+"""
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from app.core.deadline import remaining
+from app.core.exceptions import UpstreamUnavailableException
+from app.core.metrics import Counter, Gauge
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+upstream_retries = Counter("quickeng_upstream_retries_total", "외부 호출 재시도 수", ("upstream",))
+upstream_hedges = Counter("quickeng_upstream_hedges_total", "꼬리 지연 때문에 추가로 보낸 요청 수", ("upstream",))
+circuit_state = Gauge("quickeng_circuit_state", "서킷 상태 (0=정상, 1=차단, 2=시험 호출 중)", ("upstream",))
+
+
+class TransientUpstreamError(Exception):
+    """잠깐 뒤에 다시 하면 될 수도 있는 외부 호출 오류 (스텁 등에서 사용)"""
+
+
+# =============================================================================
+# 1. 재시도 (Retry with jittered exponential backoff)
+# =============================================================================
+async def retry_async(
+    fn: Callable[[], Awaitable[Any]],
+    *,
+    name: str,
+    attempts: int,
+    retryable: tuple,
+    base_delay: float,
+    max_delay: float,
+) -> Any:
+    """
+    fn()을 최대 attempts번 시도합니다. retryable에 해당하는 오류만 재시도하고,
+    대기 시간은 0 ~ min(max_delay, base_delay * 2^(n-1)) 사이에서 무작위 (Full Jitter)
+    -> 여러 요청이 동시에 실패해도 같은 순간에 다시 몰려가지 않도록
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return await fn()
+        except retryable as e:
+            if attempt >= attempts:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+            left = remaining()
+            if left is not None and left <= delay:
+                # 기다렸다 다시 해도 마감 시간 안에 못 끝냄
+                raise
+            upstream_retries.inc(upstream=name)
+            logger.info(f"{name} 재시도 {attempt}/{attempts - 1} ({type(e).__name__}, {delay:.2f}초 후)")
+            await asyncio.sleep(delay)
+
+
+# =============================================================================
+# 2. 서킷 브레이커 (Circuit Breaker)
+# =============================================================================
+class CircuitBreaker:
+    """
+    CLOSED    : 정상. 연속 실패가 failure_threshold번이 되면 OPEN
+    OPEN      : reset_timeout초 동안 호출 없이 바로 UpstreamUnavailableException
+    HALF_OPEN : 시험 호출 1건만 통과. 성공하면 CLOSED, 실패하면 다시 OPEN
+    """
+    CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, ignore_errors: tuple = ()):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        # 업스트림 장애가 아닌 실패 (자막 없음, 로컬 과부하 등)는 세지 않음
+        self.ignore_errors = ignore_errors
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.short_circuited = 0
+        circuit_state.set(self.state, upstream=self.name)
+
+    def _set_state(self, state: int) -> None:
+        if state != self.state:
+            logger.warning(f"{self.name} 서킷 상태 변경: {self.state} -> {state}")
+        self.state = state
+        circuit_state.set(state, upstream=self.name)
+
+    def retry_after(self) -> float:
+        return max(1, math.ceil(self.opened_at + self.reset_timeout - time.monotonic()))
+
+    def is_open(self) -> bool:
+        """지금 호출하면 바로 거절되는 상태인지 (폴백 여부 판단용)"""
+        if self.state == self.OPEN:
+            return time.monotonic() < self.opened_at + self.reset_timeout
+        return self.state == self.HALF_OPEN and self._probe_in_flight
+
+    def allow(self) -> None:
+        """호출해도 되면 그대로 반환, 아니면 UpstreamUnavailableException"""
+        if self.state == self.OPEN:
+            if time.monotonic() < self.opened_at + self.reset_timeout:
+                self.short_circuited += 1
+                raise UpstreamUnavailableException(retry_after=self.retry_after(), upstream=self.name)
+            self._set_state(self.HALF_OPEN)
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.short_circuited += 1
+                raise UpstreamUnavailableException(retry_after=1, upstream=self.name)
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probe_in_flight = False
+        self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """
+        async with breaker.guard():
+            await 외부_호출()
+        """
+        self.allow()
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            # 요청이 취소된 것(스트림 중단 포함)은 성공도 실패도 아님 (시험 호출 자리만 반납)
+            self._probe_in_flight = False
+            raise
+        except self.ignore_errors:
+            self._probe_in_flight = False
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        else:
+            self.record_success()
+
+    def stats(self) -> dict:
+        return {
+            "state": ("CLOSED", "OPEN", "HALF_OPEN")[self.state],
+            "failures": self.failures,
+            "shortCircuited": self.short_circuited,
+        }
+
+
+# =============================================================================
+# 3. 헤징 (Hedged requests)
+# =============================================================================
+class LatencyTracker:
+    """최근 성공한 호출의 소요 시간으로 백분위를 계산 (헤징 시점 결정용)"""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+async def hedged(factory: Callable[[], Awaitable[Any]], delay: float, name: str) -> Any:
+    """
+    factory()로 첫 요청을 보내고, delay초 안에 안 끝나면 두 번째 요청을 보냅니다.
+    먼저 성공한 결과를 반환하고 나머지는 취소합니다. (둘 다 실패하면 마지막 오류)
+    """
+    tasks = {asyncio.ensure_future(factory())}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            upstream_hedges.inc(upstream=name)
+            tasks.add(asyncio.ensure_future(factory()))
+
+        error = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
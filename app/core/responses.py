@@ -0,0 +1,140 @@
+# app/core/responses.py
+
+"""
+빠른 JSON 응답 (orjson) + 압축 협상 + ETag / 304
+
+- FastJSONResponse: 이미 검증된 dict를 orjson으로 바로 직렬화
+  (pydantic 모델을 다시 만들고 별명으로 덤프하는 과정을 건너뜀)
+- 본문이 RESPONSE_COMPRESS_MIN_BYTES 이상이면 Accept-Encoding을 보고
+  br(brotli 설치 시) 또는 gzip으로 압축 (모바일 네트워크 전송량 절감)
+- ETag는 압축 전 본문의 해시로 만든 약한 ETag -> 압축 방식과 상관없이 같은 값
+  (본문을 결정하는 재료로 미리 만든 etag를 넘기면 304일 때 직렬화도 건너뜀)
+  GET/HEAD 요청의 If-None-Match가 같으면 본문 없이 304 (POST 등은 RFC 9110에 따라 무시)
+"""
+import gzip
+import hashlib
+from typing import Optional
+
+import orjson
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성 (없으면 gzip만 사용)
+    brotli = None
+
+# 압축 수준: 응답마다 바로 압축하므로 속도 쪽으로 (gzip 1~9, brotli 0~11)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def compress(payload: bytes, encoding: str) -> tuple[str, bytes]:
+    """payload를 encoding("br" / "gzip")으로 압축 -> (실제로 쓴 방식, 압축 결과), br이 없으면 gzip"""
+    if encoding == "br" and brotli is not None:
+        return "br", brotli.compress(payload, quality=BROTLI_QUALITY)
+    return "gzip", gzip.compress(payload, compresslevel=GZIP_LEVEL)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Accept-Encoding 헤더에서 쓸 압축 방식 고르기 (br > gzip, q=0은 거절로 처리)
+    예: "gzip, deflate, br" -> "br" (brotli가 설치돼 있을 때)
+    """
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def etag_for(body: bytes, version: str = "") -> str:
+    """본문(+결과 버전)으로 만든 약한 ETag"""
+    digest = hashlib.blake2b(body, digest_size=12, key=version.encode("utf-8")[:64]).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """
+    GET/HEAD 요청의 If-None-Match에 같은 ETag(또는 *)가 있으면 True (약한 비교)
+    그 외 메서드에는 304를 쓸 수 없으므로(RFC 9110) If-None-Match를 무시하고 False
+    """
+    if request.method not in ("GET", "HEAD"):
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    target = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == target for tag in header.split(","))
+
+
+class FastJSONResponse(Response):
+    """
+    orjson 직렬화 + (request를 넘기면) 압축 협상 + (etag_version 또는 etag를 넘기면) ETag / 304
+    content는 응답 모양 그대로의 dict (별명 키 사용, 검증은 만든 쪽에서 이미 끝남)
+    etag: 본문 대신 본문을 결정하는 재료로 미리 만든 ETag -> 304면 content를 직렬화하지 않음
+    """
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content,
+        status_code: int = 200,
+        headers: Optional[dict] = None,
+        request: Optional[Request] = None,
+        etag_version: Optional[str] = None,
+        cache_control: Optional[str] = None,
+        etag: Optional[str] = None,
+    ):
+        headers = dict(headers or {})
+        if cache_control:
+            headers["Cache-Control"] = cache_control
+        if request is not None:
+            headers["Vary"] = "Accept-Encoding"
+            if etag is not None:
+                headers["ETag"] = etag
+                if not_modified(request, etag):
+                    # 본문 없이 304 (ETag / Cache-Control은 그대로 보내야 캐시가 갱신됨)
+                    super().__init__(status_code=304, headers=headers)
+                    return
+
+        body = orjson.dumps(content)
+        if request is not None:
+            if etag is None and etag_version is not None:
+                headers["ETag"] = etag_for(body, etag_version)
+                if not_modified(request, headers["ETag"]):
+                    super().__init__(status_code=304, headers=headers)
+                    return
+
+            if len(body) >= settings.response_compress_min_bytes:
+                encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+                if encoding is not None:
+                    encoding, body = compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+
+        super().__init__(content=body, status_code=status_code, headers=headers)
+
+    def render(self, content) -> bytes:
+        # __init__에서 이미 직렬화/압축한 bytes가 들어옴 (304는 본문 없음)
+        if content is None:
+            return b""
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content)
@@ -0,0 +1,119 @@
+# app/core/singleflight.py
+
+"""
+같은 키로 동시에 들어온 작업을 하나로 합쳐주는 도구 (Single-flight)
+
+예: 같은 영상 분석 요청이 동시에 30개 들어오면
+    -> 실제 분석은 1번만 돌고, 30개 요청 모두 그 결과(또는 에러)를 함께 받습니다.
+
+공유 작업은 처음 요청한 쪽의 컨텍스트(마감 시간, Server-Timing 목록)를 물려받지 않고
+빈 컨텍스트에서 자기 마감 시간으로 돌고, 각 요청은 자기 마감 시간까지만 결과를 기다립니다.
+-> 마감이 거의 끝난 요청이 먼저 시작했다고 합류한 요청들이 모두 시간 초과로 실패하지 않음
+"""
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from app.core.deadline import deadline_scope, remaining
+from app.core.exceptions import DeadlineExceededException
+
+
+class _Call:
+    """진행 중인 작업 하나와, 그 결과를 기다리는 요청 수"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, deadline_seconds: Optional[float] = None):
+        """
+        deadline_seconds: 마감 시간이 있는 요청(API)이 시작한 작업에 새로 주는 마감 시간
+                          (작업 워커처럼 마감 시간 없이 시작한 작업은 단계별 시간 제한만 적용)
+        """
+        self.deadline_seconds = deadline_seconds
+        self._calls: dict[Hashable, _Call] = {}
+        # 다른 요청에 얹혀서 처리된(=중복 작업을 아낀) 횟수
+        self.coalesced = 0
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def wait_idle(self, timeout: float) -> int:
+        """진행 중인 작업이 모두 끝날 때까지 최대 timeout초 기다림 (서버 종료 시) -> 남은 작업 수"""
+        tasks = [call.task for call in self._calls.values()]
+        if tasks and timeout > 0:
+            await asyncio.wait(tasks, timeout=timeout)
+        return self.in_flight()
+
+    def _call(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[_Call, bool]:
+        call = self._calls.get(key)
+        if call is not None:
+            self.coalesced += 1
+            return call, False
+        call = _Call(self._start(fn))
+        self._calls[key] = call
+        call.task.add_done_callback(lambda task: self._finish(key, call))
+        return call, True
+
+    def _start(self, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        with_deadline = self.deadline_seconds is not None and remaining() is not None
+
+        async def run() -> Any:
+            if not with_deadline:
+                return await fn()
+            with deadline_scope(self.deadline_seconds):
+                return await fn()
+
+        # 빈 컨텍스트: 시작한 요청의 마감 시간/Server-Timing 목록과 분리
+        return asyncio.get_running_loop().create_task(run(), context=contextvars.Context())
+
+    async def _wait(self, call: _Call) -> Any:
+        call.waiters += 1
+        try:
+            # shield: 요청 하나가 취소돼도 다른 요청이 기다리는 작업은 살려둠
+            # 기다리는 시간은 각 요청의 남은 마감 시간까지
+            left = remaining()
+            if left is None:
+                return await asyncio.shield(call.task)
+            try:
+                return await asyncio.wait_for(asyncio.shield(call.task), timeout=max(left, 0))
+            except asyncio.TimeoutError:
+                self._abandon(call)
+                raise DeadlineExceededException()
+        except asyncio.CancelledError:
+            self._abandon(call)
+            raise
+        finally:
+            call.waiters -= 1
+
+    @staticmethod
+    def _abandon(call: _Call) -> None:
+        # 기다리던 요청이 모두 떠났다면 더 이상 돌릴 이유가 없으므로 작업 취소
+        if call.waiters == 1 and not call.task.done():
+            call.task.cancel()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        key에 해당하는 작업이 이미 진행 중이면 그 결과를 기다리고,
+        없으면 fn()으로 새 작업을 시작합니다.
+        """
+        call, _ = self._call(key, fn)
+        return await self._wait(call)
+
+    def join(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[bool, Awaitable[Any]]:
+        """
+        do()와 같지만 await 없이 바로 작업을 등록(또는 합류)합니다.
+        -> (이번에 새로 시작했는지, 결과를 기다릴 awaitable)
+        여러 키를 한꺼번에 등록하고 어느 키를 직접 맡았는지 알아야 할 때 사용 (배치 분석)
+        """
+        call, started = self._call(key, fn)
+        return started, self._wait(call)
+
+    def _finish(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # 아무도 결과를 받지 않은 에러가 "never retrieved" 경고로 남지 않도록 처리
+        if not call.task.cancelled():
+            call.task.exception()
@@ -0,0 +1,48 @@
+# app/core/sqlite.py
+
+"""
+프로세스별 SQLite 연결
+
+운영 실행기(app/serve.py)는 부모 프로세스에서 앱을 한 번만 import한 뒤 워커를 fork합니다.
+import 시점에 SQLite 연결을 열어두면 워커들이 부모의 연결을 물려받게 되는데,
+SQLite 연결은 fork 너머로 넘겨 쓰면 안 됩니다. (파일 잠금/캐시 상태가 꼬임)
+-> 연결은 처음 쓸 때 열고, 프로세스(pid)가 바뀌었으면 새로 엽니다.
+"""
+import os
+import sqlite3
+import threading
+from typing import Callable, Optional
+
+
+class ProcessLocalConnection:
+    """처음 쓸 때(그리고 fork된 프로세스에서 처음 쓸 때) 여는 SQLite 연결"""
+
+    def __init__(self, path: str, setup: Optional[Callable[[sqlite3.Connection], None]] = None, **connect_kwargs):
+        self.path = path
+        self._setup = setup
+        self._connect_kwargs = connect_kwargs
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        # 부모에게서 물려받은 연결은 닫지 않고 버려둠 (자식에서 닫으면 부모 쪽 파일 상태를 건드릴 수 있음)
+        self._inherited: list[sqlite3.Connection] = []
+
+    def get(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        if self._conn is not None and self._pid == pid:
+            return self._conn
+
+        with self._lock:
+            if self._conn is None or self._pid != pid:
+                if self._conn is not None:
+                    self._inherited.append(self._conn)
+                conn = sqlite3.connect(self.path, **self._connect_kwargs)
+                if self._setup is not None:
+                    self._setup(conn)
+                self._conn, self._pid = conn, pid
+        return self._conn
+
+    @property
+    def opened(self) -> bool:
+        """이 프로세스에서 이미 연결을 열었는지 (준비 상태 확인용)"""
+        return self._conn is not None and self._pid == os.getpid()
@@ -1,20 +1,84 @@
 # app/main.py
 
+import time
+
+# app.main import(= 앱 전체 모듈 로딩)에 걸린 시간 측정 시작 (/ready, 서버 시작 로그에 표시)
+_IMPORT_STARTED = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
+from fastapi.responses import JSONResponse, PlainTextResponse
 # [수정] 라우터 임포트는 맨 위로 올리는 것이 정석입니다.
+# (.env는 app/core/config.py에서 설정을 만들 때 한 번만 읽습니다)
 from app.routers import video 
+from app.core.config import settings
+from app.core.exceptions import BusinessException
+from app.core.lifecycle import server_state
+from app.core.metrics import MetricsMiddleware, render_metrics, run_in_thread
+from app.services.analysis_service import inflight_analyses
+from app.services.cache_service import result_cache
+from app.services.expression_index import expression_index
+from app.services.job_service import job_workers
+from app.services.gemini_service import llm_backend, gemini_breaker
+from app.services.youtube_service import transcript_executor, youtube_breaker
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+server_state.import_seconds = round(time.perf_counter() - _IMPORT_STARTED, 3)
+
+
+# =============================================================================
+# 서버 시작/종료 시 할 일 (Lifespan)
+# =============================================================================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    boot_started = time.perf_counter()
+
+    # 시작 1: Gemini 모델(또는 스텁) 준비 (+ 선택적으로 연결 미리 열기)
+    llm_backend.start()
+    if settings.gemini_warmup:
+        await llm_backend.warm_up()
+    server_state.warm["llm"] = llm_backend.warmed
+
+    # 시작 2: 캐시 데우기 (최근 분석 결과 -> 메모리, 표현 색인의 표현 집합 -> 메모리)
+    server_state.warm["resultCache"] = await result_cache.preload(settings.result_cache_preload_entries)
+    if expression_index is not None:
+        server_state.warm["expressionIndex"] = await run_in_thread(expression_index.warm)
 
+    # 시작 3: 백그라운드 분석 작업(Job) 워커 실행
+    if settings.job_workers_enabled:
+        job_workers.start()
 
+    server_state.mark_started(time.perf_counter() - boot_started)
+    logger.info(
+        f"워커 준비 완료 (pid {server_state.pid}, import {server_state.import_seconds}초, "
+        f"시작 작업 {server_state.boot_seconds}초, 데운 캐시 {server_state.warm})"
+    )
+    yield
+
+    # 종료: uvicorn이 새 연결을 막고 진행 중인 요청을 마저 끝낸 뒤 여기로 옴
+    server_state.begin_drain()
+    drain_deadline = time.monotonic() + settings.serve_graceful_timeout_seconds
+    # 1. 실행 중인 작업(Job)은 마감 시간까지 마저 처리하고, 남은 것은 대기열로 되돌림
+    await job_workers.stop(drain_seconds=drain_deadline - time.monotonic())
+    # 2. 요청과 상관없이 돌고 있는 분석(캐시 미리 채우기 등)도 마감 시간까지 기다림
+    left = await inflight_analyses.wait_idle(drain_deadline - time.monotonic())
+    if left:
+        logger.warning(f"종료 대기 시간 안에 끝나지 않은 분석 {left}개를 버립니다.")
+    # 3. Gemini 연결 종료 + 아직 시작 안 한 자막 다운로드는 버리고 전용 스레드 풀 정리
+    await llm_backend.close()
+    transcript_executor.shutdown(wait=False, cancel_futures=True)
 
-# 서버 시작할 때 .env 파일을 읽어옴
-load_dotenv()
 
 app = FastAPI(
     title="QuickEng Server",
     description="YouTube Shorts 기반 영어 학습 앱 QuickEng의 백엔드 서버입니다.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # =============================================================================
@@ -26,8 +90,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 브라우저 개발자 도구에서도 구간별 소요 시간을 볼 수 있도록
+    expose_headers=["Server-Timing"],
 )
 
+# 요청 처리 시간 / 진행 중 요청 수 기록 + Server-Timing 헤더
+app.add_middleware(MetricsMiddleware)
+
+# =============================================================================
+# 공통 에러 응답 (라우터의 try/except 밖에서 발생한 커스텀 에러, 예: 요청 제한)
+# =============================================================================
+@app.exception_handler(BusinessException)
+async def business_exception_handler(request, exc: BusinessException):
+    retry_after = getattr(exc, "retry_after", None)
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"code": exc.code, "message": exc.detail},
+        headers={"Retry-After": str(int(retry_after))} if retry_after else None,
+    )
+
 # =============================================================================
 # 라우터 등록
 # =============================================================================
@@ -50,4 +131,39 @@ def health_check():
     [헬스 체크] AWS/GCP 로드밸런서나 모니터링 도구가
     서버가 살았는지 죽었는지 찌러보는 용도입니다.
     """
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/ready")
+def readiness_check():
+    """
+    [준비 상태] 로드밸런서가 "이 워커로 요청을 보내도 되는지" 확인하는 용도입니다.
+    - 시작 작업(lifespan)이 안 끝났거나 종료(드레인) 중이면 503
+    - 캐시/Gemini 연결을 미리 데웠는지, 서킷 상태도 함께 보여줌 (이건 503 기준이 아님)
+    """
+    checks = {
+        "llm": llm_backend.started,
+        "jobWorkers": job_workers.running() == job_workers.concurrency if settings.job_workers_enabled else None,
+        "transcriptExecutor": not getattr(transcript_executor, "_shutdown", False),
+    }
+    ready = server_state.ready and all(value is not False for value in checks.values())
+    if ready:
+        status = "ready"
+    else:
+        status = "draining" if server_state.draining else "starting"
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": status,
+            "checks": checks,
+            "circuits": {"gemini": gemini_breaker.stats()["state"], "youtube": youtube_breaker.stats()["state"]},
+            **server_state.snapshot(),
+        },
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    [모니터링 지표] Prometheus가 주기적으로 긁어가는 텍스트 형식 지표
+    (단계별 소요 시간 히스토그램, 진행 중 요청 수, 스레드 풀 대기열, 토큰 사용량, 에러 수)
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
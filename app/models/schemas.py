@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Literal, Optional
 
 # =========================================================
 # 1. [요청] 앱이 서버에게 보낼 때 ("이 영상 분석해줘!")
@@ -13,12 +13,38 @@ class AnalyzeRequest(BaseModel):
     video_url: str = Field(..., alias="videoUrl")
     
     # 기본값은 "ko"(한국어)이고, 앱에서는 "targetLang"이라는 이름표를 달고 들어옴
+    # 쉼표로 여러 언어를 한 번에 요청할 수 있음: "ko,ja" -> 카드마다 두 언어의 뜻
     target_lang: str = Field("ko", alias="targetLang")
 
+    # (/analyze 전용) 카드 주변 자막 조각을 응답에 같이 담을지, 담는다면 압축 방식
+    # -> 앱이 자막 전체를 따로 받아 직접 검색하지 않아도 됨
+    include_transcript: bool = Field(False, alias="includeTranscript")
+    transcript_encoding: Literal["gzip", "br"] = Field("gzip", alias="transcriptEncoding")
+
     class Config:
         # [설정] 별명(videoUrl)으로 들어와도 받고, 본명(video_url)으로 들어와도 받아준다.
         populate_by_name = True
 
+# =========================================================
+# 1-1. [내부 부품] 링크에서 뽑아낸 영상 정보 (한 번 파싱해서 끝까지 들고 다님)
+# =========================================================
+class VideoRef(BaseModel):
+    # 유튜브 영상 ID (영문/숫자/-/_ 11글자)
+    video_id: str = Field(..., alias="videoId", pattern=r"^[0-9A-Za-z_-]{11}$")
+
+    # 어떤 모양의 링크였는지: watch / shorts / embed / live / short_link
+    kind: str = "watch"
+
+    @property
+    def url(self) -> str:
+        """표준 형태의 watch 링크 (로그, 작업 큐 저장용)"""
+        return f"https://www.youtube.com/watch?v={self.video_id}"
+
+    class Config:
+        populate_by_name = True
+        # 캐시해 두고 여러 요청이 같이 쓰므로 바꿀 수 없게
+        frozen = True
+
 # =========================================================
 # 2. [내부 부품] 단어 카드 하나하나의 모양
 # =========================================================
@@ -29,12 +55,38 @@ class WordItem(BaseModel):
     # 이건 둘 다 똑같이 "expression"을 쓰니까 별명 설정 불필요
     expression: str
     
+    # 요청한 언어별 뜻: {"ko": "출발하다", "ja": "出発する"}
+    meaning: Dict[str, str]
+
     # 파이썬: meaning_kr <---> 앱: meaningKr
-    meaning_kr: str = Field(..., alias="meaningKr")
+    # (예전 앱 호환) targetLang에 "ko"가 있을 때만 meaning["ko"]와 같은 값, 없으면 null
+    meaning_kr: Optional[str] = Field(None, alias="meaningKr")
     
     # 파이썬: context_tag <---> 앱: contextTag
     context_tag: str = Field(..., alias="contextTag")
-    
+
+    # ---- 아래는 Gemini가 아니라 서버가 자막에서 찾아 채우는 값 ----
+    # 표현이 나오는 구간 (초, 자막에서 못 찾으면 null)
+    start: Optional[float] = None
+    end: Optional[float] = None
+    # 표현이 들어 있는 주변 문장
+    sentence: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+
+
+# =========================================================
+# 2-1. [내부 부품] 카드 주변 자막 조각 (압축해서 base64로 담음)
+# =========================================================
+class TranscriptSlice(BaseModel):
+    # "gzip" 또는 "br" (br 라이브러리가 없으면 gzip으로 대체됨)
+    encoding: str
+    # 압축을 풀면 {"starts": [...], "durations": [...], "texts": [...]} JSON
+    data: str
+    # 담긴 조각 수 / 원래 자막의 조각 수
+    snippets: int
+    total_snippets: int = Field(..., alias="totalSnippets")
 
     class Config:
         populate_by_name = True
@@ -51,6 +103,67 @@ class AnalyzeResponse(BaseModel):
     # ★ 핵심 수정: 명세서의 scriptItems에는 단어장(WordItem)이 들어갑니다.
     script_items: List[WordItem] = Field(..., alias="scriptItems")
 
+    # includeTranscript=true 로 요청했을 때만 채워짐
+    transcript_slice: Optional[TranscriptSlice] = Field(None, alias="transcriptSlice")
+
     class Config:
         populate_by_name = True
 
+
+# =========================================================
+# 4. [배치 요청] 피드 미리 불러오기용 ("이 영상들 한꺼번에 분석해줘!")
+# =========================================================
+# 배치 요청 하나에 담을 수 있는 최대 영상 수
+MAX_BATCH_ITEMS = 20
+
+class BatchAnalyzeRequest(BaseModel):
+    items: List[AnalyzeRequest] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+# =========================================================
+# 5. [배치 응답] 영상별 결과 (성공이면 result, 실패면 code/message)
+# =========================================================
+class BatchItemResult(BaseModel):
+    video_url: str = Field(..., alias="videoUrl")
+    # "OK" 또는 "ERROR"
+    status: str
+    result: Optional[AnalyzeResponse] = None
+    # 실패 시 BusinessException의 code / 안내 문구
+    code: Optional[str] = None
+    message: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+
+
+class BatchAnalyzeResponse(BaseModel):
+    # 요청한 items 순서 그대로
+    results: List[BatchItemResult]
+
+
+# =========================================================
+# 6. [작업 접수] 오래 걸리는 분석을 백그라운드 작업으로 맡길 때
+# =========================================================
+class JobCreateRequest(AnalyzeRequest):
+    # 완료되면 결과를 POST로 받을 주소 (없으면 폴링만)
+    callback_url: Optional[str] = Field(None, alias="callbackUrl")
+
+
+# =========================================================
+# 7. [작업 상태] 접수 / 조회 / 웹훅 공통 응답
+# =========================================================
+class JobResponse(BaseModel):
+    job_id: str = Field(..., alias="jobId")
+    # QUEUED / RUNNING / SUCCEEDED / FAILED
+    status: str
+    attempts: int
+    created_at: float = Field(..., alias="createdAt")
+    updated_at: float = Field(..., alias="updatedAt")
+    # SUCCEEDED일 때만 채워짐
+    result: Optional[AnalyzeResponse] = None
+    # FAILED(또는 재시도 대기 중)일 때 마지막 에러
+    code: Optional[str] = None
+    message: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
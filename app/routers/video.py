@@ -1,64 +1,256 @@
 # app/routers/video.py
 
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
-from app.models.schemas import AnalyzeRequest, AnalyzeResponse, WordItem
+import asyncio
+from typing import Annotated, Optional
 
-# 서비스 로직 임포트
-from app.services.youtube_service import get_transcript_list 
-from app.services.gemini_service import extract_vocabulary
+import orjson
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.models.schemas import (
+    AnalyzeRequest,
+    AnalyzeResponse,
+    VideoRef,
+    WordItem,
+    BatchAnalyzeRequest,
+    BatchAnalyzeResponse,
+    JobCreateRequest,
+    JobResponse,
+)
+
+# 서비스 로직 임포트 (캐시 / 중복 요청 합치기 / YouTube / Gemini)
+from app.services.analysis_service import (
+    analyze,
+    analyze_batch,
+    stream_analysis,
+    transcript_slice,
+    inflight_analyses,
+    prefilter_totals,
+)
+from app.services.cache_service import result_cache, make_result_key
 
-#extract_video_id 임포트
-from app.services.youtube_service import extract_video_id
+#링크 파싱(parse_video_url) / 자막 저장소 임포트
+from app.services.youtube_service import transcript_store
+from app.services.video_url import parse_video_url, parse_video_urls
+from app.services.job_service import job_store, job_workers, job_to_payload
+from app.services.callback_url import validate_callback_url
+from app.services.gemini_service import llm_cache_metrics, RESULT_VERSION
+from app.services.shared_cache import shared_cache
+from app.services.expression_index import expression_index
+from app.services.languages import localize_items, parse_target_langs
+from app.core.metrics import business_errors, run_in_thread, span
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+from app.core.rate_limit import RateLimiter
+from app.core.responses import FastJSONResponse, etag_for, not_modified
 
 
 
 # 커스텀 에러 임포트 (InvalidLinkException 포함 확인!)
 from app.core.exceptions import (
+    BusinessException,
     NoTranscriptException,
     TranscriptsDisabledException,
     YouTubeUnknownException,
     AIParseException,
     AIUnknownException,
+    AITimeoutException,
+    ClientDisconnectedException,
+    RateLimitedException,
+    ServerBusyException,
+    UpstreamUnavailableException,
+    DeadlineExceededException,
+    UnsupportedLanguageException,
+    InvalidCallbackUrlException,
     InvalidLinkException  # <--- [필수] 이거 없으면 에러 못 잡습니다!
 )
 
 router = APIRouter(prefix="/v1/video", tags=["video"])
 
-@router.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_video(request: AnalyzeRequest):
+# 클라이언트 연결 끊김을 확인하는 주기 (초)
+DISCONNECT_POLL_INTERVAL = 0.5
+
+# 분석 요청 제한 (사용자(IP)별 + 전체, 워커 프로세스 단위)
+rate_limiter = RateLimiter(
+    client_rate=settings.rate_limit_client_rps,
+    client_burst=settings.rate_limit_client_burst,
+    global_rate=settings.rate_limit_global_rps,
+    global_burst=settings.rate_limit_global_burst,
+    max_clients=settings.rate_limit_max_clients,
+)
+
+
+def _client_key(http_request: Request) -> str:
+    """요청한 사용자 식별값 (IP)"""
+    if settings.rate_limit_trust_forwarded:
+        forwarded = http_request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return http_request.client.host if http_request.client else "unknown"
+
+
+def _check_rate_limit(http_request: Request, cost: float = 1) -> None:
+    """허용량을 넘으면 RateLimitedException (-> 429 + Retry-After)"""
+    if settings.rate_limit_enabled:
+        rate_limiter.check(_client_key(http_request), cost)
+
+
+async def enforce_rate_limit(http_request: Request) -> None:
+    """분석 API에 붙이는 요청 제한 의존성 (요청 1건 = 토큰 1개)"""
+    _check_rate_limit(http_request)
+
+
+def _retry_later_response(e: BusinessException) -> JSONResponse:
+    """429 / 503 응답 (앱은 Retry-After초 뒤에 다시 시도)"""
+    return JSONResponse(
+        status_code=e.status_code,
+        content={"code": e.code, "message": e.detail},
+        headers={"Retry-After": str(int(e.retry_after))},
+    )
+
+
+async def _cancel_on_disconnect(http_request: Request, coro):
     """
-    유튜브 비디오 분석 API
+    분석 작업(coro)을 태스크로 돌리면서, 앱이 연결을 끊으면 작업을 취소합니다.
+    -> 아무도 받지 않을 결과를 위해 Gemini 호출을 붙잡고 있지 않도록 합니다.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                raise ClientDisconnectedException()
+    except BusinessException as e:
+        # 에러 종류(code)별 발생 수 집계 (/metrics)
+        business_errors.inc(code=e.code)
+        raise
+    finally:
+        # 서버 쪽에서 요청 자체가 취소된 경우에도 작업이 남지 않도록 정리
+        if not task.done():
+            task.cancel()
+
+
+# 응답 카드의 키 (WordItem 별명 순서 그대로) -> 이미 검증된 dict를 모델로 다시 만들지 않고 바로 응답
+_WORD_FIELDS = tuple(field.alias or name for name, field in WordItem.model_fields.items())
+
+
+def _word_payload(item: dict) -> dict:
+    """
+    단어 카드 dict -> 응답 모양 (extract_vocabulary에서 필수 필드 검증이 끝난 카드만 들어옴)
+    item은 localize_items()로 요청한 언어의 뜻만 남긴 카드
+    """
+    return {name: item.get(name) for name in _WORD_FIELDS}
+
+
+def _analysis_payload(
+    video_id: str,
+    vocabulary_data: list[dict],
+    languages: tuple[str, ...],
+    slice_data: Optional[dict] = None,
+) -> dict:
+    """AnalyzeResponse와 같은 모양의 dict (뜻은 요청한 언어만)"""
+    return {
+        "videoId": video_id,
+        "title": "uploaded_url",
+        "scriptItems": [_word_payload(item) for item in localize_items(vocabulary_data, languages)],
+        "transcriptSlice": slice_data,
+    }
+
+
+def _etag_source(video_id: str, vocabulary_data: list[dict], languages: tuple[str, ...], request: AnalyzeRequest) -> bytes:
+    """
+    응답 본문을 결정하는 재료 (카드 id는 분석할 때마다 새로 발급되므로 결과가 바뀌면 같이 바뀜)
+    -> 본문/자막 조각을 만들지 않고도 ETag를 정해서 304면 바로 응답
+    """
+    return orjson.dumps([
+        video_id,
+        languages,
+        request.include_transcript,
+        request.transcript_encoding,
+        [
+            [item.get("id"), item.get("expression"), [(item.get("meaning") or {}).get(code) for code in languages]]
+            for item in vocabulary_data
+        ],
+    ])
+
+
+async def _cache_control(cache_key: str) -> str:
+    """
+    결과 캐시에 저장된 결과면 남은 유효 시간만큼 앱/CDN이 재사용 가능,
+    저장되지 않은 결과(장애 시 대체 결과 등)는 재사용 금지
+    """
+    ttl = await result_cache.remaining_ttl(cache_key)
+    if ttl is None or ttl < 1:
+        return "no-store"
+    return f"public, max-age={min(int(ttl), settings.response_max_age_seconds)}"
+
+
+async def _run_analysis(request: AnalyzeRequest, http_request: Request) -> FastJSONResponse:
+    """
+    [실제 분석 파이프라인]
     1. 자막 추출 (YouTube)
     2. 단어장 생성 (Gemini)
     """
-    try:
+    # 1. URL / 뜻 언어 파싱 (여기서 한 번만 하고 VideoRef와 언어 튜플을 끝까지 넘김)
+    with span("extract_id"):
+        video = parse_video_url(request.video_url)
+        languages = parse_target_langs(request.target_lang)
 
-        # 1. URL에서 Video ID 추출
-        video_id = extract_video_id(request.video_url)
+    # 2. 분석 (캐시 → 진행 중인 같은 영상 작업에 합류 → 자막 추출 + Gemini → 빠진 언어만 번역)
+    # 반환값: [{'id': '...', 'expression': '...', 'meaning': {'ko': '...'}, 'contextTag': '...'}, ...]
+    # 자막 다운로드 + Gemini 호출 + 재시도가 모두 REQUEST_DEADLINE_SECONDS 안에서 끝나야 함
+    with deadline_scope(settings.request_deadline_seconds):
+        vocabulary_data = await analyze(video, languages)
 
-        # 2. 자막 추출 (YouTube Service)
-        # 반환값: [{'text': 'Hello', 'start': 0.0, 'duration': 1.5}, ...]
-        transcript_data = await get_transcript_list(str(request.video_url), request.target_lang)
-        
-        # 3. 핵심 표현 추출 (Gemini Service)
-        # 반환값: [{'id': '...', 'expression': '...', 'meaningKr': '...', 'contextTag': '...'}, ...]
-        vocabulary_data = await extract_vocabulary(transcript_data)
-        
-        # 4. Pydantic 모델로 변환 (데이터 검증)
-        word_items = [WordItem(**item) for item in vocabulary_data]
+        # ETag는 결과 버전 + 본문을 결정하는 재료로 만들어, 앱/CDN이 GET에 If-None-Match로 물어보면
+        # 자막 조각/본문을 만들지 않고 바로 304
+        cache_control = await _cache_control(make_result_key(video.video_id, RESULT_VERSION))
+        etag = etag_for(_etag_source(video.video_id, vocabulary_data, languages, request), RESULT_VERSION)
+        if not_modified(http_request, etag):
+            return FastJSONResponse(None, request=http_request, etag=etag, cache_control=cache_control)
 
-        # 4. url의 id추출
-        #url_id = extract_video_id(str(request.video_url))
-        
-        # 5. 최종 응답 생성
-        return AnalyzeResponse(
-            video_id=video_id,
-            title="uploaded_url",
-            #thumbnail_url=str(request.video_url),
-            script_items=word_items  # API 명세서의 scriptItems 키에 매핑됨
+        # (선택) 카드 주변 자막 조각 -> 앱이 자막 전체를 따로 받지 않아도 됨
+        slice_data = None
+        if request.include_transcript:
+            slice_data = await transcript_slice(video, vocabulary_data, request.transcript_encoding)
+
+    # 3. 응답 생성 (카드는 extract_vocabulary에서 이미 검증됨 -> 모델 재검증 없이 orjson으로 바로 직렬화)
+    with span("serialize"):
+        return FastJSONResponse(
+            _analysis_payload(video.video_id, vocabulary_data, languages, slice_data),
+            request=http_request,
+            etag=etag,
+            cache_control=cache_control,
         )
 
+
+@router.post("/analyze", response_model=AnalyzeResponse, dependencies=[Depends(enforce_rate_limit)])
+async def analyze_video(request: AnalyzeRequest, http_request: Request):
+    """
+    유튜브 비디오 분석 API
+    1. 자막 추출 (YouTube)
+    2. 단어장 생성 (Gemini)
+    (분석 도중 앱이 연결을 끊으면 진행 중인 작업을 취소합니다)
+    """
+    return await _analysis_response(request, http_request)
+
+
+@router.get("/analyze", response_model=AnalyzeResponse, dependencies=[Depends(enforce_rate_limit)])
+async def analyze_video_get(request: Annotated[AnalyzeRequest, Query()], http_request: Request):
+    """
+    유튜브 비디오 분석 API (GET 버전, ?videoUrl=...&targetLang=ko)
+    POST와 결과는 같고, CDN/앱 HTTP 캐시가 저장해 두었다가 If-None-Match로 확인 -> 304
+    """
+    return await _analysis_response(request, http_request)
+
+
+async def _analysis_response(request: AnalyzeRequest, http_request: Request):
+    """분석 실행 + 에러를 API 명세서 규격({code, message}) 응답으로 변환"""
+    try:
+        return await _cancel_on_disconnect(http_request, _run_analysis(request, http_request))
+
     # =========================================================
     # [에러 핸들링] API 명세서 규격 준수 ({code, message})
     # =========================================================
@@ -70,6 +262,13 @@ async def analyze_video(request: AnalyzeRequest):
             content={"code": "INVALID_LINK", "message": "유효하지 않은 유튜브 링크입니다."}
         )
 
+    # 1-1. 지원하지 않는 뜻 언어 (400)
+    except UnsupportedLanguageException as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"code": e.code, "message": e.detail}
+        )
+
     # 2. 자막 없음 (400)
     except NoTranscriptException:
         return JSONResponse(
@@ -84,14 +283,39 @@ async def analyze_video(request: AnalyzeRequest):
             content={"code": "TRANSCRIPT_DISABLED", "message": "이 영상은 자막이 비활성화되어 있습니다."}
         )
     
-    # 4. AI 파싱 실패 (500)
+    # 4. AI 응답 시간 초과 (504)
+    except AITimeoutException:
+        return JSONResponse(
+            status_code=504,
+            content={"code": "AI_TIMEOUT", "message": "AI 분석이 지연되고 있습니다. 잠시 후 다시 시도해주세요."}
+        )
+
+    # 5. 클라이언트가 먼저 연결을 끊음 (499, 실제로 앱이 받지는 않음)
+    except ClientDisconnectedException:
+        return JSONResponse(
+            status_code=499,
+            content={"code": "CLIENT_CLOSED", "message": "클라이언트가 요청을 취소했습니다."}
+        )
+
+    # 6. 외부 호출(YouTube/Gemini)이 밀려 있거나 장애로 잠시 멈춤 (503, Retry-After)
+    except (ServerBusyException, UpstreamUnavailableException) as e:
+        return _retry_later_response(e)
+
+    # 7. 요청 전체 마감 시간 초과 (504)
+    except DeadlineExceededException as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"code": e.code, "message": e.detail}
+        )
+
+    # 8. AI 파싱 실패 (500)
     except AIParseException:
         return JSONResponse(
             status_code=500,
             content={"code": "AI_PARSE_ERROR", "message": "AI 분석 결과 처리에 실패했습니다."}
         )
     
-    # 5. 기타 서버 에러 (500)
+    # 9. 기타 서버 에러 (500)
     #except (YouTubeUnknownException, AIUnknownException) as e:
      #   return JSONResponse(
       #      status_code=500,
@@ -111,3 +335,229 @@ async def analyze_video(request: AnalyzeRequest):
             status_code=500,
             content={"code": "UNKNOWN_ERROR", "message": f"알 수 없는 오류: {str(e)}"}
         )
+
+
+def _parse_batch_languages(request: BatchAnalyzeRequest, videos: list) -> list[tuple[str, ...]]:
+    """
+    항목별 뜻 언어 파싱 (배치 요청용, 네트워크 호출 전에 실행)
+    언어가 잘못된 항목은 videos 자리에 UnsupportedLanguageException을 넣어 링크 오류처럼 ERROR 항목으로
+    """
+    languages = []
+    for index, item in enumerate(request.items):
+        try:
+            languages.append(parse_target_langs(item.target_lang))
+        except UnsupportedLanguageException as e:
+            languages.append(())
+            if not isinstance(videos[index], BusinessException):
+                videos[index] = e
+    return languages
+
+
+async def _run_batch_analysis(
+    request: BatchAnalyzeRequest,
+    videos: list,
+    languages: list[tuple[str, ...]],
+    http_request: Request,
+) -> FastJSONResponse:
+    """
+    [배치 분석 파이프라인]
+    videos: parse_video_urls()로 미리 검증한 VideoRef(또는 링크/언어 에러) 목록
+    languages: 항목별 뜻 언어 (_parse_batch_languages)
+    영상별로 성공이면 result, 실패면 BusinessException의 code/message를 담습니다.
+    """
+    with deadline_scope(settings.request_deadline_seconds):
+        outcomes = await analyze_batch(list(zip(videos, languages)))
+
+    results = []
+    for item, item_languages, (video_id, outcome) in zip(request.items, languages, outcomes):
+        if isinstance(outcome, BusinessException):
+            business_errors.inc(code=outcome.code)
+            results.append({
+                "videoUrl": item.video_url,
+                "status": "ERROR",
+                "result": None,
+                "code": outcome.code,
+                "message": outcome.detail,
+            })
+        else:
+            results.append({
+                "videoUrl": item.video_url,
+                "status": "OK",
+                "result": _analysis_payload(video_id, outcome, item_languages),
+                "code": None,
+                "message": None,
+            })
+
+    # 배치 응답은 커서 압축 이득이 큼 (Accept-Encoding에 따라 br/gzip)
+    with span("serialize"):
+        return FastJSONResponse({"results": results}, request=http_request)
+
+
+@router.post("/analyze:batch", response_model=BatchAnalyzeResponse)
+async def analyze_video_batch(request: BatchAnalyzeRequest, http_request: Request):
+    """
+    여러 영상 한꺼번에 분석 API (피드 미리 불러오기용)
+    - 자막은 동시에 받아오고, 짧은 자막은 Gemini 프롬프트 하나로 묶어 분석합니다.
+    - 일부 영상이 실패해도 전체 요청은 200이며, 영상별로 code/message가 담깁니다.
+    - 요청 제한은 (링크/언어가 올바른) 영상 수만큼 차감됩니다.
+    """
+    # 네트워크 호출 전에 모든 링크/언어를 한꺼번에 검증 (잘못된 항목은 바로 ERROR 항목)
+    videos = parse_video_urls([item.video_url for item in request.items])
+    languages = _parse_batch_languages(request, videos)
+    valid_count = sum(1 for video in videos if not isinstance(video, BusinessException))
+    _check_rate_limit(http_request, cost=max(1, valid_count))
+    try:
+        return await _cancel_on_disconnect(
+            http_request, _run_batch_analysis(request, videos, languages, http_request)
+        )
+
+    except ClientDisconnectedException:
+        return JSONResponse(
+            status_code=499,
+            content={"code": "CLIENT_CLOSED", "message": "클라이언트가 요청을 취소했습니다."}
+        )
+
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"code": "UNKNOWN_ERROR", "message": f"알 수 없는 오류: {str(e)}"}
+        )
+
+
+def _encode_event(event: dict, sse: bool) -> str:
+    """이벤트 하나를 NDJSON 한 줄 또는 SSE 블록으로 변환"""
+    data = orjson.dumps(event).decode("utf-8")
+    if sse:
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def _stream_events(video: VideoRef, languages: tuple[str, ...], sse: bool):
+    """분석 이벤트를 흘려보내고, 실패하면 error 이벤트로 마무리"""
+    try:
+        with deadline_scope(settings.request_deadline_seconds):
+            async for event in stream_analysis(video, languages):
+                if event["event"] == "item":
+                    # 카드 모양은 일반 응답(WordItem)과 동일하게 맞춤 (뜻은 요청한 언어만)
+                    event = {**event, "item": _word_payload(localize_items([event["item"]], languages)[0])}
+                yield _encode_event(event, sse)
+    except BusinessException as e:
+        business_errors.inc(code=e.code)
+        yield _encode_event({"event": "error", "code": e.code, "message": e.detail}, sse)
+    except Exception as e:
+        yield _encode_event({"event": "error", "code": "UNKNOWN_ERROR", "message": f"알 수 없는 오류: {str(e)}"}, sse)
+
+
+@router.post("/analyze:stream", dependencies=[Depends(enforce_rate_limit)])
+async def analyze_video_stream(request: AnalyzeRequest, http_request: Request):
+    """
+    유튜브 비디오 분석 API (스트리밍 버전)
+    - 기본은 NDJSON (한 줄에 이벤트 하나)
+    - Accept: text/event-stream 이면 Server-Sent Events 형식
+    이벤트 순서: transcript -> item (카드마다) -> done  (실패 시 error)
+    (앱이 연결을 끊으면 스트림이 중단되면서 Gemini 호출도 함께 취소됩니다)
+    """
+    # 링크/언어 오류는 스트림을 열기 전에 일반 에러 응답으로 처리
+    try:
+        video = parse_video_url(request.video_url)
+        languages = parse_target_langs(request.target_lang)
+    except InvalidLinkException as e:
+        business_errors.inc(code=e.code)
+        return JSONResponse(
+            status_code=400,
+            content={"code": "INVALID_LINK", "message": "유효하지 않은 유튜브 링크입니다."}
+        )
+    except UnsupportedLanguageException as e:
+        business_errors.inc(code=e.code)
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"code": e.code, "message": e.detail}
+        )
+
+    sse = "text/event-stream" in http_request.headers.get("accept", "")
+    return StreamingResponse(
+        _stream_events(video, languages, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        # 프록시가 모아서 보내지 않도록 버퍼링 끄기
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=202, dependencies=[Depends(enforce_rate_limit)])
+async def create_analysis_job(request: JobCreateRequest):
+    """
+    분석 작업 접수 API
+    - job id를 바로 돌려주고, 분석은 백그라운드 워커가 처리합니다.
+    - GET /v1/video/jobs/{jobId}로 상태를 조회하거나, callbackUrl로 결과를 받습니다.
+    """
+    # 링크/언어 오류는 접수 단계에서 바로 거절
+    try:
+        video = parse_video_url(request.video_url)
+        languages = parse_target_langs(request.target_lang)
+    except InvalidLinkException:
+        return JSONResponse(
+            status_code=400,
+            content={"code": "INVALID_LINK", "message": "유효하지 않은 유튜브 링크입니다."}
+        )
+    except UnsupportedLanguageException as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"code": e.code, "message": e.detail}
+        )
+
+    # 웹훅 주소도 접수 단계에서 검사 (https + 외부 주소만, 내부망 호출 방지)
+    if request.callback_url:
+        try:
+            await run_in_thread(validate_callback_url, request.callback_url)
+        except InvalidCallbackUrlException as e:
+            return JSONResponse(
+                status_code=e.status_code,
+                content={"code": e.code, "message": e.detail}
+            )
+
+    # 언어는 정리한 형태("ko,ja")로 저장 -> 워커가 다시 파싱해도 같은 결과
+    job = await run_in_thread(
+        job_store.create, video.url, ",".join(languages), request.callback_url
+    )
+    return job_to_payload(job)
+
+
+@router.get("/jobs/stats")
+async def job_stats():
+    """
+    [작업 큐 현황] 대기/실행/완료/실패 작업 수와 재시도 횟수
+    """
+    return await job_workers.stats()
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_analysis_job(job_id: str):
+    """
+    분석 작업 상태 조회 API
+    """
+    job = await run_in_thread(job_store.get, job_id)
+    if job is None:
+        return JSONResponse(
+            status_code=404,
+            content={"code": "JOB_NOT_FOUND", "message": "요청하신 작업을 찾을 수 없습니다."}
+        )
+    return job_to_payload(job)
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    [캐시 현황] 분석 결과 캐시의 적중/실패 횟수와
+    중복 요청 합치기(single-flight), 워커 공용 캐시 현황을 확인합니다.
+    """
+    return {
+        **result_cache.stats(),
+        "inFlight": inflight_analyses.in_flight(),
+        "coalesced": inflight_analyses.coalesced,
+        "transcripts": transcript_store.stats(),
+        "expressionIndex": expression_index.stats() if expression_index else None,
+        "prefilter": dict(prefilter_totals),
+        "llm": dict(llm_cache_metrics),
+        # 워커 공용 캐시 (파일 하나를 모든 워커가 공유, 적중 수는 이 워커 기준)
+        "shared": await run_in_thread(shared_cache.stats),
+    }
@@ -0,0 +1,208 @@
+"""
+=============================================================================
+[Production Server]
+설명: 운영용 실행 진입점입니다. (run_ngrok.py는 개발용 터널)
+      CPU 코어 수만큼 uvicorn 워커 프로세스를 띄우고 죽은 워커는 다시 띄웁니다.
+핵심: - preload: 부모 프로세스가 앱(app.main)을 한 번만 import한 뒤 워커를 fork
+        -> 무거운 import(Gemini SDK, FastAPI, pydantic ...)와 설정 읽기를 워커마다 반복하지 않음
+        -> gc.freeze()로 import한 객체를 GC 대상에서 빼서 fork 후 메모리 복사(copy-on-write)도 줄임
+        (연결/스레드/SQLite는 fork 전에 만들지 않음 -> 각 워커의 lifespan에서 준비)
+      - 포트는 부모가 한 번 열고 모든 워커가 같은 소켓에서 연결을 받음
+      - SIGTERM/SIGINT: 워커마다 새 연결을 막고 /ready를 503으로 내린 뒤
+        진행 중인 요청/작업을 SERVE_GRACEFUL_TIMEOUT_SECONDS까지 마저 처리하고 종료
+        (그래도 안 끝난 워커는 SIGKILL)
+실행: python -m app.serve                       (설정값 SERVE_* 사용)
+      python -m app.serve --workers 4 --port 8000 --no-preload
+=============================================================================
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import sys
+import time
+
+import uvicorn
+
+from app.core.config import settings
+
+# 로거 설정
+logger = logging.getLogger("app.serve")
+
+# 워커가 시작 직후 이 시간(초) 안에 죽으면 "시작 실패"로 보고 다시 띄우지 않음 (무한 재시작 방지)
+_BOOT_FAILURE_SECONDS = 5.0
+# 부모가 워커 상태를 확인하는 주기 (초)
+_POLL_SECONDS = 0.2
+
+
+def default_workers() -> int:
+    """이 프로세스가 쓸 수 있는 CPU 코어 수 (컨테이너 CPU 제한(affinity) 반영)"""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+class _WorkerServer(uvicorn.Server):
+    """종료 신호를 받는 즉시 /ready를 내리는 uvicorn 서버 (로드밸런서가 먼저 빼도록)"""
+
+    def handle_exit(self, sig, frame) -> None:
+        from app.core.lifecycle import server_state
+
+        server_state.begin_drain()
+        super().handle_exit(sig, frame)
+
+
+def _worker_config(app, args) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        host=args.host,
+        port=args.port,
+        backlog=settings.serve_backlog,
+        timeout_keep_alive=settings.serve_keepalive_seconds,
+        timeout_graceful_shutdown=int(settings.serve_graceful_timeout_seconds),
+        lifespan="on",
+        log_level=args.log_level,
+        access_log=args.access_log,
+        proxy_headers=True,
+    )
+
+
+def _run_worker(sock, args) -> None:
+    """(fork된 자식 프로세스) 워커 하나 실행 -> 끝나면 프로세스 종료"""
+    # 부모의 신호 처리기를 물려받지 않도록 초기화 (uvicorn이 자기 처리기를 설치함)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    code = 0
+    try:
+        # preload가 아니면 여기서 처음 import (워커마다 따로)
+        from app.main import app
+
+        _WorkerServer(_worker_config(app, args)).run(sockets=[sock])
+    except BaseException:
+        logger.exception(f"워커 비정상 종료 (pid {os.getpid()})")
+        code = 1
+    finally:
+        logging.shutdown()
+        os._exit(code)
+
+
+class Arbiter:
+    """워커 프로세스들을 띄우고, 죽으면 다시 띄우고, 종료 신호를 전달하는 부모 프로세스"""
+
+    def __init__(self, sock, args):
+        self.sock = sock
+        self.args = args
+        # pid -> 시작 시각
+        self.workers: dict[int, float] = {}
+        self.stopping = False
+        self.stop_deadline = 0.0
+        self.exit_code = 0
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(self.sock, self.args)
+        self.workers[pid] = time.monotonic()
+        logger.info(f"워커 시작 (pid {pid})")
+
+    def handle_stop(self, sig, frame) -> None:
+        if self.stopping:
+            # 두 번째 신호: 기다리지 않고 바로 강제 종료
+            self.stop_deadline = 0.0
+            return
+        logger.info(f"종료 신호({signal.Signals(sig).name}) 수신: 워커 {len(self.workers)}개 정리 시작")
+        self.stopping = True
+        # 워커의 종료 대기 시간 + 여유 (lifespan 종료 작업 시간)
+        self.stop_deadline = time.monotonic() + settings.serve_graceful_timeout_seconds + 5
+        for pid in self.workers:
+            self._signal(pid, signal.SIGTERM)
+
+    @staticmethod
+    def _signal(pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def reap(self) -> None:
+        """끝난 워커를 거두고, 운영 중이면 다시 띄움"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                logger.info(f"워커 종료 (pid {pid}, 코드 {code})")
+                continue
+
+            logger.warning(f"워커가 예기치 않게 종료됨 (pid {pid}, 코드 {code})")
+            if time.monotonic() - started < _BOOT_FAILURE_SECONDS and code != 0:
+                # 시작하자마자 죽는 워커를 계속 다시 띄우지 않음 (설정/코드 오류)
+                logger.error("워커 시작 실패: 서버를 종료합니다.")
+                self.exit_code = 1
+                self.handle_stop(signal.SIGTERM, None)
+                continue
+            self.spawn()
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        for _ in range(self.args.workers):
+            self.spawn()
+
+        while self.workers:
+            time.sleep(_POLL_SECONDS)
+            self.reap()
+            if self.stopping and self.workers and time.monotonic() > self.stop_deadline:
+                logger.warning(f"종료 대기 시간 초과: 워커 {len(self.workers)}개 강제 종료")
+                for pid in list(self.workers):
+                    self._signal(pid, signal.SIGKILL)
+                self.stop_deadline = float("inf")
+        return self.exit_code
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="QuickEng 운영 서버 (여러 워커 프로세스)")
+    parser.add_argument("--host", default=settings.serve_host)
+    parser.add_argument("--port", type=int, default=settings.serve_port)
+    parser.add_argument("--workers", type=int, default=settings.serve_workers or default_workers(),
+                        help="워커 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=settings.serve_preload,
+                        help="부모 프로세스에서 앱을 한 번만 import한 뒤 fork")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--access-log", action=argparse.BooleanOptionalAction, default=False)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(process)d %(name)s %(levelname)s %(message)s")
+
+    if args.preload:
+        started = time.perf_counter()
+        import app.main  # noqa: F401 (워커들이 fork로 물려받음)
+
+        # import로 만들어진 객체를 GC 대상에서 빼둠 -> 워커에서 GC가 건드려 메모리 페이지가 복사되지 않도록
+        gc.collect()
+        gc.freeze()
+        logger.info(f"앱 미리 로드 완료 ({time.perf_counter() - started:.2f}초)")
+
+    # 포트는 부모가 한 번만 열고 모든 워커가 같은 소켓을 공유
+    sock = uvicorn.Config("app.main:app", host=args.host, port=args.port, backlog=settings.serve_backlog).bind_socket()
+    sock.set_inheritable(True)
+    logger.info(f"http://{args.host}:{args.port} 에서 워커 {args.workers}개로 시작 (preload={args.preload})")
+
+    code = Arbiter(sock, args).run()
+    sock.close()
+    logger.info("서버 종료")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
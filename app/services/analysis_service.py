@@ -0,0 +1,516 @@
+"""
+=============================================================================
+[Analysis Service]
+설명: 영상 하나를 분석하는 전체 흐름(캐시 → 자막 → Gemini)을 묶어둔 곳입니다.
+핵심: 같은 영상에 대한 요청이 동시에 몰리면 실제 작업은 한 번만 돌리고
+      모든 요청이 그 결과(또는 에러)를 함께 받습니다. (Single-flight)
+      결과 캐시는 영상당 하나이고 카드마다 지금까지 만든 모든 언어의 뜻을 모아 둡니다.
+      -> 처음 요청한 언어들은 분석 프롬프트 한 번으로 함께 만들고,
+         나중에 다른 언어를 요청하면 자막 없이 표현만 보내 그 언어의 뜻만 더합니다.
+      배치 요청도 같은 single-flight 키와 분석 흐름을 쓰고, Gemini 호출만 짧은 자막끼리 묶습니다.
+=============================================================================
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Optional, Union
+
+from app.core.config import settings
+from app.core.exceptions import BusinessException, AIUnknownException, UpstreamUnavailableException
+from app.core.metrics import degraded_responses, span
+from app.core.singleflight import SingleFlight
+from app.models.schemas import VideoRef
+from app.services.youtube_service import get_transcript_list
+from app.services.gemini_service import (
+    extract_vocabulary,
+    extract_vocabulary_batch,
+    stream_vocabulary,
+    translate_meanings,
+    estimate_tokens,
+    transcript_to_text,
+    RESULT_VERSION,
+)
+from app.services.cache_service import result_cache, make_result_key
+from app.services.transcript_filter import filter_transcript
+from app.services.offline_vocabulary import offline_vocabulary
+from app.services.expression_index import lookup_known, normalize_expression, record_expressions
+from app.services.languages import merge_languages, missing_languages
+from app.services.transcript_anchor import TranscriptIndex, anchor_items, build_transcript_slice
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 진행 중인 분석 작업 목록 (워커 프로세스 단위)
+# API 요청이 시작한 분석은 그 요청과 별개로 요청 하나만큼의 마감 시간을 새로 받음
+inflight_analyses = SingleFlight(deadline_seconds=settings.request_deadline_seconds)
+
+# 자막 다듬기(전처리)로 줄어든 토큰 누적치
+prefilter_totals = {"requests": 0, "tokensBefore": 0, "tokensAfter": 0}
+
+
+def _prepare_transcript(transcript_data, video: VideoRef):
+    """
+    Gemini에 보내기 전 자막 다듬기 (추임새/주석/반복 제거, 선택적으로 문장 선별)
+    요청마다 줄어든 토큰 수를 로그로 남깁니다.
+    """
+    if not settings.prefilter_enabled:
+        return transcript_data
+
+    with span("prefilter"):
+        filtered, report = filter_transcript(transcript_data, settings.prefilter_max_tokens)
+    prefilter_totals["requests"] += 1
+    prefilter_totals["tokensBefore"] += report["tokensBefore"]
+    prefilter_totals["tokensAfter"] += report["tokensAfter"]
+    logger.info(
+        f"자막 전처리 ({video.video_id}): 토큰 {report['tokensBefore']} -> {report['tokensAfter']}, "
+        f"조각 {report['snippetsBefore']} -> {report['snippetsAfter']}"
+    )
+    return filtered
+
+
+async def _degraded_result(cache_key: str, transcript_data, error: UpstreamUnavailableException) -> list[dict]:
+    """
+    외부 서비스 서킷이 열렸을 때의 대체 결과 (캐시에는 저장하지 않음)
+    1. 만료됐지만 남아 있는 예전 분석 결과
+    2. 자막이 있으면 오프라인 관용 표현 사전에서 찾은 표현
+    둘 다 없으면 원래 에러(503)를 그대로 던짐
+    """
+    stale = await result_cache.get_stale(cache_key)
+    if stale is not None:
+        degraded_responses.inc(kind="stale_cache")
+        logger.warning(f"{error.upstream} 장애로 만료된 분석 결과를 대신 반환합니다. ({cache_key})")
+        return stale
+
+    if transcript_data is not None:
+        vocabulary_data = offline_vocabulary(transcript_to_text(transcript_data))
+        if vocabulary_data:
+            degraded_responses.inc(kind="offline")
+            logger.warning(f"{error.upstream} 장애로 오프라인 단어장을 대신 반환합니다. ({cache_key})")
+            return anchor_items(vocabulary_data, transcript_data)
+
+    raise error
+
+
+async def _analyze_uncached(
+    video: VideoRef,
+    languages: tuple[str, ...],
+    cache_key: str,
+    batch: Optional["_BatchPacker"] = None,
+) -> list[dict]:
+    """
+    캐시에 없을 때 실제로 YouTube / Gemini를 호출합니다. (뜻은 languages 전부를 한 번에)
+    batch를 주면 자막 수집은 배치의 동시 실행 수 안에서, Gemini 분석은 다른 짧은 자막과 묶어서 합니다.
+    """
+    transcript_data = raw_transcript = None
+    try:
+        # 1. 자막 추출 (YouTube Service, 뜻 언어와 상관없이 원본은 영어 자막)
+        # 반환값: [{'text': 'Hello', 'start': 0.0, 'duration': 1.5}, ...]
+        if batch is None:
+            raw_transcript = await get_transcript_list(video, settings.transcript_source_lang)
+        else:
+            async with batch.fanout:
+                raw_transcript = await get_transcript_list(video, settings.transcript_source_lang)
+        transcript_data = _prepare_transcript(raw_transcript, video)
+
+        # 2. 표현 색인에서 이미 아는 표현 찾기 (짧은 자막만, 긴 자막은 구간별로 Gemini가 뽑음)
+        full_text = transcript_to_text(transcript_data)
+        known_items = []
+        if estimate_tokens(full_text) <= settings.gemini_window_token_budget:
+            known_items = await lookup_known(full_text, limit=3)
+
+        # 3. 핵심 표현 추출 (Gemini Service, 색인에서 채운 만큼은 묻지 않음)
+        # 반환값: [{'id': '...', 'expression': '...', 'meaning': {'ko': '...'}, 'contextTag': '...'}, ...]
+        if batch is None:
+            vocabulary_data = await extract_vocabulary(transcript_data, known_items, languages)
+        else:
+            vocabulary_data = await batch.extract(cache_key, transcript_data, known_items, languages)
+    except UpstreamUnavailableException as e:
+        return await _degraded_result(cache_key, transcript_data, e)
+
+    # 4. Gemini가 새로 분석한 카드만 색인에 추가 (색인에서 온 카드를 다시 세지 않도록)
+    known_keys = {normalize_expression(item["expression"]) for item in known_items}
+    await record_expressions(
+        [item for item in vocabulary_data if normalize_expression(item["expression"]) not in known_keys],
+        full_text,
+    )
+
+    # 5. 카드마다 자막 속 위치(start/end)와 주변 문장 붙이기 (다듬은 자막에 없으면 원본에서)
+    with span("anchor"):
+        vocabulary_data = anchor_items(vocabulary_data, transcript_data, raw_transcript)
+
+    # 6. 다음 요청을 위해 결과 저장 (에러는 저장하지 않음)
+    await result_cache.set(cache_key, vocabulary_data)
+    return vocabulary_data
+
+
+async def _translate_missing(cache_key: str, vocabulary_data: list[dict], missing: tuple[str, ...]) -> list[dict]:
+    """
+    뜻이 빠진 언어만 번역해서 합치고, 결과 캐시에 저장된 결과였다면 캐시에도 더해 둠
+    (캐시/진행 중 작업이 함께 쓰는 카드 dict는 바꾸지 않고 복사본에 합침)
+    """
+    targets = [
+        index for index, item in enumerate(vocabulary_data)
+        if any(not (item.get("meaning") or {}).get(code) for code in missing)
+    ]
+    try:
+        translated = await translate_meanings([vocabulary_data[index] for index in targets], missing)
+    except UpstreamUnavailableException as e:
+        # Gemini 장애: 있는 언어의 뜻만으로 응답 (빠진 언어는 다음 요청에서 다시 시도)
+        degraded_responses.inc(kind="untranslated")
+        logger.warning(f"{e.upstream} 장애로 뜻 번역 없이 반환합니다. ({cache_key}, {','.join(missing)})")
+        return vocabulary_data
+
+    vocabulary_data = list(vocabulary_data)
+    for index, item in zip(targets, translated):
+        vocabulary_data[index] = item
+
+    # 번역하는 동안 다른 언어 번역이 먼저 저장됐을 수 있으므로 최신 캐시 값에 합쳐서 저장
+    # (새로 분석되어 카드가 바뀌었거나, 캐시에 없는 대체 결과였다면 저장하지 않음)
+    cached = await result_cache.get_stale(cache_key)
+    if cached is not None and [item.get("id") for item in cached] == [item.get("id") for item in vocabulary_data]:
+        merged = [
+            {**old, "meaning": {**(old.get("meaning") or {}), **(new.get("meaning") or {})}}
+            for old, new in zip(cached, vocabulary_data)
+        ]
+        await result_cache.set(cache_key, merged)
+        return merged
+    return vocabulary_data
+
+
+async def _ensure_languages(cache_key: str, vocabulary_data: list[dict], languages: tuple[str, ...]) -> list[dict]:
+    """
+    요청한 언어의 뜻이 모두 있으면 그대로, 빠진 언어가 있으면 그 언어만 번역해서 더함
+    같은 (영상, 빠진 언어) 번역이 동시에 몰리면 한 번만 요청합니다.
+    """
+    missing = missing_languages(vocabulary_data, languages)
+    if not missing:
+        return vocabulary_data
+    return await inflight_analyses.do(
+        f"{cache_key}#{','.join(missing)}",
+        lambda: _translate_missing(cache_key, vocabulary_data, missing),
+    )
+
+
+async def analyze(video: VideoRef, languages: tuple[str, ...]) -> list[dict]:
+    """
+    [메인 함수] 영상의 단어장 데이터를 반환합니다. (카드의 meaning에는 요청한 언어가 모두 들어 있음)
+    1. 캐시에 있으면 바로 사용 (YouTube / Gemini 호출 없음)
+    2. 같은 영상을 이미 누가 분석 중이면 그 작업에 합류
+    3. 둘 다 아니면 새로 분석 (요청한 언어들의 뜻을 한 번에 생성)
+    4. 캐시/합류한 결과에 없는 언어가 있으면 그 언어의 뜻만 번역해서 더함
+    """
+    cache_key = make_result_key(video.video_id, RESULT_VERSION)
+
+    with span("cache_lookup"):
+        vocabulary_data = await result_cache.get(cache_key)
+    if vocabulary_data is None:
+        vocabulary_data = await inflight_analyses.do(
+            cache_key,
+            lambda: _analyze_uncached(video, languages, cache_key),
+        )
+
+    return await _ensure_languages(cache_key, vocabulary_data, languages)
+
+
+async def refresh(video: VideoRef, languages: tuple[str, ...]) -> list[dict]:
+    """
+    캐시를 건너뛰고 새로 분석해서 결과를 저장합니다. (캐시 미리 채우기용)
+    같은 영상을 이미 누가 분석 중이면 그 작업에 합류합니다.
+    """
+    cache_key = make_result_key(video.video_id, RESULT_VERSION)
+    vocabulary_data = await inflight_analyses.do(
+        cache_key,
+        lambda: _analyze_uncached(video, languages, cache_key),
+    )
+    return await _ensure_languages(cache_key, vocabulary_data, languages)
+
+
+async def transcript_slice(video: VideoRef, items: list[dict], encoding: str) -> Optional[dict]:
+    """
+    카드 주변 자막 조각 (includeTranscript 요청용, 분석 직후라 보통 자막 저장소에서 바로 나옴)
+    조각을 못 만들어도 분석 결과는 그대로 돌려줘야 하므로 실패는 로그만 남기고 None
+    """
+    try:
+        transcript_data = await get_transcript_list(video, settings.transcript_source_lang)
+        with span("transcript_slice"):
+            return build_transcript_slice(transcript_data, items, encoding)
+    except BusinessException as e:
+        logger.warning(f"자막 조각 생성 실패 ({video.video_id}): {e.code}")
+        return None
+
+
+async def stream_analysis(video: VideoRef, languages: tuple[str, ...]) -> AsyncIterator[dict]:
+    """
+    [스트리밍 분석] 진행 상황을 이벤트(dict)로 하나씩 내보냅니다.
+    {"event": "transcript", "videoId": ...}  : 자막 준비 완료
+    {"event": "item", "item": {...}}         : 단어 카드 하나 완성
+    {"event": "done", "videoId": ..., "count": n}
+    (에러는 BusinessException 그대로 발생 -> 라우터에서 error 이벤트로 변환)
+    """
+    cache_key = make_result_key(video.video_id, RESULT_VERSION)
+
+    # 캐시에 있으면 YouTube 호출 없이 그대로 흘려보냄 (빠진 언어의 뜻만 번역해서 더함)
+    vocabulary_data = await result_cache.get(cache_key)
+    if vocabulary_data is not None:
+        vocabulary_data = await _ensure_languages(cache_key, vocabulary_data, languages)
+        yield {"event": "transcript", "videoId": video.video_id, "cached": True}
+        for item in vocabulary_data:
+            yield {"event": "item", "item": item}
+        yield {"event": "done", "videoId": video.video_id, "count": len(vocabulary_data)}
+        return
+
+    try:
+        raw_transcript = await get_transcript_list(video, settings.transcript_source_lang)
+    except UpstreamUnavailableException as e:
+        # YouTube 서킷이 열림: analyze()와 같이 만료된 결과로 대신 (없으면 503 그대로)
+        vocabulary_data = await _degraded_result(cache_key, None, e)
+        yield {"event": "transcript", "videoId": video.video_id, "cached": True}
+        for item in vocabulary_data:
+            yield {"event": "item", "item": item}
+        yield {"event": "done", "videoId": video.video_id, "count": len(vocabulary_data)}
+        return
+
+    transcript_data = _prepare_transcript(raw_transcript, video)
+    yield {"event": "transcript", "videoId": video.video_id, "cached": False}
+
+    vocabulary_data = []
+    index = TranscriptIndex(transcript_data)
+    try:
+        async for item in stream_vocabulary(transcript_data, languages):
+            item = index.anchor(item)
+            vocabulary_data.append(item)
+            yield {"event": "item", "item": item}
+    except UpstreamUnavailableException as e:
+        # Gemini 서킷이 열림 (카드를 보내기 전에만 발생): 만료된 결과 -> 오프라인 사전 순서로 대신
+        vocabulary_data = await _degraded_result(cache_key, transcript_data, e)
+        for item in vocabulary_data:
+            yield {"event": "item", "item": item}
+        # 대체 결과는 캐시/표현 색인에 저장하지 않음
+        yield {"event": "done", "videoId": video.video_id, "count": len(vocabulary_data)}
+        return
+
+    # 끝까지 받은 경우에만 캐시/표현 색인에 저장 (중간에 끊기면 저장 안 함)
+    await result_cache.set(cache_key, vocabulary_data)
+    await record_expressions(vocabulary_data, transcript_to_text(transcript_data))
+    yield {"event": "done", "videoId": video.video_id, "count": len(vocabulary_data)}
+
+
+# =============================================================================
+# 배치 분석 (피드 미리 불러오기용)
+# =============================================================================
+# 배치 항목 하나의 결과: 단어장 리스트 또는 BusinessException
+BatchOutcome = Union[list[dict], BusinessException]
+
+
+def _as_business_exception(error: BaseException) -> BusinessException:
+    if isinstance(error, BusinessException):
+        return error
+    logger.error(f"배치 분석 중 알 수 없는 오류: {str(error)}")
+    return AIUnknownException(debug_message=str(error))
+
+
+def _pack_by_token_budget(transcripts: dict[str, object], budget: int) -> list[list[str]]:
+    """
+    자막들을 토큰 예산 안에서 묶습니다. (앞에서부터 순서대로 채우기)
+    예산보다 긴 자막은 혼자 한 묶음이 됩니다.
+    """
+    groups: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+    for key, transcript in transcripts.items():
+        tokens = estimate_tokens(transcript_to_text(transcript))
+        if current and current_tokens + tokens > budget:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(key)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _extract_group(
+    transcripts: dict[str, object],
+    group: list[str],
+    languages: dict[str, tuple[str, ...]],
+) -> dict[str, BatchOutcome]:
+    """
+    묶음 하나를 Gemini로 분석 (묶음 응답이 깨지면 깨진 영상만 하나씩 다시 분석)
+    뜻은 묶음 안 영상들이 요청한 언어를 모두 합쳐서 한 번에 만듦
+    """
+    results: dict[str, BatchOutcome] = {}
+    if len(group) > 1:
+        try:
+            group_languages = merge_languages(languages[key] for key in group)
+            batch = await extract_vocabulary_batch({key: transcripts[key] for key in group}, group_languages)
+            results = {key: outcome for key, outcome in batch.items() if isinstance(outcome, list)}
+            if len(results) < len(group):
+                logger.warning(f"묶음 응답 일부 파싱 실패, 개별 분석으로 재시도 ({len(group) - len(results)}개)")
+        except UpstreamUnavailableException as e:
+            # 서킷이 열림: 하나씩 다시 불러도 똑같이 막히므로 바로 각 영상의 대체 결과로
+            return {key: e for key in group}
+        except BusinessException as e:
+            logger.warning(f"묶음 분석 실패, 개별 분석으로 재시도 ({e.code}, {len(group)}개)")
+
+    retry = [key for key in group if key not in results]
+    outcomes = await asyncio.gather(
+        *(extract_vocabulary(transcripts[key], languages=languages[key]) for key in retry),
+        return_exceptions=True,
+    )
+    for key, outcome in zip(retry, outcomes):
+        # 서킷 열림(503)은 그대로 넘겨야 각 영상이 대체 결과를 찾음 (_analyze_uncached)
+        results[key] = outcome if isinstance(outcome, list) else _as_business_exception(outcome)
+    return results
+
+
+class _BatchPacker:
+    """
+    배치에서 새로 분석을 맡은(single-flight 작업을 시작한) 영상들의 Gemini 분석만 모아서 처리
+    - 자막 준비/표현 색인/위치 붙이기/캐시 저장은 단일 분석(_analyze_uncached)과 같은 흐름
+    - 맡은 영상이 모두 자막을 준비하면(또는 실패해서 빠지면) 짧은 자막끼리 토큰 예산 안에서 묶어 분석
+    - 색인에서 카드를 채운 영상은 프롬프트가 달라지므로 묶지 않고 따로 분석
+    """
+
+    def __init__(self):
+        self.fanout = asyncio.Semaphore(settings.batch_transcript_fanout)
+        self._waiting: set[str] = set()     # 아직 자막을 준비 중인 영상
+        self._ready: dict[str, tuple] = {}  # 캐시 키 -> (자막, 뜻 언어)
+        self._futures: dict[str, asyncio.Future] = {}
+        self._runs: set[asyncio.Task] = set()
+
+    def expect(self, cache_key: str) -> None:
+        self._waiting.add(cache_key)
+
+    def leave(self, cache_key: str) -> None:
+        """자막 준비가 끝났거나 실패한 영상은 더 기다리지 않음 (여러 번 불러도 됨)"""
+        self._waiting.discard(cache_key)
+        if self._waiting or not self._ready:
+            return
+        ready, self._ready = self._ready, {}
+        task = asyncio.ensure_future(self._run(ready))
+        self._runs.add(task)
+        task.add_done_callback(self._runs.discard)
+
+    async def extract(
+        self,
+        cache_key: str,
+        transcript_data,
+        known_items: list[dict],
+        languages: tuple[str, ...],
+    ) -> list[dict]:
+        if known_items:
+            self.leave(cache_key)
+            return await extract_vocabulary(transcript_data, known_items, languages)
+        future = asyncio.get_running_loop().create_future()
+        self._futures[cache_key] = future
+        self._ready[cache_key] = (transcript_data, languages)
+        self.leave(cache_key)
+        return await future
+
+    async def _run(self, ready: dict[str, tuple]) -> None:
+        transcripts = {key: transcript for key, (transcript, _) in ready.items()}
+        languages = {key: item_languages for key, (_, item_languages) in ready.items()}
+        try:
+            groups = _pack_by_token_budget(transcripts, settings.batch_prompt_token_budget)
+            results: dict[str, BatchOutcome] = {}
+            for group_result in await asyncio.gather(
+                *(_extract_group(transcripts, group, languages) for group in groups)
+            ):
+                results.update(group_result)
+        except Exception as e:
+            results = {key: _as_business_exception(e) for key in ready}
+
+        for key, outcome in results.items():
+            future = self._futures.pop(key)
+            if future.done():
+                continue
+            if isinstance(outcome, list):
+                future.set_result(outcome)
+            else:
+                future.set_exception(outcome)
+
+
+async def _analyze_in_batch(packer: _BatchPacker, video: VideoRef, languages: tuple[str, ...], cache_key: str):
+    try:
+        return await _analyze_uncached(video, languages, cache_key, packer)
+    finally:
+        packer.leave(cache_key)
+
+
+async def analyze_batch(
+    items: list[tuple[Union[VideoRef, BusinessException], tuple[str, ...]]],
+) -> list[tuple[Optional[str], BatchOutcome]]:
+    """
+    [배치 메인 함수] (VideoRef 또는 링크/언어 검증 에러, 뜻 언어들) 목록을 받아
+    같은 순서로 (video_id, 단어장 또는 에러) 목록을 반환합니다.
+    (링크 검증은 라우터에서 네트워크 호출 전에 한꺼번에 끝냄 -> parse_video_urls)
+    1. 캐시 확인
+    2. 캐시에 없는 영상은 단일 분석과 같은 single-flight 키로 등록
+       (같은 영상을 /analyze가 이미 분석 중이면 합류, 새로 맡은 영상은 자막을 동시에 받아오고
+        짧은 자막끼리 토큰 예산 안에서 묶어 Gemini 호출 횟수 줄이기)
+    3. 항목별로 빠진 언어의 뜻만 번역해서 더하기
+    """
+    video_ids: list[Optional[str]] = [None] * len(items)
+    outcomes: list[Optional[BatchOutcome]] = [None] * len(items)
+    # 캐시 키 -> 그 결과를 기다리는 항목 번호들 (같은 영상이 여러 번 들어와도 한 번만 분석)
+    pending: dict[str, list[int]] = {}
+    sources: dict[str, VideoRef] = {}
+    # 캐시 키 -> 그 영상을 요청한 항목들의 언어를 합친 것 (분석 프롬프트 한 번에 모두 생성)
+    languages: dict[str, tuple[str, ...]] = {}
+    # 항목 번호 -> 캐시 키 (3단계 언어 확인용)
+    keys_by_index: dict[int, str] = {}
+
+    # ---------------------------------------------------------
+    # 1. 캐시 확인 (잘못된 링크/언어는 이미 에러로 들어옴)
+    # ---------------------------------------------------------
+    for index, (video, item_languages) in enumerate(items):
+        if isinstance(video, BusinessException):
+            outcomes[index] = video
+            continue
+
+        video_ids[index] = video.video_id
+        cache_key = make_result_key(video.video_id, RESULT_VERSION)
+        keys_by_index[index] = cache_key
+        cached = await result_cache.get(cache_key)
+        if cached is not None:
+            outcomes[index] = cached
+            continue
+
+        pending.setdefault(cache_key, []).append(index)
+        sources[cache_key] = video
+        languages[cache_key] = merge_languages((languages.get(cache_key, ()), item_languages))
+
+    # ---------------------------------------------------------
+    # 2. 새로 분석 (single-flight 등록은 await 없이 한꺼번에 -> 어느 영상을 맡았는지 바로 앎)
+    # ---------------------------------------------------------
+    packer = _BatchPacker()
+    waits = []
+    for key in pending:
+        started, wait = inflight_analyses.join(
+            key, lambda key=key: _analyze_in_batch(packer, sources[key], languages[key], key)
+        )
+        if started:
+            packer.expect(key)
+        waits.append(wait)
+
+    for key, outcome in zip(pending, await asyncio.gather(*waits, return_exceptions=True)):
+        if not isinstance(outcome, list):
+            outcome = _as_business_exception(outcome)
+        for index in pending[key]:
+            outcomes[index] = outcome
+
+    # ---------------------------------------------------------
+    # 3. 빠진 언어의 뜻 번역 (캐시 적중 항목, 다른 요청의 분석에 합류한 항목, 묶음 분석에서 뜻이 빠진 항목)
+    # ---------------------------------------------------------
+    async def ensure(index: int) -> BatchOutcome:
+        try:
+            return await _ensure_languages(keys_by_index[index], outcomes[index], items[index][1])
+        except Exception as e:
+            # 취소(CancelledError)는 잡지 않음 -> 클라이언트가 끊기면 번역도 함께 멈춤
+            return _as_business_exception(e)
+
+    indexes = [index for index, outcome in enumerate(outcomes) if isinstance(outcome, list)]
+    for index, outcome in zip(indexes, await asyncio.gather(*(ensure(index) for index in indexes))):
+        outcomes[index] = outcome
+
+    return list(zip(video_ids, outcomes))
@@ -0,0 +1,323 @@
+"""
+=============================================================================
+[Result Cache Service]
+설명: 같은 영상(video_id)에 대한 분석 결과를 저장해 두었다가 재사용합니다.
+핵심: 1단계 - 프로세스 메모리 LRU (TTL + 최대 개수 제한)
+      2단계 - 영구 저장소 (워커 공용 캐시 / SQLite / 로컬 파일, 서버 재시작 후에도 유지)
+      캐시에 있으면 YouTube / Gemini 서비스를 아예 호출하지 않습니다.
+=============================================================================
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.metrics import run_in_thread
+from app.core.sqlite import ProcessLocalConnection
+from app.services.shared_cache import shared_cache
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+
+def make_result_key(video_id: str, version: str) -> str:
+    """
+    캐시 키 생성: 영상 ID + (모델/프롬프트 버전)
+    예: "jNQXAC9IVRw:gemini-2.5-flash/v4"
+    (언어는 키에 넣지 않음 -> 카드마다 지금까지 만든 모든 언어의 뜻을 한 항목에 모아 둠)
+    """
+    return f"{video_id}:{version}"
+
+
+# =============================================================================
+# 2단계: 영구 저장소 (Persistent Backend)
+# =============================================================================
+class CacheBackend:
+    """
+    영구 저장소 인터페이스. 값은 JSON 문자열로 저장합니다.
+    (새 저장소를 추가하려면 get / set / delete 세 개만 구현하면 됩니다)
+    """
+
+    def get(self, key: str) -> Optional[tuple[str, float]]:
+        """(payload, expires_at) 반환, 없으면 None"""
+        raise NotImplementedError
+
+    def set(self, key: str, payload: str, expires_at: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def recent(self, limit: int) -> list[tuple[str, str, float]]:
+        """만료가 가장 늦은(= 최근에 저장한) 항목 limit개 (key, payload, expires_at) - 서버 시작 시 미리 올리기용"""
+        return []
+
+
+class SQLiteBackend(CacheBackend):
+    """SQLite 파일 하나에 저장 (기본값)"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        # 연결은 처음 쓸 때 엶 (preload 후 fork된 워커마다 따로)
+        self._db = ProcessLocalConnection(path, setup=self._setup, check_same_thread=False)
+
+    @staticmethod
+    def _setup(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache ("
+            " key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    def get(self, key: str) -> Optional[tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, payload: str, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, payload, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def recent(self, limit: int) -> list[tuple[str, str, float]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT key, payload, expires_at FROM result_cache WHERE expires_at > ?"
+                " ORDER BY expires_at DESC LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+
+
+class FileBackend(CacheBackend):
+    """키 하나당 JSON 파일 하나로 저장 (디렉토리 기반)"""
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # 키에 ':' '/' 같은 문자가 있으므로 해시값을 파일명으로 사용
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self._directory, f"{digest}.json")
+
+    def get(self, key: str) -> Optional[tuple[str, float]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return record["payload"], record["expires_at"]
+
+    def set(self, key: str, payload: str, expires_at: float) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"payload": payload, "expires_at": expires_at}, f, ensure_ascii=False)
+        # 쓰는 도중 다른 요청이 반쯤 쓴 파일을 읽지 않도록 교체 방식으로 저장
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+# =============================================================================
+# 1단계 + 2단계를 묶은 결과 캐시
+# =============================================================================
+class ResultCache:
+    """
+    메모리 LRU(1단계) → 영구 저장소(2단계) 순서로 조회합니다.
+    2단계에서 찾은 값은 1단계로 다시 올려서 다음 조회를 빠르게 합니다.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int, backend: Optional[CacheBackend] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.backend = backend
+        # key -> (value, expires_at), 가장 최근에 쓴 항목이 맨 뒤
+        self._memory: "OrderedDict[str, tuple[Any, float]]" = OrderedDict()
+
+        # 캐시 적중/실패 카운터
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    # ---------------------------------------------------------
+    # 1단계: 메모리 LRU
+    # ---------------------------------------------------------
+    def _memory_get(self, key: str) -> Optional[Any]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            # TTL 만료 -> 미스 처리 (외부 장애 때 대신 쓸 수 있도록 개수 제한으로만 제거)
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_set(self, key: str, value: Any, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        # 개수 제한 초과 시 가장 오래 안 쓴 항목부터 제거
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # ---------------------------------------------------------
+    # 외부에서 호출하는 함수
+    # ---------------------------------------------------------
+    async def get(self, key: str) -> Optional[Any]:
+        value = self._memory_get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        if self.backend is not None:
+            try:
+                record = await run_in_thread(self.backend.get, key)
+            except Exception as e:
+                # 캐시 장애가 분석 자체를 막으면 안 되므로 로그만 남기고 미스 처리
+                logger.error(f"결과 캐시 조회 실패: {str(e)}")
+                record = None
+
+            if record is not None:
+                payload, expires_at = record
+                if expires_at > time.time():
+                    value = json.loads(payload)
+                    self._memory_set(key, value, expires_at)
+                    self.persistent_hits += 1
+                    return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self._memory_set(key, value, expires_at)
+
+        if self.backend is not None:
+            try:
+                payload = json.dumps(value, ensure_ascii=False)
+                await run_in_thread(self.backend.set, key, payload, expires_at)
+            except Exception as e:
+                logger.error(f"결과 캐시 저장 실패: {str(e)}")
+
+    async def preload(self, limit: int) -> int:
+        """
+        영구 저장소에서 최근 결과 limit개를 메모리(1단계)로 미리 올림 (서버 시작 시)
+        -> 재시작 직후 인기 영상 요청이 디스크 조회 없이 바로 적중 -> 올린 개수
+        """
+        if self.backend is None or limit <= 0:
+            return 0
+        try:
+            records = await run_in_thread(self.backend.recent, min(limit, self.max_entries))
+        except Exception as e:
+            logger.error(f"결과 캐시 미리 올리기 실패: {str(e)}")
+            return 0
+        # 만료가 이른 것부터 넣어야 LRU 순서상 최근 항목이 뒤쪽(오래 살아남는 쪽)에 옴
+        for key, payload, expires_at in reversed(records):
+            self._memory_set(key, json.loads(payload), expires_at)
+        return len(records)
+
+    async def expires_at(self, key: str) -> Optional[float]:
+        """
+        저장된 결과의 만료 시각 (없으면 None, 이미 만료됐어도 그 시각을 반환)
+        캐시 미리 채우기에서 "이번 호출이 캐시에 새로 저장했는지" 확인할 때 사용합니다. (적중 통계에는 반영 안 함)
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            return entry[1]
+        if self.backend is not None:
+            try:
+                record = await run_in_thread(self.backend.get, key)
+            except Exception as e:
+                logger.error(f"결과 캐시 조회 실패: {str(e)}")
+                record = None
+            if record is not None:
+                return record[1]
+        return None
+
+    async def remaining_ttl(self, key: str) -> Optional[float]:
+        """
+        저장된 결과가 앞으로 몇 초 더 유효한지 (없거나 만료됐으면 None)
+        캐시 미리 채우기에서 "아직 충분히 신선한지" 판단할 때 사용합니다. (적중 통계에는 반영 안 함)
+        """
+        expires_at = await self.expires_at(key)
+        if expires_at is None or expires_at <= time.time():
+            return None
+        return expires_at - time.time()
+
+    async def get_stale(self, key: str) -> Optional[Any]:
+        """
+        만료된 결과라도 있으면 반환 (Gemini/YouTube 서킷이 열렸을 때의 대체 응답용)
+        적중/실패 카운터에는 반영하지 않습니다.
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            return entry[0]
+        if self.backend is not None:
+            try:
+                record = await run_in_thread(self.backend.get, key)
+            except Exception as e:
+                logger.error(f"결과 캐시 조회 실패: {str(e)}")
+                return None
+            if record is not None:
+                return json.loads(record[0])
+        return None
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.persistent_hits
+        total = hits + self.misses
+        return {
+            "hits": hits,
+            "memoryHits": self.memory_hits,
+            "persistentHits": self.persistent_hits,
+            "misses": self.misses,
+            "hitRate": round(hits / total, 4) if total else 0.0,
+            "memoryEntries": len(self._memory),
+        }
+
+
+def _build_backend() -> Optional[CacheBackend]:
+    """설정값(RESULT_CACHE_BACKEND)에 따라 영구 저장소 선택"""
+    kind = settings.result_cache_backend.lower()
+    if kind == "shared":
+        # 워커 공용 캐시 (자막 / Gemini 응답과 같은 파일, 네임스페이스만 다름)
+        return shared_cache.namespace("result")
+    if kind == "sqlite":
+        return SQLiteBackend(settings.result_cache_path)
+    if kind == "file":
+        return FileBackend(settings.result_cache_path)
+    # "memory" 또는 그 외: 영구 저장소 없이 메모리만 사용
+    return None
+
+
+result_cache = ResultCache(
+    ttl_seconds=settings.result_cache_ttl_seconds,
+    max_entries=settings.result_cache_max_entries,
+    backend=_build_backend(),
+)
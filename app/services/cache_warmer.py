@@ -0,0 +1,253 @@
+"""
+=============================================================================
+[Cache Warmer]
+설명: 인기 영상/운영팀이 챙기는 채널의 영상을 미리 분석해서 결과 캐시에 넣어둡니다.
+      -> 사용자의 첫 요청이 5~10초짜리 분석 대신 캐시 적중으로 끝나도록
+핵심: - 영상 링크 또는 ID 목록을 받아 자막 → Gemini 분석을 동시에 N개씩 실행
+      - 이미 충분히 신선한 결과(남은 유효 시간 >= WARM_MIN_TTL_SECONDS)는 건너뜀
+      - 영상 하나 끝날 때마다 진행 상황 파일에 기록 -> 중간에 멈춰도 --resume으로 이어서 실행
+      - 끝나면 요약 보고서(JSON) 저장
+실행: python -m app.services.cache_warmer --input trending.txt --concurrency 4 --resume
+      (입력 파일은 한 줄에 링크/ID 하나, #으로 시작하는 줄은 무시)
+=============================================================================
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Iterable, Optional
+
+from app.core.config import settings
+from app.core.exceptions import (
+    BusinessException,
+    InvalidLinkException,
+    NoTranscriptException,
+    TranscriptsDisabledException,
+    UnsupportedLanguageException,
+)
+from app.services.analysis_service import analyze, refresh
+from app.services.cache_service import result_cache, make_result_key
+from app.services.gemini_service import RESULT_VERSION
+from app.services.languages import missing_languages, parse_target_langs
+from app.services.video_url import parse_video_url
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+_VIDEO_ID_RE = re.compile(r"^[0-9A-Za-z_-]{11}$")
+
+# 다시 돌려도 결과가 같은 에러 (--resume 때 다시 시도하지 않음)
+_PERMANENT_ERRORS = (
+    InvalidLinkException,
+    NoTranscriptException,
+    TranscriptsDisabledException,
+    UnsupportedLanguageException,
+)
+
+# 항목별 결과 상태
+WARMED = "WARMED"          # 새로 분석해서 저장
+FRESH = "FRESH"            # 이미 신선한 결과가 있어 건너뜀
+RESUMED = "RESUMED"        # 이전 실행에서 끝난 항목이라 건너뜀
+DEGRADED = "DEGRADED"      # 외부 장애로 대체 결과만 나옴 (캐시에 저장 안 됨)
+FAILED = "FAILED"
+
+
+def to_video_url(value: str) -> str:
+    """영상 ID만 들어오면 watch 링크로 바꿈 (링크는 그대로)"""
+    value = value.strip()
+    if _VIDEO_ID_RE.match(value):
+        return f"https://www.youtube.com/watch?v={value}"
+    return value
+
+
+def read_targets(lines: Iterable[str]) -> list[str]:
+    """입력 줄에서 링크/ID만 골라냄 (빈 줄, 주석 제외, 중복 제거, 순서 유지)"""
+    targets = []
+    seen = set()
+    for line in lines:
+        value = line.split("#", 1)[0].strip()
+        if value and value not in seen:
+            seen.add(value)
+            targets.append(value)
+    return targets
+
+
+class WarmState:
+    """
+    진행 상황 파일 ({"영상ID:언어": {"status", "code", "at"}})
+    항목 하나가 끝날 때마다 임시 파일에 쓰고 이름을 바꿔서, 중간에 죽어도 파일이 깨지지 않음
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def finished(self, key: str) -> bool:
+        """이전 실행에서 성공했거나, 다시 해도 소용없는 에러로 끝난 항목인지"""
+        entry = self.entries.get(key)
+        return entry is not None and (entry["status"] == WARMED or entry.get("permanent", False))
+
+    def record(self, key: str, status: str, code: Optional[str] = None, permanent: bool = False) -> None:
+        self.entries[key] = {"status": status, "code": code, "permanent": permanent, "at": time.time()}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+
+async def _warm_one(
+    target: str,
+    languages: tuple[str, ...],
+    state: WarmState,
+    resume: bool,
+    min_ttl: float,
+) -> dict:
+    """
+    영상 하나 미리 분석 (이미 신선하거나 이전에 끝났으면 건너뜀)
+    신선한 결과에 뜻 언어만 빠져 있으면 다시 분석하지 않고 그 언어의 뜻만 번역해서 더함
+    """
+    target_lang = ",".join(languages)
+    video_url = to_video_url(target)
+    started = time.perf_counter()
+    row = {"target": target, "videoId": None, "status": FAILED, "code": None, "seconds": 0.0}
+
+    try:
+        video = parse_video_url(video_url)
+        video_id = row["videoId"] = video.video_id
+        state_key = f"{video_id}:{target_lang}"
+
+        if resume and state.finished(state_key):
+            row["status"] = RESUMED
+            return row
+
+        cache_key = make_result_key(video_id, RESULT_VERSION)
+        expires_before = await result_cache.expires_at(cache_key)
+        if expires_before is not None and expires_before - time.time() >= min_ttl:
+            cached = await result_cache.get_stale(cache_key)
+            if not missing_languages(cached or [], languages):
+                row["status"] = FRESH
+                return row
+            await analyze(video, languages)
+        else:
+            await refresh(video, languages)
+        # 서킷이 열려 대체 결과만 나온 경우에는 캐시에 저장되지 않음
+        # -> 예전 항목이 아직 남아 있을 수 있으므로 "있는지"가 아니라 "만료 시각이 새로 늘었는지"로 판단
+        expires_after = await result_cache.expires_at(cache_key)
+        stored = expires_after is not None and (expires_before is None or expires_after > expires_before)
+        row["status"] = WARMED if stored else DEGRADED
+        state.record(state_key, row["status"])
+
+    except BusinessException as e:
+        row["code"] = e.code
+        if row["videoId"] is not None:
+            state.record(f"{row['videoId']}:{target_lang}", FAILED, e.code, isinstance(e, _PERMANENT_ERRORS))
+        logger.warning(f"미리 분석 실패 ({target}): {e.code}")
+
+    except Exception as e:
+        row["code"] = "UNKNOWN_ERROR"
+        logger.error(f"미리 분석 중 알 수 없는 오류 ({target}): {str(e)}")
+
+    finally:
+        row["seconds"] = round(time.perf_counter() - started, 3)
+    return row
+
+
+async def warm_cache(
+    targets: list[str],
+    target_lang: str = "ko",
+    concurrency: Optional[int] = None,
+    resume: bool = False,
+    min_ttl: Optional[float] = None,
+    state_path: Optional[str] = None,
+) -> dict:
+    """
+    [메인 함수] targets(링크 또는 영상 ID)를 동시에 concurrency개씩 미리 분석하고
+    요약 보고서(dict)를 반환합니다. 서버 안의 백그라운드 작업이나 cron에서도 그대로 호출 가능
+    """
+    languages = parse_target_langs(target_lang)
+    concurrency = concurrency or settings.warm_concurrency
+    min_ttl = settings.warm_min_ttl_seconds if min_ttl is None else min_ttl
+    state = WarmState(state_path or settings.warm_state_path)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(target: str) -> dict:
+        async with semaphore:
+            return await _warm_one(target, languages, state, resume, min_ttl)
+
+    started = time.perf_counter()
+    rows = await asyncio.gather(*(run(target) for target in targets))
+
+    counts: dict[str, int] = {}
+    errors: dict[str, int] = {}
+    for row in rows:
+        counts[row["status"]] = counts.get(row["status"], 0) + 1
+        if row["code"]:
+            errors[row["code"]] = errors.get(row["code"], 0) + 1
+
+    warmed_seconds = [row["seconds"] for row in rows if row["status"] == WARMED]
+    return {
+        "targetLang": ",".join(languages),
+        "total": len(rows),
+        "counts": counts,
+        "errors": errors,
+        "seconds": round(time.perf_counter() - started, 3),
+        "avgWarmSeconds": round(sum(warmed_seconds) / len(warmed_seconds), 3) if warmed_seconds else 0.0,
+        "createdAt": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "items": rows,
+    }
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="인기 영상 결과 캐시 미리 채우기")
+    parser.add_argument("targets", nargs="*", help="영상 링크 또는 ID")
+    parser.add_argument("--input", help="한 줄에 링크/ID 하나씩 적힌 파일")
+    parser.add_argument("--lang", default="ko", help="targetLang (기본 ko, 쉼표로 여러 언어: ko,ja)")
+    parser.add_argument("--concurrency", type=int, default=settings.warm_concurrency)
+    parser.add_argument("--min-ttl", type=float, default=settings.warm_min_ttl_seconds,
+                        help="남은 유효 시간이 이 초보다 길면 건너뜀")
+    parser.add_argument("--resume", action="store_true", help="이전 실행에서 끝난 항목은 건너뜀")
+    parser.add_argument("--state", default=settings.warm_state_path)
+    parser.add_argument("--report", default=settings.warm_report_path)
+    args = parser.parse_args()
+
+    lines = list(args.targets)
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            lines.extend(f)
+    targets = read_targets(lines)
+    if not targets:
+        parser.error("미리 분석할 영상이 없습니다. (targets 또는 --input)")
+    try:
+        parse_target_langs(args.lang)
+    except UnsupportedLanguageException as e:
+        parser.error(e.detail)
+
+    report = await warm_cache(
+        targets,
+        target_lang=args.lang,
+        concurrency=args.concurrency,
+        resume=args.resume,
+        min_ttl=args.min_ttl,
+        state_path=args.state,
+    )
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    logger.info(
+        f"미리 분석 완료: {report['total']}개 {report['counts']} "
+        f"(에러 {report['errors']}, {report['seconds']}초) -> {args.report}"
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -0,0 +1,80 @@
+"""
+=============================================================================
+[Callback URL Validator]
+설명: 작업 완료 알림(callbackUrl)으로 서버가 직접 POST할 주소를 검사합니다.
+      아무 주소나 받으면 서버를 통해 내부망(메타데이터 서버, 사내 API 등)을 부를 수 있음 (SSRF)
+핵심: - https만 허용, 주소에 사용자 정보(user:pass@)가 있으면 거절
+      - 호스트를 실제로 조회해서 나오는 IP가 모두 공인 IP여야 통과
+        (루프백/링크 로컬/사설망/예약 대역은 거절)
+      - JOB_CALLBACK_ALLOWED_HOSTS를 설정하면 목록에 있는 호스트만 허용
+      - 접수할 때 한 번, 실제로 보내기 직전에 한 번 더 검사 (그 사이에 DNS가 바뀌는 경우 대비)
+=============================================================================
+"""
+
+import ipaddress
+import socket
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+from app.core.exceptions import InvalidCallbackUrlException
+
+# 이보다 긴 주소는 검사하지 않고 바로 거절
+MAX_CALLBACK_URL_LENGTH = 2048
+
+# 조회하지 않아도 내부용인 것이 확실한 이름
+_INTERNAL_SUFFIXES = (".localhost", ".local", ".internal")
+
+_ALLOWED_HOSTS = tuple(
+    host.strip().lower() for host in settings.job_callback_allowed_hosts.split(",") if host.strip()
+)
+
+
+def _is_allowed_host(host: str) -> bool:
+    return any(
+        host == allowed or (allowed.startswith(".") and host.endswith(allowed))
+        for allowed in _ALLOWED_HOSTS
+    )
+
+
+def _resolve(host: str, port: int) -> set[str]:
+    try:
+        infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError) as e:
+        raise InvalidCallbackUrlException(f"호스트를 찾을 수 없습니다 ({host})") from e
+    # IPv6 주소에 붙는 "%eth0" 같은 인터페이스 표기는 떼고 사용
+    return {info[4][0].split("%", 1)[0] for info in infos}
+
+
+def validate_callback_url(url: str) -> str:
+    """
+    [동기 함수, DNS 조회 포함 -> run_in_thread로 호출]
+    callbackUrl이 외부 https 주소인지 확인하고 그대로 돌려줍니다.
+    쓸 수 없는 주소면 InvalidCallbackUrlException
+    """
+    if len(url) > MAX_CALLBACK_URL_LENGTH:
+        raise InvalidCallbackUrlException("주소가 너무 깁니다")
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port or 443
+    except ValueError as e:
+        raise InvalidCallbackUrlException("주소 형식이 올바르지 않습니다") from e
+
+    host = (parts.hostname or "").rstrip(".")
+    if parts.scheme.lower() != "https":
+        raise InvalidCallbackUrlException("https 주소만 사용할 수 있습니다")
+    if not host or parts.username is not None or parts.password is not None:
+        raise InvalidCallbackUrlException("주소 형식이 올바르지 않습니다")
+
+    # 허용 목록을 쓰는 경우: 운영자가 지정한 호스트만 (사내 웹훅 수신 서버처럼 내부 주소여도 됨)
+    if _ALLOWED_HOSTS:
+        if not _is_allowed_host(host):
+            raise InvalidCallbackUrlException(f"허용되지 않은 호스트입니다 ({host})")
+        return url
+
+    if host == "localhost" or host.endswith(_INTERNAL_SUFFIXES):
+        raise InvalidCallbackUrlException(f"내부 주소는 사용할 수 없습니다 ({host})")
+    for address in _resolve(host, port):
+        # 공인 IP만 통과 (루프백/링크 로컬/사설망/예약 대역, ::ffff:127.0.0.1 같은 변환 주소 모두 거절)
+        if not ipaddress.ip_address(address).is_global:
+            raise InvalidCallbackUrlException(f"내부 주소는 사용할 수 없습니다 ({host})")
+    return url
@@ -0,0 +1,282 @@
+"""
+=============================================================================
+[Expression Index]
+설명: 예전에 Gemini가 분석한 표현(뜻/문맥 태그)을 모아두는 영구 색인입니다.
+      쇼츠마다 같은 관용 표현이 자주 나오므로, 이미 아는 표현은 색인에서 채우고
+      Gemini에는 새로운(또는 뜻이 갈리는) 표현만 물어봅니다.
+핵심: - 키: (정규화한 표현, 문맥 해시)
+        문맥 해시 = 표현 앞뒤 단어 몇 개를 이은 문자열의 해시 (같은 문장이면 같은 값)
+      - 조회: 자막의 1~N단어 구절을 메모리의 표현 집합과 맞춰보고(빠름),
+              맞은 것만 SQLite에서 한 번에 읽음
+      - 같은 문맥이면 그 뜻을 그대로, 다른 문맥이면 가장 많이 나온 뜻이
+        충분히 압도적일 때만 재사용 (아니면 "뜻이 갈리는 표현"으로 보고 Gemini에 맡김)
+      - 저장 형식: WITHOUT ROWID SQLite 테이블 (기본 키가 곧 정렬된 색인, 파일 하나)
+=============================================================================
+"""
+
+import hashlib
+import itertools
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.core.metrics import run_in_thread, span
+from app.core.sqlite import ProcessLocalConnection
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+# 문맥 해시에 쓰는 앞뒤 단어 수
+_CONTEXT_WORDS = 6
+# 한 번에 IN (...)으로 SQLite에서 읽을 후보 표현 수
+_LOOKUP_CHUNK = 32
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def normalize_expression(expression: str) -> str:
+    """색인 키: 소문자 단어만 공백 하나로 이어 붙임 (구두점/대소문자 차이 무시)"""
+    return " ".join(_tokens(expression))
+
+
+def _normalize_meaning(meaning: str) -> str:
+    return "".join(meaning.split()).strip(".,!?~")
+
+
+def _find(tokens: list[str], phrase: list[str]) -> int:
+    """tokens 안에서 phrase가 처음 나오는 위치 (없으면 -1)"""
+    width = len(phrase)
+    for index in range(len(tokens) - width + 1):
+        if tokens[index:index + width] == phrase:
+            return index
+    return -1
+
+
+def _context_hash(tokens: list[str], position: int, width: int) -> str:
+    """표현 앞뒤 _CONTEXT_WORDS 단어로 만든 짧은 해시 (위치를 모르면 "-")"""
+    if position < 0:
+        return "-"
+    window = tokens[max(0, position - _CONTEXT_WORDS):position + width + _CONTEXT_WORDS]
+    return hashlib.md5(" ".join(window).encode("utf-8")).hexdigest()[:12]
+
+
+class ExpressionIndex:
+    """표현 색인 (모든 메서드는 동기 - 스레드에서 호출)"""
+
+    def __init__(self, path: str, max_ngram: int = 6, min_hits: int = 2, agreement: float = 0.8):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_ngram = max_ngram
+        # 다른 문맥의 뜻을 빌려 쓰려면 최소 몇 번 나왔어야 하는지 / 가장 흔한 뜻의 비율
+        self.min_hits = min_hits
+        self.agreement = agreement
+
+        self._lock = threading.Lock()
+        # 연결은 처음 쓸 때 엶 (preload 후 fork된 워커마다 따로)
+        self._db = ProcessLocalConnection(path, setup=self._setup, check_same_thread=False)
+
+        # 색인에 있는 표현 집합 (구절 후보를 SQLite까지 가지 않고 거르기 위한 메모리 사본)
+        # 다른 워커 프로세스가 쓴 내용은 data_version이 바뀌면 다시 읽음
+        self._known: set[str] = set()
+        self._data_version = None
+
+        self.lookups = 0
+        self.filled = 0
+        self.uncertain = 0  # 기록이 적거나 뜻이 갈려서 Gemini에 맡긴 수
+        self.added = 0
+
+    @staticmethod
+    def _setup(conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS expressions ("
+            " expr TEXT NOT NULL, context_hash TEXT NOT NULL,"
+            " expression TEXT NOT NULL, meaning_kr TEXT NOT NULL, context_tag TEXT NOT NULL,"
+            " hits INTEGER NOT NULL DEFAULT 1, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (expr, context_hash)) WITHOUT ROWID"
+        )
+        conn.commit()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    def warm(self) -> int:
+        """표현 집합을 미리 메모리로 읽어둠 (서버 시작 시, 첫 조회가 느려지지 않도록) -> 표현 수"""
+        with self._lock:
+            self._refresh_known()
+            return len(self._known)
+
+    def _refresh_known(self) -> None:
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._known = {row[0] for row in self._conn.execute("SELECT DISTINCT expr FROM expressions")}
+            self._data_version = version
+
+    # ---------------------------------------------------------
+    # 저장
+    # ---------------------------------------------------------
+    def add(self, items: list[dict], full_text: str) -> int:
+        """
+        Gemini가 새로 분석한 카드들을 색인에 추가 (같은 키면 뜻을 갱신하고 hits += 1)
+        색인은 한국어 뜻만 모음 (한국어 뜻 없이 다른 언어로만 분석한 카드는 건너뜀)
+        """
+        tokens = _tokens(full_text)
+        rows = []
+        for item in items:
+            expr = normalize_expression(str(item.get("expression", "")))
+            meaning_kr = (item.get("meaning") or {}).get("ko")
+            if not expr or not meaning_kr or len(expr.split()) > self.max_ngram:
+                continue
+            width = len(expr.split())
+            position = _find(tokens, expr.split())
+            rows.append((
+                expr,
+                _context_hash(tokens, position, width),
+                item["expression"],
+                meaning_kr,
+                item["contextTag"],
+                time.time(),
+            ))
+        if not rows:
+            return 0
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO expressions (expr, context_hash, expression, meaning_kr, context_tag, hits, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, 1, ?)"
+                " ON CONFLICT (expr, context_hash) DO UPDATE SET"
+                " meaning_kr = excluded.meaning_kr, context_tag = excluded.context_tag,"
+                " hits = hits + 1, updated_at = excluded.updated_at",
+                rows,
+            )
+            self._conn.commit()
+            self._known.update(row[0] for row in rows)
+            self.added += len(rows)
+        return len(rows)
+
+    # ---------------------------------------------------------
+    # 조회
+    # ---------------------------------------------------------
+    def _candidates(self, tokens: list[str]) -> Iterator[tuple[int, int, str]]:
+        """자막에 나온 색인 표현들: (위치, 단어 수, 표현) - 앞쪽, 긴 표현 우선 (필요한 만큼만 생성)"""
+        seen = set()
+        for position in range(len(tokens)):
+            for width in range(min(self.max_ngram, len(tokens) - position), 0, -1):
+                phrase = " ".join(tokens[position:position + width])
+                if phrase in self._known and phrase not in seen:
+                    seen.add(phrase)
+                    yield position, width, phrase
+
+    def _choose(self, rows: list[tuple], context_hash: str) -> Optional[tuple]:
+        """같은 문맥의 기록이 있으면 그것, 없으면 충분히 압도적인 뜻 하나 (아니면 None)"""
+        for row in rows:
+            if row[1] == context_hash:
+                return row
+
+        votes: dict[str, list] = {}
+        for row in rows:
+            entry = votes.setdefault(_normalize_meaning(row[3]), [0, row])
+            entry[0] += row[5]
+        total = sum(entry[0] for entry in votes.values())
+        hits, best = max(votes.values(), key=lambda entry: entry[0])
+        if total >= self.min_hits and hits / total >= self.agreement:
+            return best
+        return None
+
+    def lookup(self, full_text: str, limit: int) -> list[dict]:
+        """
+        자막에 나온 표현 중 색인에서 뜻을 바로 쓸 수 있는 것을 최대 limit개 반환
+        (서로 겹치는 구절은 앞쪽/긴 표현 하나만)
+        """
+        tokens = _tokens(full_text)
+        items = []
+        used = [False] * len(tokens)
+        with self._lock:
+            self.lookups += 1
+            self._refresh_known()
+            candidates = self._candidates(tokens)
+            # 후보를 조금씩 꺼내 SQLite에서 읽음 -> limit개가 차면 나머지는 읽지 않음
+            while len(items) < limit:
+                batch = list(itertools.islice(candidates, _LOOKUP_CHUNK))
+                if not batch:
+                    break
+
+                rows_by_expr: dict[str, list] = {}
+                cursor = self._conn.execute(
+                    "SELECT expr, context_hash, expression, meaning_kr, context_tag, hits FROM expressions"
+                    f" WHERE expr IN ({','.join('?' * len(batch))})",
+                    [phrase for _, _, phrase in batch],
+                )
+                for row in cursor:
+                    rows_by_expr.setdefault(row[0], []).append(row)
+
+                for position, width, phrase in batch:
+                    if len(items) >= limit:
+                        break
+                    if any(used[position:position + width]) or phrase not in rows_by_expr:
+                        continue
+                    row = self._choose(rows_by_expr[phrase], _context_hash(tokens, position, width))
+                    if row is None:
+                        self.uncertain += 1
+                        continue
+                    for index in range(position, position + width):
+                        used[index] = True
+                    items.append({"expression": row[2], "meaning": {"ko": row[3]}, "contextTag": row[4]})
+
+            self.filled += len(items)
+        return items
+
+    def stats(self) -> dict:
+        return {
+            "expressions": len(self._known),
+            "lookups": self.lookups,
+            "filled": self.filled,
+            "uncertain": self.uncertain,
+            "added": self.added,
+        }
+
+
+# =============================================================================
+# 분석 흐름에서 쓰는 비동기 도우미 (색인 장애가 분석을 막지 않도록 실패는 로그만)
+# =============================================================================
+expression_index = (
+    ExpressionIndex(
+        settings.expression_index_path,
+        max_ngram=settings.expression_index_max_ngram,
+        min_hits=settings.expression_index_min_hits,
+        agreement=settings.expression_index_agreement,
+    )
+    if settings.expression_index_enabled
+    else None
+)
+
+
+async def lookup_known(full_text: str, limit: int) -> list[dict]:
+    """색인에서 바로 채울 수 있는 카드들 (색인을 안 쓰면 빈 리스트)"""
+    if expression_index is None:
+        return []
+    try:
+        with span("expression_lookup"):
+            return await run_in_thread(expression_index.lookup, full_text, limit)
+    except Exception as e:
+        logger.error(f"표현 색인 조회 실패: {str(e)}")
+        return []
+
+
+async def record_expressions(items: list[dict], full_text: str) -> None:
+    """Gemini가 새로 분석한 카드들을 색인에 추가"""
+    if expression_index is None or not items:
+        return
+    try:
+        await run_in_thread(expression_index.add, items, full_text)
+    except Exception as e:
+        logger.error(f"표현 색인 저장 실패: {str(e)}")
@@ -1,105 +1,618 @@
 """
 Google Gemini API를 이용한 요약 및 분석 서비스
 """
+import asyncio
+import hashlib
 import logging
-import google.generativeai as genai
 from app.core.config import settings
+from app.core.metrics import llm_in_flight, llm_parse_results, llm_repair_seconds, run_in_thread, span
+from app.core.adaptive_limit import AdaptiveLimiter
+from app.core.deadline import stage_timeout
+from app.core.resilience import CircuitBreaker, LatencyTracker, hedged, retry_async
 import json
+import time
 import uuid  # [1] 내장 라이브러리 추가 (고유 ID 생성용)
+from functools import lru_cache
+from typing import AsyncIterator, Union
 # FastAPI의 HTTPException을 사용해 명세서 규격에 맞는 에러를 던지도록 수정
 from fastapi import HTTPException
-from app.core.exceptions import AIParseException, AIUnknownException
+from app.core.exceptions import (
+    AIParseException,
+    AIUnknownException,
+    AITimeoutException,
+    DeadlineExceededException,
+    ServerBusyException,
+    UpstreamUnavailableException,
+)
+from app.models.schemas import WordItem
+from app.services.json_parser import JsonArrayStreamParser, parse_json_array, split_json_object
+from app.services.languages import DEFAULT_LANGUAGES, language_name
+from app.services.llm_backend import RETRYABLE_LLM_ERRORS, build_llm_backend
+from app.services.shared_cache import shared_cache
+from app.services.transcript_store import CompactTranscript, snippet_fields
 
 # 로거 설정
 logger = logging.getLogger(__name__)
+# 워커(프로세스) 하나에서 동시에 진행되는 Gemini 호출 수 제한
+# -> 폭주 시 쿼터를 한 번에 다 쓰지 않도록 나머지는 여기서 잠깐 줄을 서고,
+#    Gemini가 느려지거나 실패하면 한도를 자동으로 줄입니다. (자리가 안 나면 503)
+gemini_limiter = AdaptiveLimiter(
+    "gemini",
+    min_limit=settings.gemini_min_concurrency,
+    max_limit=settings.gemini_max_concurrency,
+    latency_target=settings.gemini_latency_target_seconds,
+    queue_timeout=settings.upstream_queue_timeout_seconds,
+    max_queue=settings.upstream_max_queue,
+)
+# Gemini가 연달아 실패하면 잠시 호출을 멈추고 바로 503 (캐시/오프라인 결과로 대체)
+# -> 자리 부족(ServerBusy)이나 요청 마감 초과는 Gemini 장애가 아니므로 세지 않음
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=settings.circuit_failure_threshold,
+    reset_timeout=settings.circuit_reset_seconds,
+    ignore_errors=(ServerBusyException, DeadlineExceededException),
+)
+# 최근 성공한 호출 시간 (헤징 기준 p95 계산용)
+gemini_latency = LatencyTracker()
+
+# 그대로 위로 올려보내는 예외 (라우터가 503/504로 응답하거나 대체 결과를 찾음)
+_PASSTHROUGH_ERRORS = (ServerBusyException, UpstreamUnavailableException, DeadlineExceededException)
+
+
+# =============================================================================
+# 텍스트 생성 엔진 (실제 Gemini 또는 부하 테스트용 스텁, LLM_BACKEND로 선택)
+# =============================================================================
+llm_backend = build_llm_backend()
+
+# 사용할 모델과 프롬프트 버전
+# -> 프롬프트를 바꾸면 PROMPT_VERSION을 올려야 예전 캐시 결과가 재사용되지 않습니다.
+MODEL_NAME = llm_backend.model_name
+PROMPT_VERSION = "v4"
+RESULT_VERSION = f"{MODEL_NAME}/{PROMPT_VERSION}"
+
+
+# =============================================================================
+# 응답 형식(JSON 스키마) 강제
+# =============================================================================
+# 서버가 붙이는 필드 (id, 자막에서 찾은 위치/문장, 예전 앱 호환용 meaningKr)
+# -> Gemini 응답 스키마에서 제외
+_SERVER_FIELDS = ("id", "start", "end", "sentence", "meaningKr")
+
+
+def _meaning_schema(languages: tuple[str, ...]) -> dict:
+    """뜻 객체 스키마: 요청한 언어 코드마다 문자열 하나 ({"ko": "...", "ja": "..."})"""
+    return {
+        "type": "OBJECT",
+        "properties": {code: {"type": "STRING"} for code in languages},
+        "required": list(languages),
+    }
+
+
+@lru_cache(maxsize=64)
+def word_list_schema(languages: tuple[str, ...] = DEFAULT_LANGUAGES) -> dict:
+    """
+    WordItem 모델에서 Gemini 응답 스키마를 만듭니다. (서버가 붙이는 필드는 제외)
+    -> 필드가 바뀌면 프롬프트/스키마를 따로 고칠 필요 없이 자동 반영
+    뜻(meaning)은 요청한 언어들을 키로 갖는 객체 -> 한 번의 생성으로 모든 언어의 뜻을 받음
+    """
+    json_schema = WordItem.model_json_schema(by_alias=True)
+    properties = {
+        name: _meaning_schema(languages) if name == "meaning" else {"type": "STRING"}
+        for name in json_schema["properties"]
+        if name not in _SERVER_FIELDS
+    }
+    return {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": properties,
+            "required": [name for name in json_schema["required"] if name in properties],
+        },
+    }
+
+
+_REQUIRED_FIELDS = tuple(word_list_schema()["items"]["required"])
+
+
+@lru_cache(maxsize=64)
+def _translation_schema(languages: tuple[str, ...]) -> dict:
+    """뜻 번역 응답 스키마 (표현 + 뜻 객체만)"""
+    return {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {"expression": {"type": "STRING"}, "meaning": _meaning_schema(languages)},
+            "required": ["expression", "meaning"],
+        },
+    }
+
+
+@lru_cache(maxsize=64)
+def _batch_schema(labels: tuple[str, ...], languages: tuple[str, ...]) -> dict:
+    """배치 응답 스키마: 라벨(v0, v1 ...)마다 단어 카드 리스트 하나"""
+    return {
+        "type": "OBJECT",
+        "properties": {label: word_list_schema(languages) for label in labels},
+        "required": list(labels),
+    }
+
+
+# =============================================================================
+# Gemini 응답 캐시 (워커 공용)
+# =============================================================================
+# 모델 + 응답 스키마 + 프롬프트가 완전히 같으면 예전 응답을 그대로 재사용
+# -> 같은 자막 구간(긴 영상의 구간 분석, 배치 묶음, 깨진 응답 복구 요청)을 다른 워커가
+#    이미 물어봤다면 Gemini를 다시 부르지 않음 (결과 캐시는 영상 단위, 이건 프롬프트 단위)
+llm_cache = shared_cache.namespace("llm") if settings.llm_cache_enabled else None
+llm_cache_metrics = {"hits": 0, "misses": 0, "stored": 0}
+
+
+def _llm_cache_key(prompt: str, response_schema: dict = None) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    schema_text = json.dumps(response_schema, sort_keys=True) if response_schema else ""
+    for part in (MODEL_NAME, schema_text, prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _matches_schema(value, schema: dict) -> bool:
+    """필수 필드(뜻 객체 안의 언어별 뜻, 배치 응답의 라벨별 리스트까지)가 모두 비어 있지 않은지"""
+    if schema["type"] == "ARRAY":
+        return isinstance(value, list) and bool(value) and all(
+            _matches_schema(item, schema["items"]) for item in value
+        )
+    if schema["type"] == "OBJECT":
+        return isinstance(value, dict) and all(
+            _matches_schema(value.get(name), schema["properties"][name]) for name in schema["required"]
+        )
+    return isinstance(value, str) and bool(value.strip())
+
+
+def _is_complete_response(text: str, response_schema: dict = None) -> bool:
+    """
+    형식이 맞는 응답만 캐시 (깨진 응답을 저장하면 복구 실패가 TTL 동안 반복됨)
+    요청한 언어의 뜻이 하나라도 빠진 응답도 저장하지 않음 (다음 요청이 빠진 채로 재사용하지 않도록)
+    """
+    try:
+        if response_schema is None:
+            json.loads(text)
+            return True
+        if response_schema["type"] == "ARRAY":
+            items, recovered = parse_json_array(text)
+            return not recovered and _matches_schema(items, response_schema)
+        return _matches_schema(json.loads(text), response_schema)
+    except ValueError:
+        return False
+
+
+async def _llm_cache_get(cache_key: str):
+    try:
+        record = await run_in_thread(llm_cache.get, cache_key)
+    except Exception as e:
+        # 캐시 장애가 분석 자체를 막으면 안 되므로 로그만 남기고 미스 처리
+        logger.error(f"Gemini 응답 캐시 조회 실패: {str(e)}")
+        record = None
+    if record is not None and record[1] > time.time():
+        llm_cache_metrics["hits"] += 1
+        return record[0]
+    llm_cache_metrics["misses"] += 1
+    return None
+
+
+async def _llm_cache_set(cache_key: str, text: str) -> None:
+    try:
+        await run_in_thread(llm_cache.set, cache_key, text, time.time() + settings.llm_cache_ttl_seconds)
+        llm_cache_metrics["stored"] += 1
+    except Exception as e:
+        logger.error(f"Gemini 응답 캐시 저장 실패: {str(e)}")
+
+
 # =============================================================================
-# Gemini API 초기 설정
+# 공통 도우미 함수
 # =============================================================================
-genai.configure(api_key=settings.gemini_api_key)
+def transcript_to_text(transcript_list) -> str:
+    """자막 리스트에서 텍스트만 추출하여 하나의 긴 문자열로 병합"""
+    if isinstance(transcript_list, CompactTranscript):
+        # 자막 저장소 형식이면 이미 이어 붙인 텍스트 버퍼를 그대로 사용
+        return transcript_list.full_text
+
+    texts = []
+    for item in transcript_list:
+        if isinstance(item, dict):
+            texts.append(item.get("text", ""))
+        else:
+            # 객체(FetchedTranscriptSnippet)일 경우 .text로 접근
+            texts.append(getattr(item, "text", ""))
+    return " ".join(texts)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토큰 수 대략 추정 (영어 기준 4글자 ≒ 1토큰)
+    -> 여러 자막을 한 프롬프트에 묶을 수 있는지 판단할 때 사용합니다.
+    """
+    return len(text) // 4 + 1
+
+
+def _meaning_prompt(languages: tuple[str, ...]) -> tuple[str, str]:
+    """
+    프롬프트에 넣을 (뜻 언어 설명, 뜻 객체 예시)
+    예: ("ko (Korean), ja (Japanese)", '{"ko": "korean meaning here", "ja": "japanese meaning here"}')
+    """
+    names = ", ".join(f"{code} ({language_name(code)})" for code in languages)
+    example = ", ".join(f'"{code}": "{language_name(code).lower()} meaning here"' for code in languages)
+    return names, "{" + example + "}"
 
-async def extract_vocabulary(transcript_list: list[dict]) -> list[dict]:
+
+def _build_prompt(
+    full_text: str,
+    count: int = 3,
+    exclude: list[str] = None,
+    languages: tuple[str, ...] = DEFAULT_LANGUAGES,
+) -> str:
+    """
+    단일 영상(또는 자막 구간) 분석 프롬프트
+    - 표현 count개 추출 (기본 3개)
+    - exclude: 이미 색인에서 채운 표현 (다시 뽑지 않도록)
+    - languages: 뜻을 만들 언어들 (한 번의 생성으로 모두)
+    - JSON 포맷 엄수
+    """
+    exclude_line = (
+        f"Do not include these expressions, they are already covered: {'; '.join(exclude)}."
+        if exclude else ""
+    )
+    language_names, meaning_example = _meaning_prompt(languages)
+    return f"""
+    Analyze the following English transcript and extract {count} key expressions for learning English.
+    {exclude_line}
+    
+    For each expression, provide:
+    1. "expression": The exact English phrase used in the text.
+    2. "meaning": An object with the meaning suitable for the context in each of these languages, keyed by language code: {language_names}.
+    3. "contextTag": A short, uppercase tag describing the mood or situation (e.g., ROMANTIC, ANGER, BUSINESS, GREETING, SLANG).
+
+    Transcript:
+    {full_text}
+
+    Return strictly a JSON list. Do not use Markdown code blocks.
+    The Output must follow this JSON format:
+    [
+        {{
+            "expression": "expression here",
+            "meaning": {meaning_example},
+            "contextTag": "TAG_NAME"
+        }}
+    ]
+    """
+
+
+def _build_translation_prompt(items: list[dict], languages: tuple[str, ...]) -> str:
+    """
+    이미 뽑아 둔 표현의 뜻만 다른 언어로 만드는 프롬프트
+    (자막 전체 대신 표현과 그 표현이 나온 문장만 보내므로 분석 프롬프트보다 훨씬 짧음)
+    """
+    language_names, meaning_example = _meaning_prompt(languages)
+    expressions = json.dumps(
+        [{"expression": item["expression"], "sentence": item.get("sentence") or ""} for item in items],
+        ensure_ascii=False,
+    )
+    return f"""
+    Translate the meaning of each English expression below into these languages, keyed by language code: {language_names}.
+    Use the sentence it appeared in to choose the meaning that fits the context.
+
+    Expressions:
+    {expressions}
+
+    Return strictly a JSON list with one object per expression, in the same order. Do not use Markdown code blocks.
+    The Output must follow this JSON format:
+    [
+        {{
+            "expression": "expression here",
+            "meaning": {meaning_example}
+        }}
+    ]
+    """
+
+
+def _build_repair_prompt(broken_text: str) -> str:
+    """
+    형식이 깨진 응답만 다시 보내서 JSON으로 고쳐달라는 짧은 프롬프트
+    (자막 전체를 다시 보내지 않으므로 재분석보다 훨씬 싸고 빠름)
+    """
+    return f"""
+    The following text was supposed to be a JSON list of objects with the keys
+    {", ".join(f'"{name}"' for name in _REQUIRED_FIELDS)} ("meaning" is an object keyed by language code),
+    but it is malformed.
+    Fix it and return only the corrected JSON list. Do not add new items.
+
+    Text:
+    {broken_text[:settings.gemini_repair_max_chars]}
+    """
+
+
+async def _generate_once(backend, prompt: str, response_schema: dict = None) -> str:
+    """Gemini 1회 호출 (동시 호출 수 제한 + 요청 마감 시간 안에서의 시간 제한)"""
+    # 줄 서기 전에 계산: 남은 시간이 없으면 자리를 잡지 않고 바로 504
+    timeout = stage_timeout(settings.gemini_timeout_seconds)
+    async with gemini_limiter.slot():
+        with llm_in_flight.track(), span("gemini_generate"):
+            started = time.perf_counter()
+            text = await asyncio.wait_for(backend.generate(prompt, response_schema), timeout=timeout)
+            gemini_latency.observe(time.perf_counter() - started)
+            return text
+
+
+async def _generate_text(backend, prompt: str, response_schema: dict = None) -> str:
+    """
+    Gemini 호출 (서킷 브레이커 + 일시 오류 재시도 + 선택적 헤징)
+    동기 generate_content()는 이벤트 루프 전체를 멈추게 하므로
+    SDK의 비동기 API를 사용합니다. (대기 중 다른 요청/헬스체크 처리 가능)
+    같은 프롬프트의 응답이 워커 공용 캐시에 있으면 호출하지 않고 그대로 돌려줍니다.
+    요청 태스크가 취소되면(클라이언트 연결 끊김) 이 await도 함께 취소됩니다.
+    response_schema를 주면 Gemini가 그 JSON 구조로만 답하도록 강제합니다.
+    """
+    cache_key = None
+    if llm_cache is not None:
+        cache_key = _llm_cache_key(prompt, response_schema)
+        cached = await _llm_cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+    async def attempt() -> str:
+        if settings.gemini_hedge_enabled and len(gemini_latency) >= settings.gemini_hedge_min_samples:
+            return await hedged(
+                lambda: _generate_once(backend, prompt, response_schema),
+                delay=gemini_latency.percentile(95),
+                name="gemini",
+            )
+        return await _generate_once(backend, prompt, response_schema)
+
+    async with gemini_breaker.guard():
+        text = await retry_async(
+            attempt,
+            name="gemini",
+            attempts=settings.gemini_max_attempts,
+            retryable=RETRYABLE_LLM_ERRORS,
+            base_delay=settings.upstream_retry_base_seconds,
+            max_delay=settings.upstream_retry_max_seconds,
+        )
+
+    if cache_key is not None and _is_complete_response(text, response_schema):
+        await _llm_cache_set(cache_key, text)
+    return text
+
+
+def _valid_meaning(item: dict) -> dict:
+    """카드의 뜻 객체에서 비어 있지 않은 문자열만 남김 (예전 형식 meaningKr 문자열은 {"ko": ...}로)"""
+    meaning = item.get("meaning")
+    if not isinstance(meaning, dict):
+        legacy = item.get("meaningKr")
+        meaning = {"ko": legacy} if isinstance(legacy, str) else {}
+    return {code: text for code, text in meaning.items() if isinstance(text, str) and text.strip()}
+
+
+def _valid_items(items: list[dict]) -> list[dict]:
+    """
+    필수 필드가 빠진 카드는 버림 (WordItem 검증에서 전체 응답이 실패하지 않도록)
+    뜻은 한 언어라도 있으면 살림 -> 빠진 언어는 분석 서비스가 번역 요청으로 채움
     """
-    자막 텍스트를 분석하여 학습용 주요 표현, 한국어 뜻, 문맥 태그를 추출하고
+    valid = []
+    for item in items:
+        meaning = _valid_meaning(item)
+        if meaning and all(isinstance(item.get(name), str) for name in _REQUIRED_FIELDS if name != "meaning"):
+            item["meaning"] = meaning
+            item.pop("meaningKr", None)
+            valid.append(item)
+    return valid
+
+
+async def _parse_vocabulary(backend, result_text: str, languages: tuple[str, ...] = DEFAULT_LANGUAGES) -> list[dict]:
+    """
+    AI 응답 -> 단어 카드 리스트
+    1. 관대한 파서로 파싱 (코드 블록, 잘린 꼬리, 뒤에 붙은 설명 무시)
+    2. 그래도 안 되면 깨진 응답만 보내 "JSON 고쳐줘" 후속 요청 1회
+    3. 그래도 실패하면 json.JSONDecodeError (-> AIParseException)
+    """
+    try:
+        with span("json_parse"):
+            items, recovered = parse_json_array(result_text)
+            items = _valid_items(items)
+        if items:
+            llm_parse_results.inc(outcome="recovered" if recovered else "ok")
+            return items
+    except ValueError:
+        pass
+
+    started = time.perf_counter()
+    # 후속 요청 자체가 실패(시간 초과 등)해서 예외가 올라가도 쓴 시간은 "error"로 기록
+    outcome = "error"
+    try:
+        with span("json_repair"):
+            repaired_text = await _generate_text(
+                backend, _build_repair_prompt(result_text), word_list_schema(languages)
+            )
+            items, _ = parse_json_array(repaired_text)
+            items = _valid_items(items)
+    except ValueError:
+        items = []
+        outcome = "failed"
+    else:
+        outcome = "repaired" if items else "failed"
+    finally:
+        llm_repair_seconds.observe(time.perf_counter() - started, outcome=outcome)
+
+    llm_parse_results.inc(outcome="repaired" if items else "failed")
+    if items:
+        logger.warning("Gemini 응답 형식 오류를 후속 요청으로 복구했습니다.")
+        return items
+
+    raise json.JSONDecodeError("단어 카드를 찾을 수 없습니다.", result_text, 0)
+
+
+# =============================================================================
+# 긴 영상용: 자막을 토큰 예산 단위 구간으로 나눠 분석 (Map-Reduce)
+# =============================================================================
+def split_transcript_windows(transcript_list, token_budget: int) -> list[dict]:
+    """
+    자막을 조각(snippet) 경계에 맞춰 토큰 예산 이하의 구간들로 나눕니다.
+    조각 중간에서 자르지 않으므로 문장이 반으로 쪼개지지 않습니다.
+    
+    Returns:
+        [{"text": "...", "start": 0.0, "end": 42.5}, ...]
+    """
+    windows = []
+    texts: list[str] = []
+    tokens = 0
+    window_start = window_end = 0.0
+
+    for item in transcript_list:
+        text, start, duration = snippet_fields(item)
+        snippet_tokens = estimate_tokens(text)
+        if texts and tokens + snippet_tokens > token_budget:
+            windows.append({"text": " ".join(texts), "start": window_start, "end": window_end})
+            texts, tokens = [], 0
+        if not texts:
+            window_start = start
+        texts.append(text)
+        tokens += snippet_tokens
+        window_end = start + duration
+
+    if texts:
+        windows.append({"text": " ".join(texts), "start": window_start, "end": window_end})
+    return windows
+
+
+def _normalize_expression(expression: str) -> str:
+    """중복 판단용: 소문자 + 앞뒤 구두점 제거 + 공백 정리"""
+    return " ".join(expression.lower().strip(" .,!?;:'\"").split())
+
+
+def merge_expressions(window_results: list[list[dict]], limit: int) -> list[dict]:
+    """
+    구간별 결과를 합쳐 중복을 없애고 순위를 매깁니다.
+    - 여러 구간에서 반복해서 뽑힌 표현일수록 앞으로
+    - 같은 점수면 영상 앞쪽에서 나온 표현이 먼저
+    """
+    merged: dict[str, dict] = {}
+    for window_index, items in enumerate(window_results):
+        for position, item in enumerate(items):
+            key = _normalize_expression(str(item.get("expression", "")))
+            if not key:
+                continue
+            if key in merged:
+                merged[key]["score"] += 1
+            else:
+                merged[key] = {"item": item, "score": 1, "order": (window_index, position)}
+
+    ranked = sorted(merged.values(), key=lambda entry: (-entry["score"], entry["order"]))
+    return [entry["item"] for entry in ranked[:limit]]
+
+
+async def _extract_vocabulary_chunked(transcript_list, backend, languages: tuple[str, ...]) -> list[dict]:
+    """
+    긴 자막: 구간별로 동시에 분석(Map) -> 합치고 중복 제거(Reduce)
+    일부 구간만 실패하면 나머지 결과로 응답하고, 전부 실패하면 첫 에러를 그대로 던집니다.
+    """
+    windows = split_transcript_windows(transcript_list, settings.gemini_window_token_budget)
+    per_window = settings.gemini_expressions_per_window
+
+    async def analyze_window(window: dict) -> list[dict]:
+        prompt = _build_prompt(window["text"], per_window, languages=languages)
+        result_text = await _generate_text(backend, prompt, word_list_schema(languages))
+        return await _parse_vocabulary(backend, result_text, languages)
+
+    outcomes = await asyncio.gather(*(analyze_window(window) for window in windows), return_exceptions=True)
+    window_results = [outcome for outcome in outcomes if isinstance(outcome, list)]
+    if not window_results:
+        raise outcomes[0]
+
+    limit = min(settings.gemini_max_expressions, per_window * len(windows))
+    logger.info(f"긴 자막 분할 분석: 구간 {len(windows)}개 (성공 {len(window_results)}개)")
+    return merge_expressions(window_results, limit)
+
+
+async def extract_vocabulary(
+    transcript_list: list[dict],
+    known_items: list[dict] = None,
+    languages: tuple[str, ...] = DEFAULT_LANGUAGES,
+) -> list[dict]:
+    """
+    자막 텍스트를 분석하여 학습용 주요 표현, 요청한 언어들의 뜻, 문맥 태그를 추출하고
     각 항목에 고유 ID(UUID)를 부여합니다.
     
+    자막이 GEMINI_WINDOW_TOKEN_BUDGET보다 길면 구간별로 나눠 동시에 분석한 뒤
+    중복을 제거하고 순위를 매겨 합칩니다. (영상 길이에 따라 표현 수도 늘어남)
+    
     Args:
         transcript_list: [{'text': '...', 'start': ...}, ...] 형태의 자막 리스트
+        known_items: 표현 색인에서 이미 뜻을 찾은 카드들 (짧은 자막에서만 사용)
+                     -> Gemini에는 모자란 개수만 새로 묻고, 3개가 다 차면 호출하지 않음
+        languages: 뜻을 만들 언어 코드들 (예: ("ko", "ja")) -> 프롬프트 하나로 모두 생성
     
     Returns:
         [
             {
                 "id": "550e8400-e29b...",      # 서버에서 생성한 고유 ID
                 "expression": "영어 표현",
-                "meaningKr": "한국어 뜻",
+                "meaning": {"ko": "한국어 뜻", "ja": "일본어 뜻"},
                 "contextTag": "문맥 태그"
             },
             ...
         ]
     """
+    result_text = ""
     try:
         # ---------------------------------------------------------
         # 1. 텍스트 전처리 (Preprocessing)
         # ---------------------------------------------------------
         # 자막 리스트에서 텍스트만 추출하여 하나의 긴 문자열로 병합
-        texts = []
-        for item in transcript_list:
-            if isinstance(item, dict):
-                texts.append(item.get("text", ""))
-            else:
-                # 객체(FetchedTranscriptSnippet)일 경우 .text로 접근
-                texts.append(getattr(item, "text", ""))
-        
-        full_text = " ".join(texts)
+        with span("prompt_build"):
+            full_text = transcript_to_text(transcript_list)
         
         # ---------------------------------------------------------
         # 2. 모델 선택 (Model Initialization)
         # ---------------------------------------------------------
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        
-        # ---------------------------------------------------------
-        # 3. 프롬프트 구성 (Prompt Engineering)
-        # ---------------------------------------------------------
-        # - 표현 3개 추출
-        # - JSON 포맷 엄수
-        prompt = f"""
-        Analyze the following English transcript and extract 3 key expressions for learning English.
-        
-        For each expression, provide:
-        1. "expression": The exact English phrase used in the text.
-        2. "meaningKr": The Korean meaning suitable for the context.
-        3. "contextTag": A short, uppercase tag describing the mood or situation (e.g., ROMANTIC, ANGER, BUSINESS, GREETING, SLANG).
+        # 서버 시작 때 만들어 둔 공용 백엔드 재사용
+        backend = llm_backend
 
-        Transcript:
-        {full_text}
+        if estimate_tokens(full_text) > settings.gemini_window_token_budget:
+            # 긴 영상: 구간별 분석 후 병합 (3~5단계를 구간마다 수행)
+            vocabulary_data = await _extract_vocabulary_chunked(transcript_list, backend, languages)
+        else:
+            known_items = [dict(item) for item in (known_items or [])][:3]
+            needed = 3 - len(known_items)
+            vocabulary_data = []
+            if needed > 0:
+                # ---------------------------------------------------------
+                # 3. 프롬프트 구성 (Prompt Engineering)
+                # ---------------------------------------------------------
+                # - 표현 3개 추출 (색인에서 채운 만큼 빼고, 그 표현들은 제외)
+                # - JSON 포맷 엄수
+                with span("prompt_build"):
+                    prompt = _build_prompt(
+                        full_text, needed, [item["expression"] for item in known_items], languages
+                    )
 
-        Return strictly a JSON list. Do not use Markdown code blocks.
-        The Output must follow this JSON format:
-        [
-            {{
-                "expression": "expression here",
-                "meaningKr": "korean meaning here",
-                "contextTag": "TAG_NAME"
-            }}
-        ]
-        """
-        
-        # ---------------------------------------------------------
-        # 4. API 요청 및 응답 (Request & Response)
-        # ---------------------------------------------------------
-        response = model.generate_content(prompt)
-        result_text = response.text
-        
-        # ---------------------------------------------------------
-        # 5. 결과 파싱 및 후처리 (Parsing & Post-processing)
-        # ---------------------------------------------------------
-        # 마크다운 코드 블록(```json) 제거
-        if "```json" in result_text:
-            result_text = result_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in result_text:
-            result_text = result_text.split("```")[1].split("```")[0].strip()
-            
-        # 문자열 -> 파이썬 리스트 변환
-        vocabulary_data = json.loads(result_text)
+                # ---------------------------------------------------------
+                # 4. API 요청 및 응답 (Request & Response)
+                # ---------------------------------------------------------
+                # WordItem 모양의 JSON 리스트로만 답하도록 스키마 지정
+                result_text = await _generate_text(backend, prompt, word_list_schema(languages))
+
+                # ---------------------------------------------------------
+                # 5. 결과 파싱 및 후처리 (Parsing & Post-processing)
+                # ---------------------------------------------------------
+                # 문자열 -> 파이썬 리스트 변환 (깨진 응답은 자동 복구 시도)
+                vocabulary_data = await _parse_vocabulary(backend, result_text, languages)
+
+            if known_items:
+                # 색인 카드와 겹치는 표현은 빼고 합침 (Gemini가 제외 목록을 무시한 경우 대비)
+                known_keys = {_normalize_expression(item["expression"]) for item in known_items}
+                vocabulary_data = [
+                    item for item in vocabulary_data
+                    if _normalize_expression(str(item.get("expression", ""))) not in known_keys
+                ][:needed] + known_items
 
         # =========================================================
         # [2] ID 생성 로직 (Unique ID Injection)
@@ -115,6 +628,10 @@ async def extract_vocabulary(transcript_list: list[dict]) -> list[dict]:
 # ---------------------------------------------------------
     # 6. 예외 처리 (Error Handling) - 표준화 적용 완료
     # ---------------------------------------------------------
+    except asyncio.TimeoutError:
+        logger.error(f"Gemini 응답 시간 초과 ({settings.gemini_timeout_seconds}초)")
+        raise AITimeoutException()
+
     except json.JSONDecodeError:
         # [로그] 개발자용: 실제 AI가 뱉은 이상한 텍스트 기록
         logger.error(f"Gemini JSON 파싱 실패. 응답 내용: {result_text}")
@@ -122,9 +639,224 @@ async def extract_vocabulary(transcript_list: list[dict]) -> list[dict]:
         # [응답] 앱용: "AI_PARSE_ERROR" 표준 에러 던지기
         raise AIParseException()
 
+    except _PASSTHROUGH_ERRORS:
+        # 동시 호출 자리 없음 / 서킷 열림 / 요청 마감 초과 -> 그대로 503, 504
+        raise
+
     except Exception as e:
         # [로그] 개발자용: 실제 에러 내용 기록
         logger.error(f"Gemini API 알 수 없는 오류: {str(e)}")
         
         # [응답] 앱용: "UNKNOWN_ERROR" 표준 에러 던지기
-        raise AIUnknownException(debug_message=str(e))
\ No newline at end of file
+        raise AIUnknownException(debug_message=str(e))
+
+
+async def extract_vocabulary_batch(
+    transcripts: dict[str, list[dict]],
+    languages: tuple[str, ...] = DEFAULT_LANGUAGES,
+) -> dict[str, Union[list[dict], AIParseException]]:
+    """
+    짧은 자막 여러 개를 프롬프트 하나로 묶어 한 번에 분석합니다. (배치 API용)
+    
+    Args:
+        transcripts: {"키": 자막 리스트, ...}
+        languages: 뜻을 만들 언어 코드들 (묶음 안 모든 자막에 공통)
+    
+    Returns:
+        {"키": extract_vocabulary()와 같은 형태의 리스트 또는 AIParseException, ...}
+        (라벨별로 따로 파싱/복구 -> 한 라벨이 깨져도 나머지 결과는 살림)
+    """
+    try:
+        # 키를 v0, v1 ... 같은 짧은 라벨로 바꿔서 프롬프트에 넣음
+        labels = {f"v{index}": key for index, key in enumerate(transcripts)}
+        sections = "\n\n".join(
+            f"[{label}]\n{transcript_to_text(transcripts[key])}" for label, key in labels.items()
+        )
+        language_names, meaning_example = _meaning_prompt(languages)
+
+        prompt = f"""
+        Below are {len(labels)} separate English transcripts, each starting with a label like [v0].
+        For EACH transcript, extract 3 key expressions for learning English.
+        
+        For each expression, provide:
+        1. "expression": The exact English phrase used in that transcript.
+        2. "meaning": An object with the meaning suitable for the context in each of these languages, keyed by language code: {language_names}.
+        3. "contextTag": A short, uppercase tag describing the mood or situation (e.g., ROMANTIC, ANGER, BUSINESS, GREETING, SLANG).
+
+        Transcripts:
+        {sections}
+
+        Return strictly a JSON object whose keys are the labels. Do not use Markdown code blocks.
+        The Output must follow this JSON format:
+        {{
+            "v0": [
+                {{
+                    "expression": "expression here",
+                    "meaning": {meaning_example},
+                    "contextTag": "TAG_NAME"
+                }}
+            ]
+        }}
+        """
+
+        # 코드 블록(```)이 붙어 있어도 잘라내지 않고 그대로 관대한 파서로 (라벨별 조각에서 건짐)
+        result_text = await _generate_text(llm_backend, prompt, _batch_schema(tuple(labels), languages))
+        label_texts = split_json_object(result_text, labels)
+
+        async def parse_label(label: str):
+            # 라벨 하나의 값만 단일 영상과 같은 관대한 파서 + 복구 요청으로 처리
+            if label not in label_texts:
+                logger.error(f"Gemini 배치 응답에 라벨 {label} 결과 없음")
+                return AIParseException()
+            try:
+                vocabulary_data = await _parse_vocabulary(llm_backend, label_texts[label], languages)
+            except json.JSONDecodeError:
+                logger.error(f"Gemini 배치 라벨 {label} 파싱 실패. 응답 내용: {label_texts[label]}")
+                return AIParseException()
+            for item in vocabulary_data:
+                item["id"] = str(uuid.uuid4())
+            return vocabulary_data
+
+        outcomes = await asyncio.gather(*(parse_label(label) for label in labels))
+        return dict(zip(labels.values(), outcomes))
+
+    except asyncio.TimeoutError:
+        logger.error(f"Gemini 응답 시간 초과 ({settings.gemini_timeout_seconds}초)")
+        raise AITimeoutException()
+
+    except _PASSTHROUGH_ERRORS:
+        raise
+
+    except Exception as e:
+        logger.error(f"Gemini API 알 수 없는 오류: {str(e)}")
+        raise AIUnknownException(debug_message=str(e))
+
+
+# 스트림 읽기 작업이 끝났다는 표시 (큐에 마지막으로 들어감)
+_STREAM_DONE = object()
+
+
+async def _read_stream(prompt: str, languages: tuple[str, ...], queue: asyncio.Queue) -> tuple[str, int]:
+    """
+    Gemini 스트림을 끝까지 읽으면서 완성된 카드를 queue에 넣습니다. (자리/서킷은 이 작업만 잡음)
+    -> 앱이 천천히 읽어도 Gemini 자리를 붙잡지 않고, 읽는 시간이 Gemini 지연으로 기록되지 않음
+
+    Returns:
+        (받은 전체 텍스트, 꺼낸 카드 수)
+    """
+    parser = JsonArrayStreamParser()
+    received = []
+    # 스트림은 이미 보낸 카드가 있어 재시도/헤징 없이 서킷 브레이커만 적용
+    async with gemini_breaker.guard(), gemini_limiter.slot():
+        with llm_in_flight.track(), span("gemini_stream"):
+            chunks = llm_backend.generate_stream(prompt, word_list_schema(languages)).__aiter__()
+            while True:
+                # 조각마다 시간 제한 적용 (첫 응답이 늦거나 중간에 멈추는 경우 대비)
+                try:
+                    chunk_text = await asyncio.wait_for(
+                        chunks.__anext__(),
+                        timeout=stage_timeout(settings.gemini_timeout_seconds),
+                    )
+                except StopAsyncIteration:
+                    break
+
+                received.append(chunk_text)
+                for item in _valid_items(parser.feed(chunk_text)):
+                    queue.put_nowait(item)
+    return "".join(received), parser.count
+
+
+async def stream_vocabulary(
+    transcript_list: list[dict],
+    languages: tuple[str, ...] = DEFAULT_LANGUAGES,
+) -> AsyncIterator[dict]:
+    """
+    extract_vocabulary()의 스트리밍 버전
+    Gemini 응답을 stream=True로 받으면서, 단어 카드 하나가 완성될 때마다
+    (id를 붙여서) 바로 yield 합니다. -> 앱이 첫 카드를 더 빨리 보여줄 수 있음
+    Gemini 스트림은 별도 작업(_read_stream)이 읽고, 여기서는 큐에서 꺼내 넘기기만 합니다.
+    """
+    try:
+        prompt = _build_prompt(transcript_to_text(transcript_list), languages=languages)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        reader = asyncio.ensure_future(_read_stream(prompt, languages, queue))
+        reader.add_done_callback(lambda _: queue.put_nowait(_STREAM_DONE))
+        try:
+            while (item := await queue.get()) is not _STREAM_DONE:
+                item["id"] = str(uuid.uuid4())
+                yield item
+            # 읽기 작업의 예외(시간 초과, 서킷 열림 등)는 여기서 그대로 올라옴
+            received_text, count = reader.result()
+        finally:
+            # 앱이 먼저 끊으면 Gemini 스트림도 그만 읽음 (자리 반납)
+            reader.cancel()
+
+        # 카드가 하나도 안 나왔다면 형식이 틀린 응답 -> 받은 텍스트로 복구 시도
+        # (자리를 놓은 뒤에 호출해야 후속 요청이 자리 대기로 막히지 않음)
+        if count == 0:
+            for item in await _parse_vocabulary(llm_backend, received_text, languages):
+                item["id"] = str(uuid.uuid4())
+                yield item
+
+    except asyncio.TimeoutError:
+        logger.error(f"Gemini 응답 시간 초과 ({settings.gemini_timeout_seconds}초)")
+        raise AITimeoutException()
+
+    except json.JSONDecodeError:
+        logger.error("Gemini 스트리밍 응답에서 단어 카드를 찾지 못했습니다.")
+        raise AIParseException()
+
+    except _PASSTHROUGH_ERRORS:
+        raise
+
+    except Exception as e:
+        logger.error(f"Gemini API 알 수 없는 오류: {str(e)}")
+        raise AIUnknownException(debug_message=str(e))
+
+
+
+async def translate_meanings(items: list[dict], languages: tuple[str, ...]) -> list[dict]:
+    """
+    이미 뽑아 둔 카드들에 다른 언어의 뜻을 더합니다. (자막은 다시 보내지 않음)
+    예: 한국어로 분석해 둔 영상을 일본어 사용자가 요청 -> 표현 3개와 그 문장만 보내 "ja" 뜻 생성
+
+    Returns:
+        뜻을 합친 새 카드 리스트 (입력 카드는 바꾸지 않음, 응답에 빠진 표현은 그대로)
+    """
+    result_text = ""
+    try:
+        prompt = _build_translation_prompt(items, languages)
+        result_text = await _generate_text(llm_backend, prompt, _translation_schema(languages))
+        translated, _ = parse_json_array(result_text)
+
+        # 표현으로 짝을 맞춤 (순서가 바뀌거나 일부가 빠져도 맞는 카드에만 더함)
+        meanings = {
+            _normalize_expression(str(entry.get("expression", ""))): _valid_meaning(entry)
+            for entry in translated
+        }
+        merged = []
+        for item in items:
+            meaning = meanings.get(_normalize_expression(item["expression"]), {})
+            item = dict(item)
+            item["meaning"] = {
+                **item.get("meaning", {}),
+                **{code: meaning[code] for code in languages if code in meaning},
+            }
+            merged.append(item)
+        return merged
+
+    except asyncio.TimeoutError:
+        logger.error(f"Gemini 응답 시간 초과 ({settings.gemini_timeout_seconds}초)")
+        raise AITimeoutException()
+
+    except ValueError:
+        logger.error(f"Gemini 뜻 번역 JSON 파싱 실패. 응답 내용: {result_text}")
+        raise AIParseException()
+
+    except _PASSTHROUGH_ERRORS:
+        raise
+
+    except Exception as e:
+        logger.error(f"Gemini API 알 수 없는 오류: {str(e)}")
+        raise AIUnknownException(debug_message=str(e))
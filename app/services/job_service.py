@@ -0,0 +1,340 @@
+"""
+=============================================================================
+[Job Service]
+설명: 오래 걸리는 분석을 "작업(Job)"으로 접수해 두고 백그라운드에서 처리합니다.
+      앱은 job id만 받아서 바로 돌아가고, 나중에 상태를 조회(폴링)하거나
+      완료 알림(웹훅)을 받습니다. -> 모바일 HTTP 타임아웃/중복 과금 방지
+핵심: - 작업 큐는 로컬 SQLite 파일 (서버 재시작/여러 워커 프로세스 간 공유 가능)
+      - 워커 풀 동시 실행 수 제한 + 실패 시 지수 백오프로 재시도
+      - 큐 깊이(상태별 작업 수) 조회 제공
+실행: 서버 안에서 자동으로 돌거나, 별도 프로세스로 `python -m app.services.job_service`
+=============================================================================
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import business_errors, run_in_thread
+from app.core.sqlite import ProcessLocalConnection
+from app.core.exceptions import (
+    BusinessException,
+    InvalidLinkException,
+    NoTranscriptException,
+    TranscriptsDisabledException,
+    UnsupportedLanguageException,
+)
+from app.services.analysis_service import analyze
+from app.services.callback_url import validate_callback_url
+from app.services.languages import localize_items, parse_target_langs
+from app.services.video_url import parse_video_url
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 작업 상태
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+
+# 다시 시도해도 결과가 같은 에러 (재시도하지 않음)
+_PERMANENT_ERRORS = (
+    InvalidLinkException,
+    NoTranscriptException,
+    TranscriptsDisabledException,
+    UnsupportedLanguageException,
+)
+
+
+# =============================================================================
+# 작업 큐 (SQLite)
+# =============================================================================
+class JobStore:
+    """작업 목록을 SQLite 파일에 저장합니다. (모든 메서드는 동기 - 스레드에서 호출)"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        # isolation_level=None: 트랜잭션을 직접 BEGIN/COMMIT으로 관리
+        # 연결은 처음 쓸 때 엶 (preload 후 fork된 워커마다 따로)
+        self._db = ProcessLocalConnection(
+            path, setup=self._setup, check_same_thread=False, isolation_level=None, timeout=30
+        )
+
+    @staticmethod
+    def _setup(conn: sqlite3.Connection) -> None:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " video_url TEXT NOT NULL,"
+            " target_lang TEXT NOT NULL,"
+            " callback_url TEXT,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " video_id TEXT,"
+            " result TEXT,"
+            " error_code TEXT,"
+            " error_message TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " next_run_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, next_run_at)")
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    def create(self, video_url: str, target_lang: str, callback_url: Optional[str]) -> dict:
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, video_url, target_lang, callback_url, status, created_at, updated_at, next_run_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, video_url, target_lang, callback_url, QUEUED, now, now, now),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def claim(self) -> Optional[dict]:
+        """
+        실행할 차례가 된 작업 하나를 RUNNING으로 바꾸고 가져옵니다.
+        (BEGIN IMMEDIATE로 잠가서 여러 프로세스가 같은 작업을 가져가지 않게 함)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? AND next_run_at <= ? ORDER BY next_run_at LIMIT 1",
+                    (QUEUED, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (RUNNING, now, row["id"]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        job = dict(row)
+        job["attempts"] += 1
+        return job
+
+    def succeed(self, job_id: str, video_id: str, result: list[dict]) -> None:
+        self._update(job_id, status=SUCCEEDED, video_id=video_id, result=json.dumps(result, ensure_ascii=False))
+
+    def fail(self, job_id: str, code: str, message: str) -> None:
+        self._update(job_id, status=FAILED, error_code=code, error_message=message)
+
+    def retry_later(self, job_id: str, delay: float, code: str, message: str) -> None:
+        self._update(job_id, status=QUEUED, next_run_at=time.time() + delay, error_code=code, error_message=message)
+
+    def requeue_stale(self, lease_seconds: float) -> int:
+        """서버가 죽어서 RUNNING 상태로 멈춘 작업을 다시 대기열로 돌려놓습니다."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, next_run_at = ?, updated_at = ? WHERE status = ? AND updated_at < ?",
+                (QUEUED, now, now, RUNNING, now - lease_seconds),
+            )
+        return cursor.rowcount
+
+    def counts(self) -> dict:
+        """상태별 작업 수 (큐 깊이)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def _update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+
+# =============================================================================
+# 워커 풀
+# =============================================================================
+class JobWorkerPool:
+    """큐에서 작업을 꺼내 analyze()를 실행하는 asyncio 워커 묶음"""
+
+    def __init__(self, store: JobStore, concurrency: int):
+        self.store = store
+        self.concurrency = concurrency
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = False
+
+        self.retries = 0
+        self.webhook_failures = 0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._stopping = False
+        requeued = self.store.requeue_stale(settings.job_lease_seconds)
+        if requeued:
+            logger.warning(f"멈춰 있던 작업 {requeued}개를 다시 대기열에 넣었습니다.")
+        self._tasks = [asyncio.create_task(self._worker_loop()) for _ in range(self.concurrency)]
+
+    async def stop(self, drain_seconds: float = 0) -> None:
+        """
+        새 작업은 더 꺼내지 않고, 실행 중인 작업은 최대 drain_seconds초 기다린 뒤 취소
+        (취소된 작업은 대기열로 되돌아가 다음 실행 때 다시 처리됨)
+        """
+        self._stopping = True
+        if self._tasks and drain_seconds > 0:
+            await asyncio.wait(self._tasks, timeout=drain_seconds)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def running(self) -> int:
+        return len(self._tasks)
+
+    async def _worker_loop(self) -> None:
+        while not self._stopping:
+            try:
+                job = await run_in_thread(self.store.claim)
+            except Exception as e:
+                logger.error(f"작업 큐 조회 실패: {str(e)}")
+                job = None
+
+            if job is None:
+                await asyncio.sleep(settings.job_poll_interval_seconds)
+                continue
+
+            await self._run_job(job)
+
+    async def _run_job(self, job: dict) -> None:
+        try:
+            video = parse_video_url(job["video_url"])
+            languages = parse_target_langs(job["target_lang"])
+            # 결과에는 요청한 언어의 뜻만 담아 저장 (조회/웹훅 응답 모양 그대로)
+            vocabulary_data = localize_items(await analyze(video, languages), languages)
+        except asyncio.CancelledError:
+            # 서버 종료 중: 다음 실행 때 바로 다시 처리되도록 대기열로 되돌림
+            await run_in_thread(self.store.retry_later, job["id"], 0, "CANCELLED", "서버 종료로 중단됨")
+            raise
+        except Exception as e:
+            await self._handle_failure(job, e)
+            return
+
+        await run_in_thread(self.store.succeed, job["id"], video.video_id, vocabulary_data)
+        await self._notify(job["id"])
+
+    async def _handle_failure(self, job: dict, error: Exception) -> None:
+        if isinstance(error, BusinessException):
+            code, message = error.code, error.detail
+        else:
+            code, message = "UNKNOWN_ERROR", str(error)
+        business_errors.inc(code=code)
+
+        if isinstance(error, _PERMANENT_ERRORS) or job["attempts"] >= settings.job_max_attempts:
+            logger.warning(f"작업 실패 확정 ({job['id']}, {code}, 시도 {job['attempts']}회)")
+            await run_in_thread(self.store.fail, job["id"], code, message)
+            await self._notify(job["id"])
+            return
+
+        # 지수 백오프 + 지터: 2초, 4초, 8초 ... (±50%)
+        delay = settings.job_retry_base_seconds * (2 ** (job["attempts"] - 1))
+        delay *= random.uniform(0.5, 1.5)
+        self.retries += 1
+        logger.info(f"작업 재시도 예약 ({job['id']}, {code}, {delay:.1f}초 후)")
+        await run_in_thread(self.store.retry_later, job["id"], delay, code, message)
+
+    async def _notify(self, job_id: str) -> None:
+        """callbackUrl이 있으면 최종 결과를 POST로 알려줍니다. (실패해도 작업 결과는 유지)"""
+        job = await run_in_thread(self.store.get, job_id)
+        if not job or not job["callback_url"]:
+            return
+        try:
+            # 접수 이후 DNS가 내부 주소로 바뀌었을 수도 있으니 보내기 직전에 다시 검사
+            await run_in_thread(validate_callback_url, job["callback_url"])
+            # 리다이렉트로 내부 주소에 닿지 않도록 따라가지 않음
+            async with httpx.AsyncClient(timeout=settings.job_webhook_timeout_seconds, follow_redirects=False) as client:
+                response = await client.post(job["callback_url"], json=job_to_payload(job))
+                response.raise_for_status()
+        except Exception as e:
+            self.webhook_failures += 1
+            logger.warning(f"웹훅 전송 실패 ({job_id}): {str(e)}")
+
+    async def stats(self) -> dict:
+        counts = await run_in_thread(self.store.counts)
+        return {
+            "queueDepth": counts[QUEUED],
+            "running": counts[RUNNING],
+            "succeeded": counts[SUCCEEDED],
+            "failed": counts[FAILED],
+            "workers": self.running(),
+            "retries": self.retries,
+            "webhookFailures": self.webhook_failures,
+        }
+
+
+def job_to_payload(job: dict) -> dict:
+    """DB 행 -> API 응답(JobResponse) 형태의 dict"""
+    payload = {
+        "jobId": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "createdAt": job["created_at"],
+        "updatedAt": job["updated_at"],
+        "result": None,
+        "code": None,
+        "message": None,
+    }
+    if job["status"] == SUCCEEDED:
+        payload["result"] = {
+            "videoId": job["video_id"],
+            "title": "uploaded_url",
+            "scriptItems": json.loads(job["result"]),
+        }
+    elif job["error_code"]:
+        # 실패 확정 또는 재시도 대기 중인 마지막 에러
+        payload["code"] = job["error_code"]
+        payload["message"] = job["error_message"]
+    return payload
+
+
+job_store = JobStore(settings.job_queue_path)
+job_workers = JobWorkerPool(job_store, settings.job_worker_concurrency)
+
+
+async def _run_standalone() -> None:
+    """별도 워커 프로세스로 실행 (API 서버와 같은 큐 파일을 공유)"""
+    job_workers.start()
+    logger.info(f"작업 워커 {job_workers.concurrency}개 실행 중 ({settings.job_queue_path})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await job_workers.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_standalone())
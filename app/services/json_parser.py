@@ -0,0 +1,142 @@
+"""
+=============================================================================
+[JSON Stream Parser]
+설명: Gemini가 조금씩 흘려보내는(stream) JSON 배열 텍스트에서
+      완성된 객체({ ... })가 나오는 즉시 하나씩 꺼내줍니다.
+예: '[{"expression": "a"}, {"expr'  -> {"expression": "a"} 먼저 반환
+    'ession": "b"}]'                 -> {"expression": "b"} 반환
+추가: parse_json_array()는 같은 원리로 잘리거나 뒤에 쓰레기가 붙은
+      응답에서도 살릴 수 있는 객체를 모두 건져냅니다.
+      split_json_object()는 {"v0": [...], "v1": [...]} 응답을 키별 원문 조각으로 나눠
+      키 하나가 깨져도 나머지 키는 따로 파싱/복구할 수 있게 합니다. (배치 분석용)
+=============================================================================
+"""
+
+import json
+import re
+
+
+class JsonArrayStreamParser:
+    """
+    최상위 배열 안의 객체를 완성되는 순서대로 돌려주는 점진적 파서
+    (문자열 안의 괄호나 이스케이프 문자는 무시합니다)
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0      # 다음에 검사할 위치
+        self._depth = 0         # 현재 중괄호 깊이 (배열 안 객체 기준)
+        self._object_start = -1
+        self._in_string = False
+        self._escaped = False
+        self.count = 0          # 지금까지 꺼낸 객체 수
+
+    def feed(self, text: str) -> list[dict]:
+        """새로 도착한 텍스트를 넣고, 이번에 완성된 객체들을 반환"""
+        self._buffer += text
+        completed = []
+
+        buffer = self._buffer
+        for index in range(self._position, len(buffer)):
+            char = buffer[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._object_start = index
+                self._depth += 1
+            elif char == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = buffer[self._object_start:index + 1]
+                    try:
+                        completed.append(json.loads(candidate))
+                    except json.JSONDecodeError:
+                        # 객체 하나가 깨졌으면 건너뛰고 다음 객체를 계속 찾음
+                        pass
+                    self._object_start = -1
+
+        # 이미 처리한 앞부분은 버려서 버퍼가 계속 커지지 않게 함
+        if self._depth == 0:
+            self._buffer = ""
+            self._position = 0
+        else:
+            self._buffer = buffer[self._object_start:]
+            self._position = len(self._buffer)
+            self._object_start = 0
+
+        self.count += len(completed)
+        return completed
+
+
+def parse_json_array(text: str) -> tuple[list[dict], bool]:
+    """
+    AI 응답 텍스트를 객체 리스트로 변환합니다. (관대한 파서)
+    1. 그대로 json.loads 시도 (정상 응답은 여기서 끝)
+    2. 실패하면 코드 블록/앞뒤 설명/잘린 꼬리를 무시하고 완성된 객체만 건져냄
+
+    Returns:
+        (객체 리스트, 2단계 복구를 거쳤는지 여부)
+
+    Raises:
+        ValueError: 건질 수 있는 객체가 하나도 없을 때
+    """
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        parsed = None
+
+    if isinstance(parsed, list):
+        return [item for item in parsed if isinstance(item, dict)], False
+    if isinstance(parsed, dict):
+        # {"items": [...]} 처럼 한 번 감싸서 온 경우
+        for value in parsed.values():
+            if isinstance(value, list):
+                return [item for item in value if isinstance(item, dict)], True
+        return [parsed], True
+
+    recovered = JsonArrayStreamParser().feed(text)
+    if not recovered:
+        raise ValueError("JSON 객체를 찾을 수 없습니다.")
+    return recovered, True
+
+
+def split_json_object(text: str, keys) -> dict[str, str]:
+    """
+    최상위 객체 응답 -> {키: 그 키 값의 JSON 원문} (관대한 분리)
+    1. 그대로 json.loads 되면 키별 값을 다시 JSON 문자열로
+    2. 실패하면 '"키":'가 나오는 위치를 기준으로 원문을 잘라서 나눔
+       (잘린 꼬리나 깨진 부분은 그 키의 조각에만 남음 -> parse_json_array로 건짐)
+
+    Returns:
+        찾은 키만 담은 dict (응답에 아예 없는 키는 빠짐)
+    """
+    keys = list(keys)
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        parsed = None
+
+    if isinstance(parsed, dict):
+        return {key: json.dumps(parsed[key], ensure_ascii=False) for key in keys if key in parsed}
+
+    pattern = re.compile('"(' + "|".join(re.escape(key) for key in keys) + r')"\s*:')
+    matches: dict[str, re.Match] = {}
+    for match in pattern.finditer(text):
+        # 같은 키가 또 나오면 (뜻 문장 안 등) 처음 위치만 사용
+        matches.setdefault(match.group(1), match)
+    ordered = sorted(matches.values(), key=lambda match: match.start())
+    sections = {}
+    for index, match in enumerate(ordered):
+        end = ordered[index + 1].start() if index + 1 < len(ordered) else len(text)
+        sections[match.group(1)] = text[match.end():end]
+    return sections
@@ -0,0 +1,94 @@
+"""
+=============================================================================
+[Target Languages]
+설명: targetLang("ko", "ko,ja", "ja-JP" ...)을 한 번만 파싱해서 언어 코드 튜플로 만들고,
+      단어 카드의 뜻(meaning: {언어: 뜻})을 요청한 언어만 남겨 응답 모양으로 바꿉니다.
+핵심: - 결과 캐시는 영상당 하나이고, 카드마다 지금까지 만든 모든 언어의 뜻을 모아 둡니다.
+        -> 응답할 때 요청한 언어만 골라 담음 (localize_items)
+        -> 모자란 언어는 자막 없이 표현만 보내 번역 (missing_languages로 확인)
+      - 예전 앱 호환: "ko"를 요청하면 meaningKr에도 한국어 뜻을 담음
+=============================================================================
+"""
+
+from functools import lru_cache
+from typing import Iterable
+
+from app.core.config import settings
+from app.core.exceptions import UnsupportedLanguageException
+
+# 프롬프트에 쓰는 언어 이름 (없는 코드는 코드 그대로 사용)
+LANGUAGE_NAMES = {
+    "ko": "Korean",
+    "ja": "Japanese",
+    "vi": "Vietnamese",
+    "zh": "Simplified Chinese",
+    "es": "Spanish",
+    "id": "Indonesian",
+    "th": "Thai",
+    "en": "English",
+}
+
+SUPPORTED_LANGUAGES = tuple(
+    code.strip().lower() for code in settings.supported_target_langs.split(",") if code.strip()
+)
+DEFAULT_LANGUAGES = SUPPORTED_LANGUAGES[:1]
+
+
+def language_name(code: str) -> str:
+    return LANGUAGE_NAMES.get(code, code)
+
+
+@lru_cache(maxsize=256)
+def _parse(value: str) -> tuple[str, ...]:
+    languages = []
+    for part in value.split(","):
+        # "ja-JP", "ko_KR" 같은 지역 표기는 언어 부분만 사용
+        code = part.strip().replace("_", "-").split("-", 1)[0].lower()
+        if not code:
+            continue
+        if code not in SUPPORTED_LANGUAGES:
+            raise UnsupportedLanguageException(part.strip())
+        if code not in languages:
+            languages.append(code)
+    if not languages:
+        return DEFAULT_LANGUAGES
+    if len(languages) > settings.max_target_langs:
+        raise UnsupportedLanguageException(f"최대 {settings.max_target_langs}개까지 요청할 수 있습니다 ({value})")
+    return tuple(languages)
+
+
+def parse_target_langs(value: str) -> tuple[str, ...]:
+    """
+    targetLang 문자열 -> 중복 없는 언어 코드 튜플 (요청한 순서 그대로)
+    비어 있으면 기본 언어, 지원하지 않는 언어가 섞여 있으면 UnsupportedLanguageException
+    """
+    return _parse(value or "")
+
+
+def merge_languages(groups: Iterable[tuple[str, ...]]) -> tuple[str, ...]:
+    """여러 요청의 언어를 순서를 지키며 합침 (배치 프롬프트 하나로 모두 만들 때)"""
+    merged: list[str] = []
+    for languages in groups:
+        merged.extend(code for code in languages if code not in merged)
+    return tuple(merged)
+
+
+def missing_languages(items: list[dict], languages: tuple[str, ...]) -> tuple[str, ...]:
+    """카드 중 하나라도 뜻이 없는 요청 언어들"""
+    return tuple(
+        code for code in languages
+        if any(not (item.get("meaning") or {}).get(code) for item in items)
+    )
+
+
+def localize_item(item: dict, languages: tuple[str, ...]) -> dict:
+    """카드 하나 -> 요청한 언어의 뜻만 담은 카드 (meaningKr 호환 필드 포함)"""
+    meanings = item.get("meaning") or {}
+    localized = dict(item)
+    localized["meaning"] = {code: meanings[code] for code in languages if meanings.get(code)}
+    localized["meaningKr"] = meanings.get("ko") if "ko" in languages else None
+    return localized
+
+
+def localize_items(items: list[dict], languages: tuple[str, ...]) -> list[dict]:
+    return [localize_item(item, languages) for item in items]
@@ -0,0 +1,171 @@
+"""
+=============================================================================
+[LLM Backend]
+설명: gemini_service가 실제로 텍스트를 생성할 때 쓰는 "엔진"을 갈아 끼울 수 있게 합니다.
+      - GeminiBackend : 실제 Google Gemini (google.generativeai)
+      - StubLLMBackend : 네트워크 없이 지연/에러를 흉내 내는 부하 테스트용 (stub_backends.py)
+선택: 설정값 LLM_BACKEND ("gemini" | "stub")
+=============================================================================
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from google.generativeai import client as genai_client
+
+from app.core.config import settings
+from app.core.metrics import llm_tokens
+from app.core.resilience import TransientUpstreamError
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+
+# 잠시 뒤 다시 시도하면 성공할 수 있는 오류 (일시 장애, 순간 쿼터 초과, 시간 초과)
+RETRYABLE_LLM_ERRORS = (
+    TransientUpstreamError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    asyncio.TimeoutError,
+)
+
+
+class LLMBackend:
+    """
+    백엔드 인터페이스. 새 엔진을 추가하려면 generate / generate_stream만 구현하면 됩니다.
+    (동시 호출 수 제한, 시간 제한, 파싱은 gemini_service가 공통으로 처리)
+    """
+    # 캐시 키에 들어가는 이름 (엔진이 다르면 결과도 따로 저장)
+    model_name = "unknown"
+    # 준비 상태 (/ready에 표시): start() 완료 / warm_up() 성공
+    started = False
+    warmed = False
+
+    def start(self) -> None:
+        """서버 시작 시 한 번 호출 (연결 준비)"""
+        self.started = True
+
+    async def warm_up(self) -> None:
+        """연결을 미리 열어두는 가벼운 요청 (선택)"""
+        self.warmed = True
+
+    async def close(self) -> None:
+        """서버 종료 시 연결 정리"""
+
+    async def generate(self, prompt: str, response_schema: Optional[dict] = None) -> str:
+        raise NotImplementedError
+
+    def generate_stream(self, prompt: str, response_schema: Optional[dict] = None) -> AsyncIterator[str]:
+        """생성된 텍스트를 조각(str) 단위로 흘려보내는 비동기 이터레이터"""
+        raise NotImplementedError
+
+
+# =============================================================================
+# 실제 Gemini (서버 시작 시 한 번만 설정)
+# =============================================================================
+class GeminiBackend(LLMBackend):
+    """
+    프로세스 전체가 함께 쓰는 Gemini 모델 객체
+    - 서버 시작(lifespan) 때 만들어 두고 요청마다 재사용합니다.
+      (요청마다 GenerativeModel을 새로 만들지 않으므로 gRPC 채널도 재사용됨)
+    - 서버 종료 때 연결을 정리합니다.
+    """
+
+    def __init__(self):
+        self.model_name = settings.gemini_model_name
+        self.model = None
+        # start()에서 받아 둔 비동기 클라이언트 (모델도 같은 SDK 기본 클라이언트를 씀) -> close()에서 정리
+        self.async_client = None
+
+    def start(self) -> None:
+        if self.model is not None:
+            return
+        # configure()는 SDK 기본 클라이언트를 비우므로, 재시작해도 새 채널을 받음
+        genai.configure(api_key=settings.gemini_api_key)
+        self.async_client = genai_client.get_default_generative_async_client()
+        self.model = genai.GenerativeModel(
+            self.model_name,
+            generation_config={
+                "temperature": settings.gemini_temperature,
+                "max_output_tokens": settings.gemini_max_output_tokens,
+                "response_mime_type": settings.gemini_response_mime_type,
+            },
+        )
+        self.started = True
+        logger.info(f"Gemini 모델 준비 완료 ({self.model_name})")
+
+    def get_model(self):
+        """lifespan 없이 실행된 경우(스크립트, 단독 워커 등)에는 처음 호출 때 생성"""
+        if self.model is None:
+            self.start()
+        return self.model
+
+    async def warm_up(self) -> None:
+        """
+        가벼운 토큰 세기 요청으로 연결(TLS/gRPC 채널)을 미리 열어둡니다.
+        -> 첫 사용자 요청이 연결 수립 시간까지 떠안지 않도록
+        """
+        try:
+            await asyncio.wait_for(
+                self.get_model().count_tokens_async("warm up"),
+                timeout=settings.gemini_timeout_seconds,
+            )
+            self.warmed = True
+            logger.info("Gemini 웜업 완료")
+        except Exception as e:
+            # 웜업 실패로 서버가 안 뜨면 안 되므로 로그만 남김
+            logger.warning(f"Gemini 웜업 실패: {str(e)}")
+
+    async def close(self) -> None:
+        """비동기 gRPC 채널 정리 (서버 종료 시)"""
+        if self.async_client is not None:
+            try:
+                await self.async_client.transport.close()
+            except Exception as e:
+                logger.warning(f"Gemini 연결 종료 실패: {str(e)}")
+        self.async_client = None
+        self.model = None
+        self.started = self.warmed = False
+
+    def _record_usage(self, usage) -> None:
+        """응답의 usage_metadata(입력/출력 토큰 수)를 지표에 반영"""
+        if usage is None:
+            return
+        llm_tokens.inc(getattr(usage, "prompt_token_count", 0) or 0, model=self.model_name, kind="prompt")
+        llm_tokens.inc(getattr(usage, "candidates_token_count", 0) or 0, model=self.model_name, kind="output")
+
+    @staticmethod
+    def _generation_config(response_schema: Optional[dict]) -> Optional[dict]:
+        return {"response_schema": response_schema} if response_schema else None
+
+    async def generate(self, prompt: str, response_schema: Optional[dict] = None) -> str:
+        response = await self.get_model().generate_content_async(
+            prompt, generation_config=self._generation_config(response_schema)
+        )
+        self._record_usage(getattr(response, "usage_metadata", None))
+        return response.text
+
+    async def generate_stream(self, prompt: str, response_schema: Optional[dict] = None) -> AsyncIterator[str]:
+        response = await self.get_model().generate_content_async(
+            prompt, stream=True, generation_config=self._generation_config(response_schema)
+        )
+        usage = None
+        async for chunk in response:
+            # 토큰 수는 마지막 조각에 전체 합계로 들어옴
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield chunk.text
+        self._record_usage(usage)
+
+
+def build_llm_backend() -> LLMBackend:
+    """설정값(LLM_BACKEND)에 따라 백엔드 선택"""
+    if settings.llm_backend.lower() == "stub":
+        # 부하 테스트 전용 모듈은 필요할 때만 불러옴
+        from app.services.stub_backends import StubLLMBackend
+        return StubLLMBackend()
+    return GeminiBackend()
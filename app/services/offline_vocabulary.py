@@ -0,0 +1,60 @@
+"""
+=============================================================================
+[Offline Vocabulary]
+설명: Gemini를 쓸 수 없을 때(서킷 열림) 내보내는 최소한의 단어장입니다.
+      자주 쓰는 관용 표현 사전에서 자막에 실제로 등장한 표현만 골라 돌려줍니다.
+      (품질은 낮으므로 결과 캐시에는 저장하지 않음 -> 복구 후 다시 분석됨)
+=============================================================================
+"""
+
+import re
+import uuid
+
+# 표현 -> (한국어 뜻, 문맥 태그)
+_IDIOMS = {
+    "call it a day": ("오늘은 여기까지 하다", "CASUAL"),
+    "hit the road": ("길을 나서다, 출발하다", "CASUAL"),
+    "figure out": ("알아내다, 이해하다", "CASUAL"),
+    "make sense": ("말이 되다, 이해가 되다", "CASUAL"),
+    "break a leg": ("행운을 빌어", "ENCOURAGE"),
+    "to be honest": ("솔직히 말하면", "CASUAL"),
+    "piece of cake": ("식은 죽 먹기", "SLANG"),
+    "run out of": ("~이 다 떨어지다", "CASUAL"),
+    "at the end of the day": ("결국에는", "BUSINESS"),
+    "hang in there": ("조금만 버텨", "ENCOURAGE"),
+    "by the way": ("그나저나", "CASUAL"),
+    "look it up": ("찾아보다", "CASUAL"),
+    "kind of": ("약간, 어느 정도", "CASUAL"),
+    "no worries": ("걱정 마", "CASUAL"),
+    "catch up": ("따라잡다, 근황을 나누다", "CASUAL"),
+    "get the hang of": ("요령을 익히다", "CASUAL"),
+    "on the same page": ("같은 생각이다", "BUSINESS"),
+    "touch base": ("잠깐 연락하다", "BUSINESS"),
+    "long time no see": ("오랜만이야", "GREETING"),
+    "what's up": ("잘 지내?", "GREETING"),
+}
+
+_PATTERNS = {
+    expression: re.compile(r"\b" + re.escape(expression) + r"\b", re.IGNORECASE)
+    for expression in _IDIOMS
+}
+
+
+def offline_vocabulary(full_text: str, limit: int = 3) -> list[dict]:
+    """자막 텍스트에 등장한 관용 표현을 (등장 순서대로) 최대 limit개 반환"""
+    found = []
+    for expression, pattern in _PATTERNS.items():
+        match = pattern.search(full_text)
+        if match:
+            found.append((match.start(), expression))
+
+    vocabulary_data = []
+    for _, expression in sorted(found)[:limit]:
+        meaning, tag = _IDIOMS[expression]
+        vocabulary_data.append({
+            "id": str(uuid.uuid4()),
+            "expression": expression,
+            "meaning": {"ko": meaning},
+            "contextTag": tag,
+        })
+    return vocabulary_data
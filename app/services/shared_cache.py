@@ -0,0 +1,325 @@
+"""
+=============================================================================
+[Shared Cache]
+설명: 같은 서버(호스트)의 모든 워커 프로세스가 함께 읽고 쓰는 로컬 캐시입니다.
+      워커마다 메모리 캐시를 따로 들고 있으면 워커 N개일 때 같은 영상이
+      최대 N번 분석/다운로드되므로, 자막 / 분석 결과 / Gemini 응답을
+      여기(파일 하나)에 두고 모든 워커가 공유합니다. (외부 서비스 없이)
+핵심: - SQLite WAL 모드: 읽기는 서로 막지 않고, 쓰기 중에도 읽기가 계속됨
+      - mmap: 읽기가 OS 페이지 캐시를 그대로 보므로 워커끼리 같은 메모리를 공유
+      - 네임스페이스("result", "transcript", "llm" ...)로 용도별 키를 나눔
+        -> namespace("result")는 CacheBackend와 같은 get / set / delete / recent 제공
+      - 크기 제한: 전체 크기(트리거로 따로 세어 둠)가 SHARED_CACHE_MAX_BYTES를 넘으면
+        가장 오래 안 읽은 항목부터 제거 (읽은 시각은 SHARED_CACHE_TOUCH_SECONDS 간격으로만 갱신)
+      - 정리(compact): 만료 후 SHARED_CACHE_STALE_SECONDS가 지난 항목 삭제 + 빈 페이지 반납
+        (만료 직후 항목은 외부 장애 때 대신 쓸 수 있도록 남겨둠)
+실행: python -m app.services.shared_cache            (상태 보기)
+      python -m app.services.shared_cache --compact  (바로 정리)
+=============================================================================
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Union
+
+from app.core.config import settings
+from app.core.sqlite import ProcessLocalConnection
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+Payload = Union[str, bytes]
+
+# 크기 제한을 넘었을 때 이 비율까지 줄임 (매번 조금씩 지우지 않도록 여유를 둠)
+_EVICT_TARGET_RATIO = 0.9
+# 한 번에 제거 후보로 읽는 항목 수
+_EVICT_BATCH = 64
+# 정리 때 한 번에 반납하는 빈 페이지 수
+_VACUUM_PAGES = 2048
+
+
+def _payload_size(payload: Payload) -> int:
+    return len(payload.encode("utf-8")) if isinstance(payload, str) else len(payload)
+
+
+class SharedCache:
+    """
+    (namespace, key) -> (payload, expires_at) 저장소 (모든 메서드는 동기 - 스레드에서 호출)
+    payload는 str(TEXT) 또는 bytes(BLOB) 그대로 저장하고 그대로 돌려줍니다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        stale_seconds: float = 0.0,
+        touch_seconds: float = 60.0,
+        compact_every: int = 500,
+        mmap_bytes: int = 0,
+    ):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        self.touch_seconds = touch_seconds
+        self.compact_every = compact_every
+        self.mmap_bytes = mmap_bytes
+
+        self._lock = threading.Lock()
+        # isolation_level=None: 트랜잭션을 직접 BEGIN/COMMIT으로 관리
+        # 연결은 처음 쓸 때 엶 (preload 후 fork된 워커마다 따로)
+        self._db = ProcessLocalConnection(
+            path, setup=self._setup, check_same_thread=False, isolation_level=None, timeout=10
+        )
+        # 이 프로세스에서 마지막 정리 이후 쓴 횟수
+        self._writes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        # auto_vacuum은 테이블을 만들기 전에 정해야 적용됨 (지운 만큼 파일을 줄일 수 있게)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL에서는 NORMAL이어도 손상되지 않음 (전원이 꺼지면 마지막 쓰기 몇 개만 잃을 수 있음 - 캐시라 괜찮음)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if self.mmap_bytes > 0:
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shared_cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, payload BLOB NOT NULL,"
+                " size INTEGER NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+                " UNIQUE (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS shared_cache_lru ON shared_cache (accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS shared_cache_expiry ON shared_cache (expires_at)")
+            # 전체 크기를 매번 SUM()으로 세지 않도록 트리거로 따로 관리 (모든 프로세스가 같은 값을 봄)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shared_cache_meta (id INTEGER PRIMARY KEY CHECK (id = 0), total_bytes INTEGER NOT NULL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO shared_cache_meta (id, total_bytes) VALUES (0, 0)")
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS shared_cache_size_insert AFTER INSERT ON shared_cache BEGIN"
+                " UPDATE shared_cache_meta SET total_bytes = total_bytes + NEW.size WHERE id = 0; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS shared_cache_size_update AFTER UPDATE OF size ON shared_cache BEGIN"
+                " UPDATE shared_cache_meta SET total_bytes = total_bytes + NEW.size - OLD.size WHERE id = 0; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS shared_cache_size_delete AFTER DELETE ON shared_cache BEGIN"
+                " UPDATE shared_cache_meta SET total_bytes = total_bytes - OLD.size WHERE id = 0; END"
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    def namespace(self, name: str) -> "SharedCacheNamespace":
+        return SharedCacheNamespace(self, name)
+
+    # ---------------------------------------------------------
+    # 읽기 / 쓰기
+    # ---------------------------------------------------------
+    def get(self, namespace: str, key: str) -> Optional[tuple[Payload, float]]:
+        """(payload, expires_at) 반환, 없으면 None (만료 여부는 호출하는 쪽에서 판단)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at, accessed_at FROM shared_cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            if now - row[2] >= self.touch_seconds:
+                # LRU 순서용 읽은 시각 갱신 (매번 쓰면 읽기가 쓰기 잠금을 두고 다투므로 가끔만)
+                self._conn.execute(
+                    "UPDATE shared_cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, namespace, key),
+                )
+        return row[0], row[1]
+
+    def set(self, namespace: str, key: str, payload: Payload, expires_at: float) -> None:
+        size = _payload_size(payload)
+        if size > self.max_bytes:
+            # 캐시 전체보다 큰 값은 저장하지 않음 (다른 항목을 전부 밀어내지 않도록)
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO shared_cache (namespace, key, payload, size, expires_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (namespace, key) DO UPDATE SET"
+                    " payload = excluded.payload, size = excluded.size,"
+                    " expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                    (namespace, key, payload, size, expires_at, now),
+                )
+                self._evict_locked(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self._writes += 1
+            due = self.compact_every > 0 and self._writes >= self.compact_every
+        if due:
+            self.compact()
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM shared_cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def recent(self, namespace: str, limit: int) -> list[tuple[str, Payload, float]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT key, payload, expires_at FROM shared_cache WHERE namespace = ? AND expires_at > ?"
+                " ORDER BY expires_at DESC LIMIT ?",
+                (namespace, time.time(), limit),
+            ).fetchall()
+
+    # ---------------------------------------------------------
+    # 크기 제한 / 정리
+    # ---------------------------------------------------------
+    def _total_bytes(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT total_bytes FROM shared_cache_meta WHERE id = 0").fetchone()[0]
+
+    def _evict_locked(self, conn: sqlite3.Connection) -> int:
+        """(쓰기 트랜잭션 안에서) 크기 제한을 넘었으면 오래 안 읽은 항목부터 제거 -> 제거한 수"""
+        excess = self._total_bytes(conn) - self.max_bytes
+        if excess <= 0:
+            return 0
+        # 제한의 90%까지 줄임
+        excess += int(self.max_bytes * (1 - _EVICT_TARGET_RATIO))
+        removed = 0
+        while excess > 0:
+            rows = conn.execute(
+                "SELECT rowid, size FROM shared_cache ORDER BY accessed_at LIMIT ?", (_EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for rowid, size in rows:
+                victims.append((rowid,))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany("DELETE FROM shared_cache WHERE rowid = ?", victims)
+            removed += len(victims)
+        self.evicted += removed
+        return removed
+
+    def compact(self) -> dict:
+        """
+        만료 후 stale_seconds가 지난 항목 삭제 + 크기 제한 적용 + 빈 페이지를 파일에서 반납
+        (여러 워커가 동시에 불러도 쓰기 잠금 때문에 차례로 실행됨)
+        """
+        started = time.perf_counter()
+        with self._lock:
+            conn = self._conn
+            self._writes = 0
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = conn.execute(
+                    "DELETE FROM shared_cache WHERE expires_at <= ?", (time.time() - self.stale_seconds,)
+                ).rowcount
+                evicted = self._evict_locked(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages:
+                conn.execute(f"PRAGMA incremental_vacuum({_VACUUM_PAGES})")
+            # WAL 파일이 계속 커지지 않도록 (읽는 중인 워커가 있으면 가능한 만큼만)
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        report = {
+            "expired": expired,
+            "evicted": evicted,
+            "freedPages": min(free_pages, _VACUUM_PAGES),
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+        if expired or evicted:
+            logger.info(f"공용 캐시 정리: 만료 {expired}개, 크기 초과 {evicted}개 삭제")
+        return report
+
+    def stats(self) -> dict:
+        with self._lock:
+            conn = self._conn
+            total = self._total_bytes(conn)
+            namespaces = conn.execute(
+                "SELECT namespace, COUNT(*), SUM(size) FROM shared_cache GROUP BY namespace"
+            ).fetchall()
+        return {
+            "path": self.path,
+            "totalBytes": total,
+            "maxBytes": self.max_bytes,
+            "namespaces": {name: {"entries": count, "bytes": size} for name, count, size in namespaces},
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+        }
+
+
+class SharedCacheNamespace:
+    """
+    공용 캐시의 네임스페이스 하나
+    cache_service.CacheBackend와 같은 get / set / delete / recent를 제공하므로
+    ResultCache, TranscriptStore의 영구 저장소로 그대로 씁니다.
+    """
+
+    def __init__(self, cache: SharedCache, name: str):
+        self.cache = cache
+        self.name = name
+
+    def get(self, key: str) -> Optional[tuple[Payload, float]]:
+        return self.cache.get(self.name, key)
+
+    def set(self, key: str, payload: Payload, expires_at: float) -> None:
+        self.cache.set(self.name, key, payload, expires_at)
+
+    def delete(self, key: str) -> None:
+        self.cache.delete(self.name, key)
+
+    def recent(self, limit: int) -> list[tuple[str, Payload, float]]:
+        return self.cache.recent(self.name, limit)
+
+
+shared_cache = SharedCache(
+    settings.shared_cache_path,
+    max_bytes=settings.shared_cache_max_bytes,
+    stale_seconds=settings.shared_cache_stale_seconds,
+    touch_seconds=settings.shared_cache_touch_seconds,
+    compact_every=settings.shared_cache_compact_every,
+    mmap_bytes=settings.shared_cache_mmap_bytes,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="워커 공용 캐시 상태 보기 / 정리")
+    parser.add_argument("--compact", action="store_true", help="만료 항목 삭제 + 크기 제한 적용 + 파일 줄이기")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.compact:
+        print(json.dumps(shared_cache.compact(), ensure_ascii=False))
+    print(json.dumps(shared_cache.stats(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
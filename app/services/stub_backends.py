@@ -0,0 +1,241 @@
+"""
+=============================================================================
+[Stub Backends]
+설명: 네트워크 없이 Gemini / YouTube를 흉내 내는 결정적(deterministic) 스텁입니다.
+      부하 테스트, 벤치마크, 오프라인 개발에서 쿼터와 외부 지연 없이
+      서버 자체의 처리량/지연만 측정할 수 있게 합니다.
+사용: LLM_BACKEND=stub, TRANSCRIPT_PROVIDER=stub
+      - 지연: 중앙값(ms) * exp(sigma * N(0,1)) (로그정규) + 입력 토큰당 지연
+      - 실패: 설정한 확률로 TransientUpstreamError 발생 (실제 일시 장애처럼 재시도/서킷 대상)
+      - 응답: STUB_LLM_RESPONSES_PATH의 미리 준비한 응답을 차례로 돌려주거나,
+              없으면 프롬프트 속 자막에서 표현을 골라 JSON을 만들어 냅니다.
+=============================================================================
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import time
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+from app.core.metrics import llm_tokens, span
+from app.core.resilience import TransientUpstreamError
+from app.services.llm_backend import LLMBackend
+from app.services.transcript_provider import TranscriptProvider
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+_COUNT_RE = re.compile(r"extract (\d+) key expressions")
+_LABEL_RE = re.compile(r"^\s*\[(v\d+)\]\s*$", re.MULTILINE)
+_WORD_RE = re.compile(r"[A-Za-z']+")
+_TAGS = ("CASUAL", "BUSINESS", "GREETING", "SLANG", "ENCOURAGE")
+
+# 스트리밍 응답을 몇 조각으로 나눠 보낼지
+_STREAM_CHUNKS = 4
+
+# 스텁 자막에 쓰는 문장들 (영상 ID에 따라 순서만 달라짐)
+_SENTENCES = (
+    "honestly I was about to call it a day",
+    "but then we decided to hit the road anyway",
+    "you have to figure out what makes sense for you",
+    "break a leg out there tonight",
+    "to be honest it was a piece of cake",
+    "we kind of ran out of time at the end of the day",
+    "hang in there it gets better",
+    "by the way did you look it up",
+)
+
+
+def sample_latency(rng: random.Random, median_ms: float, sigma: float) -> float:
+    """중앙값 median_ms, 흔들림 sigma인 로그정규 지연 (초)"""
+    if median_ms <= 0:
+        return 0.0
+    jitter = math.exp(sigma * rng.gauss(0.0, 1.0)) if sigma > 0 else 1.0
+    return median_ms * jitter / 1000
+
+
+def _stable_index(text: str, modulo: int) -> int:
+    """실행할 때마다 같은 값이 나오는 해시 (내장 hash()는 프로세스마다 달라짐)"""
+    return int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:4], "big") % modulo
+
+
+def _meaning(phrase: str, languages: list[str]) -> dict:
+    """언어별 가짜 뜻 (한국어는 예전 스텁과 같은 문구)"""
+    return {code: f"{phrase}의 뜻" if code == "ko" else f"{phrase} ({code})" for code in languages}
+
+
+def _make_items(text: str, count: int, languages: list[str] = ("ko",)) -> list[dict]:
+    """자막 텍스트에서 서로 다른 3단어 구절 count개를 골라 WordItem 모양으로 만듦"""
+    words = _WORD_RE.findall(text)
+    if len(words) < 3:
+        words = (words + ["stub", "expression", "here"])[:3]
+
+    items = []
+    seen = set()
+    start = _stable_index(text, len(words))
+    for step in range(len(words)):
+        if len(items) >= count:
+            break
+        index = (start + step * 7) % len(words)
+        phrase = " ".join(words[index:index + 3])
+        if len(phrase.split()) < 3 or phrase.lower() in seen:
+            continue
+        seen.add(phrase.lower())
+        items.append({
+            "expression": phrase,
+            "meaning": _meaning(phrase, languages),
+            "contextTag": _TAGS[_stable_index(phrase, len(_TAGS))],
+        })
+    return items
+
+
+def _schema_languages(schema: Optional[dict]) -> list[str]:
+    """
+    응답 스키마의 뜻(meaning) 객체에서 언어 코드를 꺼냄 (스키마가 없으면 한국어만)
+    단어 목록/번역은 리스트 -> 카드 -> meaning, 배치는 라벨 -> 리스트 -> 카드 -> meaning
+    """
+    if not schema:
+        return ["ko"]
+    if schema["type"] == "ARRAY":
+        return _schema_languages(schema["items"])
+    properties = schema.get("properties") or {}
+    if "meaning" in properties:
+        return list(properties["meaning"]["properties"])
+    # 배치 응답: 모든 라벨이 같은 언어를 쓰므로 첫 라벨 기준
+    for value in properties.values():
+        return _schema_languages(value)
+    return ["ko"]
+
+
+def _section(prompt: str, header: str) -> str:
+    """프롬프트에서 'Transcript:' 같은 머리말 뒤의 본문만 잘라냄"""
+    _, _, rest = prompt.partition(header)
+    return rest.split("Return strictly", 1)[0]
+
+
+class StubLLMBackend(LLMBackend):
+    """Gemini 대신 쓰는 가짜 텍스트 생성 엔진"""
+    model_name = "stub"
+
+    def __init__(self):
+        self._rng = random.Random(settings.stub_seed)
+        self._canned: list = []
+        self._canned_index = 0
+        self.calls = 0
+        self.prompt_tokens = 0
+
+        if settings.stub_llm_responses_path:
+            with open(settings.stub_llm_responses_path, encoding="utf-8") as f:
+                self._canned = json.load(f)
+            logger.info(f"스텁 응답 {len(self._canned)}개 로드 ({settings.stub_llm_responses_path})")
+
+    def start(self) -> None:
+        self.started = True
+        logger.info("스텁 LLM 백엔드 사용 (네트워크 호출 없음)")
+
+    def _respond(self, prompt: str, response_schema: Optional[dict] = None) -> str:
+        """프롬프트 종류에 맞는 응답 텍스트 생성 (뜻 언어는 실제 Gemini처럼 응답 스키마를 따름)"""
+        if self._canned:
+            # 미리 준비한 응답을 차례로 사용 (문자열이면 깨진 응답도 그대로 흉내 가능)
+            canned = self._canned[self._canned_index % len(self._canned)]
+            self._canned_index += 1
+            return canned if isinstance(canned, str) else json.dumps(canned, ensure_ascii=False)
+
+        languages = _schema_languages(response_schema)
+
+        # 형식 복구 요청: 깨진 본문에서 건질 수 있는 표현만 다시 돌려줌
+        if "is malformed" in prompt:
+            return json.dumps(_make_items(_section(prompt, "Text:"), 3, languages), ensure_ascii=False)
+
+        # 뜻 번역 요청: 받은 표현마다 요청 언어의 뜻만 돌려줌
+        if "Translate the meaning" in prompt:
+            expressions = json.loads(_section(prompt, "Expressions:"))
+            return json.dumps(
+                [{"expression": entry["expression"], "meaning": _meaning(entry["expression"], languages)}
+                 for entry in expressions],
+                ensure_ascii=False,
+            )
+
+        match = _COUNT_RE.search(prompt)
+        count = int(match.group(1)) if match else 3
+
+        # 배치 프롬프트: [v0], [v1] ... 라벨별 객체
+        labels = _LABEL_RE.findall(prompt)
+        if labels:
+            body = _section(prompt, "Transcripts:")
+            parts = _LABEL_RE.split(body)[1:]
+            sections = dict(zip(parts[0::2], parts[1::2]))
+            result = {label: _make_items(sections.get(label, ""), count, languages) for label in labels}
+            return json.dumps(result, ensure_ascii=False)
+
+        return json.dumps(_make_items(_section(prompt, "Transcript:"), count, languages), ensure_ascii=False)
+
+    def _latency(self, prompt: str) -> float:
+        tokens = len(prompt) // 4 + 1
+        self.calls += 1
+        self.prompt_tokens += tokens
+        return (
+            sample_latency(self._rng, settings.stub_llm_latency_ms, settings.stub_llm_latency_sigma)
+            + tokens * settings.stub_llm_per_token_ms / 1000
+        )
+
+    def _maybe_fail(self) -> None:
+        if self._rng.random() < settings.stub_llm_error_rate:
+            raise TransientUpstreamError("스텁 LLM 호출 실패 (STUB_LLM_ERROR_RATE)")
+
+    def _record_usage(self, prompt: str, text: str) -> None:
+        # 실제 usage_metadata 대신 글자 수 기반 대략치로 같은 지표를 채움
+        llm_tokens.inc(len(prompt) // 4 + 1, model=self.model_name, kind="prompt")
+        llm_tokens.inc(len(text) // 4 + 1, model=self.model_name, kind="output")
+
+    async def generate(self, prompt: str, response_schema: Optional[dict] = None) -> str:
+        await asyncio.sleep(self._latency(prompt))
+        self._maybe_fail()
+        text = self._respond(prompt, response_schema)
+        self._record_usage(prompt, text)
+        return text
+
+    async def generate_stream(self, prompt: str, response_schema: Optional[dict] = None) -> AsyncIterator[str]:
+        # 전체 지연을 조각 수만큼 나눠서, 첫 조각이 먼저 도착하는 모습을 흉내 냄
+        latency = self._latency(prompt)
+        self._maybe_fail()
+        text = self._respond(prompt, response_schema)
+        self._record_usage(prompt, text)
+        size = max(1, math.ceil(len(text) / _STREAM_CHUNKS))
+        for begin in range(0, len(text), size):
+            await asyncio.sleep(latency / _STREAM_CHUNKS)
+            yield text[begin:begin + size]
+
+
+class StubTranscriptProvider(TranscriptProvider):
+    """YouTubeTranscriptApi 대신 쓰는 가짜 자막 제공자 (스레드에서 호출되는 동기 함수)"""
+
+    def __init__(self):
+        self._rng = random.Random(settings.stub_seed)
+        self.calls = 0
+
+    def fetch(self, video_id: str, language: str = "en") -> list[dict]:
+        self.calls += 1
+        with span("youtube_fetch"):
+            time.sleep(
+                sample_latency(self._rng, settings.stub_transcript_latency_ms, settings.stub_transcript_latency_sigma)
+            )
+        if self._rng.random() < settings.stub_transcript_error_rate:
+            raise TransientUpstreamError("스텁 자막 호출 실패 (STUB_TRANSCRIPT_ERROR_RATE)")
+
+        # 영상 ID마다 시작 문장이 달라서 영상별로 다른(하지만 항상 같은) 자막이 나옴
+        offset = _stable_index(video_id, len(_SENTENCES))
+        return [
+            {
+                "text": _SENTENCES[(offset + index) % len(_SENTENCES)],
+                "start": index * 2.0,
+                "duration": 2.0,
+            }
+            for index in range(settings.stub_transcript_snippets)
+        ]
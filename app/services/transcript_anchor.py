@@ -0,0 +1,267 @@
+"""
+=============================================================================
+[Transcript Anchor]
+설명: 단어 카드(expression)가 자막의 어디에 나오는지 찾아서
+      start / end (초)와 주변 문장(sentence)을 붙여줍니다.
+      -> 앱이 자막 전체를 따로 받아 기기에서 문자열 검색하지 않아도 됨
+핵심: - 자막 하나당 색인(TranscriptIndex)을 한 번만 만듦
+        단어 목록 + 각 단어의 글자 위치 + "첫 단어 -> 나오는 위치들" 사전
+      - 표현의 첫 단어로 후보 위치만 골라 나머지 단어를 비교 (전체 문자열 검색 X)
+      - 글자 위치 -> 조각 번호는 CompactTranscript.offsets에서 이진 탐색
+      - 그대로 못 찾으면 어미(-ing/-ed/-s...)를 떼고 한 번 더 (figure out ~ figured out)
+      - includeTranscript 요청이면 카드 주변 조각만 골라 압축한 자막 조각도 만듦
+=============================================================================
+"""
+
+import base64
+import json
+import re
+from bisect import bisect_right
+from typing import Iterable, Optional
+
+from app.core.config import settings
+from app.core.responses import compress
+from app.services.transcript_store import CompactTranscript
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_WORD_RE = re.compile(r"[a-z0-9']+", re.IGNORECASE)
+# 문장 끝 표시 (자동 자막에는 없는 경우가 많아서, 없으면 조각 경계를 씀)
+_SENTENCE_END_RE = re.compile(r"[.!?]+")
+_SUFFIXES = ("ing", "ed", "es", "s", "e")
+# 표현 단어 사이에 끼어도 되는 단어 수 (figure [it] out, pick [them] up)
+_MAX_GAP = 2
+
+
+def _stem(token: str) -> str:
+    """아주 단순한 어간: 흔한 어미 하나를 떼고, 겹자음을 하나로 (hitting -> hit, figured -> figur)"""
+    token = token.replace("'", "")
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            break
+    if len(token) >= 4 and token[-1] == token[-2] and token[-1] not in "aeiou":
+        token = token[:-1]
+    return token
+
+
+class TranscriptIndex:
+    """자막 한 편의 단어 위치 색인 (한 번 만들고 카드 여러 장을 찾음)"""
+
+    def __init__(self, transcript: CompactTranscript):
+        self.transcript = transcript
+        text = transcript.full_text
+        self.text = text
+
+        # 원문에서 바로 찾아야 글자 위치가 어긋나지 않음 (lower()로 길이가 바뀌는 문자가 있어도 안전)
+        self.tokens: list[str] = []
+        self.token_begins: list[int] = []
+        self.token_ends: list[int] = []
+        for match in _WORD_RE.finditer(text):
+            self.tokens.append(match.group().lower())
+            self.token_begins.append(match.start())
+            self.token_ends.append(match.end())
+
+        self.by_token: dict[str, list[int]] = {}
+        for position, token in enumerate(self.tokens):
+            self.by_token.setdefault(token, []).append(position)
+
+        # 어간 색인은 그대로 못 찾은 표현이 있을 때만 만듦
+        self._stems: Optional[list[str]] = None
+        self._by_stem: dict[str, list[int]] = {}
+
+    def _stem_index(self) -> tuple[list[str], dict[str, list[int]]]:
+        if self._stems is None:
+            stems_by_token = {token: _stem(token) for token in self.by_token}
+            self._stems = [stems_by_token[token] for token in self.tokens]
+            for token, positions in self.by_token.items():
+                self._by_stem.setdefault(stems_by_token[token], []).extend(positions)
+            for positions in self._by_stem.values():
+                positions.sort()
+        return self._stems, self._by_stem
+
+    # ---------------------------------------------------------
+    # 표현 찾기
+    # ---------------------------------------------------------
+    def _match(self, words: list[str], sequence: list[str], positions: list[int]) -> int:
+        width = len(words)
+        for position in positions:
+            if sequence[position:position + width] == words:
+                return position
+        return -1
+
+    def find(self, expression: str) -> Optional[tuple[int, int]]:
+        """표현이 처음 나오는 (시작 글자 위치, 끝 글자 위치), 못 찾으면 None"""
+        words = _TOKEN_RE.findall(expression.lower())
+        if not words:
+            return None
+
+        position = self._match(words, self.tokens, self.by_token.get(words[0], ()))
+        if position >= 0:
+            return self.token_begins[position], self.token_ends[position + len(words) - 1]
+
+        stems = [_stem(word) for word in words]
+        token_stems, by_stem = self._stem_index()
+        position = self._match(stems, token_stems, by_stem.get(stems[0], ()))
+        if position >= 0:
+            return self.token_begins[position], self.token_ends[position + len(words) - 1]
+
+        # 구동사 사이에 목적어가 끼는 경우 (figure out ~ figured it out)
+        return self._match_gapped(stems)
+
+    def _match_gapped(self, stems: list[str]) -> Optional[tuple[int, int]]:
+        """단어 사이에 최대 _MAX_GAP개의 다른 단어가 끼어도 순서대로 나오면 찾은 것으로 봄"""
+        if len(stems) < 2:
+            return None
+        token_stems, by_stem = self._stem_index()
+        for position in by_stem.get(stems[0], ()):
+            cursor = position
+            for stem in stems[1:]:
+                window = token_stems[cursor + 1:cursor + 2 + _MAX_GAP]
+                if stem not in window:
+                    break
+                cursor += 1 + window.index(stem)
+            else:
+                return self.token_begins[position], self.token_ends[cursor]
+        return None
+
+    def snippet_at(self, char_position: int) -> int:
+        """글자 위치 -> 그 글자가 들어 있는 조각 번호"""
+        return max(0, bisect_right(self.transcript.offsets, char_position) - 1)
+
+    def snippet_end(self, index: int) -> int:
+        offsets = self.transcript.offsets
+        return offsets[index + 1] - 1 if index + 1 < len(offsets) else len(self.text)
+
+    def sentence(self, begin: int, end: int, first: int, last: int) -> str:
+        """
+        표현을 둘러싼 문장
+        - 문장 부호가 있으면 앞 조각 ~ 뒤 조각 범위 안에서 문장 경계까지
+        - 없으면 표현이 걸친 조각들의 텍스트
+        """
+        offsets = self.transcript.offsets
+        region_begin = offsets[max(0, first - 1)]
+        region_end = self.snippet_end(min(len(offsets) - 1, last + 1))
+
+        left = offsets[first]
+        for match in _SENTENCE_END_RE.finditer(self.text, region_begin, begin):
+            left = match.end()
+        right = self.snippet_end(last)
+        match = _SENTENCE_END_RE.search(self.text, end, region_end)
+        if match:
+            right = match.end()
+
+        sentence = self.text[left:right].strip()
+        max_chars = settings.anchor_sentence_max_chars
+        if len(sentence) > max_chars:
+            # 너무 길면 표현을 가운데 두고 잘라냄
+            center = (begin + end) // 2 - left
+            start = max(0, min(len(sentence) - max_chars, center - max_chars // 2))
+            sentence = sentence[start:start + max_chars].strip()
+        return sentence
+
+    def anchor(self, item: dict) -> dict:
+        """카드 하나에 start / end / sentence를 붙인 새 dict (못 찾으면 원래 카드 그대로)"""
+        span = self.find(str(item.get("expression", "")))
+        if span is None:
+            return item
+        begin, end = span
+        first = self.snippet_at(begin)
+        last = self.snippet_at(max(begin, end - 1))
+        transcript = self.transcript
+        return {
+            **item,
+            "start": round(transcript.starts[first], 3),
+            "end": round(transcript.starts[last] + transcript.durations[last], 3),
+            "sentence": self.sentence(begin, end, first, last),
+        }
+
+
+def _as_compact(transcript) -> CompactTranscript:
+    if isinstance(transcript, CompactTranscript):
+        return transcript
+    return CompactTranscript.from_snippets(transcript)
+
+
+def anchor_items(items: list[dict], *transcripts) -> list[dict]:
+    """
+    [메인 함수] 카드들에 자막 위치를 붙입니다.
+    transcripts를 앞에서부터 차례로 찾아봄 (예: 다듬은 자막 -> 원본 자막)
+    이미 위치가 있는 카드(예전 결과)는 그대로 둡니다.
+    """
+    # 색인은 필요할 때 한 번만 만듦 (첫 자막에서 다 찾으면 두 번째 자막 색인은 만들지 않음)
+    indexes: dict[int, TranscriptIndex] = {}
+    anchored = []
+    for item in items:
+        result = item
+        if item.get("start") is None:
+            for position, transcript in enumerate(transcripts):
+                if transcript is None:
+                    continue
+                if position not in indexes:
+                    indexes[position] = TranscriptIndex(_as_compact(transcript))
+                result = indexes[position].anchor(item)
+                if result is not item:
+                    break
+        anchored.append(result)
+    return anchored
+
+
+# =============================================================================
+# 카드 주변 자막 조각 (includeTranscript)
+# =============================================================================
+def build_transcript_slice(
+    transcript,
+    items: Iterable[dict],
+    encoding: str = "gzip",
+    padding: Optional[float] = None,
+) -> Optional[dict]:
+    """
+    카드들의 [start - padding, end + padding] 구간에 걸치는 자막 조각만 골라
+    {"starts", "durations", "texts"} JSON을 압축 -> base64
+    (위치가 있는 카드가 하나도 없으면 None)
+    """
+    padding = settings.transcript_slice_padding_seconds if padding is None else padding
+    windows = []
+    for low, high in sorted(
+        (item["start"] - padding, item["end"] + padding)
+        for item in items
+        if item.get("start") is not None and item.get("end") is not None
+    ):
+        # 겹치는 구간은 하나로 합침
+        if windows and low <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], high)
+        else:
+            windows.append([low, high])
+    if not windows:
+        return None
+
+    transcript = _as_compact(transcript)
+    starts, durations = transcript.starts, transcript.durations
+    chosen = []
+    window_index = 0
+    # 조각과 구간 모두 시간 순이므로 한 번 훑으면 됨
+    for index in range(len(transcript)):
+        begin, end = starts[index], starts[index] + durations[index]
+        while window_index < len(windows) and windows[window_index][1] < begin:
+            window_index += 1
+        if window_index == len(windows):
+            break
+        if windows[window_index][0] <= end:
+            chosen.append(index)
+
+    payload = json.dumps(
+        {
+            "starts": [round(starts[index], 3) for index in chosen],
+            "durations": [round(durations[index], 3) for index in chosen],
+            "texts": [transcript.text_at(index) for index in chosen],
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    used_encoding, compressed = compress(payload, encoding)
+    return {
+        "encoding": used_encoding,
+        "data": base64.b64encode(compressed).decode("ascii"),
+        "snippets": len(chosen),
+        "totalSnippets": len(transcript),
+    }
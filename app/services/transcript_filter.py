@@ -0,0 +1,129 @@
+"""
+=============================================================================
+[Transcript Filter]
+설명: 자막을 Gemini에 보내기 전에 로컬에서 먼저 다듬어 프롬프트 크기를 줄입니다.
+      (규칙 기반이라 같은 입력이면 항상 같은 결과가 나옵니다)
+단계: 1. 텍스트 정규화 (HTML 엔티티, 유니코드, 공백, '>>' 화자 표시)
+      2. 비음성 주석 제거 ([Music], [Applause], (laughs), ♪ ...)
+      3. 군더더기 추임새 제거 (um, uh, erm ...)
+      4. 자동 자막 특유의 "앞 줄 반복" 제거 + 완전히 같은 줄 제거
+      5. (선택) 그래도 길면 관용구/구동사 후보가 많은 문장만 남기기
+=============================================================================
+"""
+
+import html
+import re
+import unicodedata
+
+from app.services.gemini_service import estimate_tokens
+from app.services.transcript_store import CompactTranscript, snippet_fields
+
+# [Music], (Applause), ♪ la la ♪ 같은 비음성 표시
+_ANNOTATION_RE = re.compile(r"\[[^\]]*\]|\([^)]*\)|♪[^♪]*♪|[♪♫]")
+# 화자 전환 표시 ">>" / "- "
+_SPEAKER_RE = re.compile(r"^\s*(?:>>|-)\s*|\s+>>\s*")
+# 의미 없는 추임새 (단어 단위로만 제거)
+_FILLER_RE = re.compile(r"\b(?:um+|uh+|erm+|hmm+|mm+|ah+)\b[,.]?\s*", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+# 문장 순위용: 구동사 뒤에 자주 붙는 불변화사와 관용구 힌트
+_PARTICLES = {"up", "out", "off", "down", "over", "away", "through", "around", "back", "into", "on"}
+_IDIOM_HINTS = (
+    "kind of", "sort of", "gonna", "wanna", "gotta", "no way", "for real", "all of a sudden",
+    "at the end of the day", "call it", "hang in there", "make sense", "figure out",
+    "a piece of cake", "break a leg", "by the way", "to be honest", "in a nutshell",
+)
+
+
+def normalize_text(text: str) -> str:
+    """1~3단계: 정규화 + 주석 제거 + 추임새 제거"""
+    text = unicodedata.normalize("NFKC", html.unescape(text))
+    text = _ANNOTATION_RE.sub(" ", text)
+    text = _SPEAKER_RE.sub(" ", text)
+    text = _FILLER_RE.sub("", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def _drop_rolling_overlap(previous_words: list[str], words: list[str]) -> list[str]:
+    """
+    자동 자막은 앞 줄 끝부분을 다음 줄 앞에 다시 보여주는 경우가 많습니다.
+    예: "so we went to the" / "we went to the store" -> 두 번째 줄은 "store"만 남김
+    """
+    max_overlap = min(len(previous_words), len(words))
+    # 한 단어 겹침("the" 등)은 우연일 가능성이 커서 2단어 이상만 반복으로 봄
+    for size in range(max_overlap, 1, -1):
+        if [w.lower() for w in previous_words[-size:]] == [w.lower() for w in words[:size]]:
+            return words[size:]
+    return words
+
+
+def _sentence_score(text: str) -> int:
+    """관용구/구동사 후보가 많을수록 높은 점수"""
+    lowered = text.lower()
+    words = lowered.split()
+    score = sum(1 for hint in _IDIOM_HINTS if hint in lowered)
+    score += sum(1 for word in words[1:] if word.strip(".,!?") in _PARTICLES)
+    return score
+
+
+def _rank_snippets(snippets: list[dict], max_tokens: int) -> list[dict]:
+    """
+    5단계: 점수가 높은 조각부터 토큰 예산만큼 고른 뒤, 원래 시간 순서로 되돌립니다.
+    """
+    order = sorted(range(len(snippets)), key=lambda i: (-_sentence_score(snippets[i]["text"]), i))
+    chosen = []
+    tokens = 0
+    for index in order:
+        cost = estimate_tokens(snippets[index]["text"])
+        if tokens + cost > max_tokens:
+            continue
+        chosen.append(index)
+        tokens += cost
+    return [snippets[index] for index in sorted(chosen)]
+
+
+def filter_transcript(transcript_list, max_tokens: int = 0) -> tuple[CompactTranscript, dict]:
+    """
+    [메인 함수] 자막을 다듬고, 줄어든 양을 함께 반환합니다.
+
+    Args:
+        transcript_list: get_transcript_list() 결과 (CompactTranscript 또는 dict 리스트)
+        max_tokens: 0보다 크면 5단계(문장 순위 선별)를 이 토큰 수까지 적용
+
+    Returns:
+        (다듬은 CompactTranscript, {"tokensBefore", "tokensAfter", "snippetsBefore", "snippetsAfter"})
+    """
+    snippets = []
+    previous_words: list[str] = []
+    seen = set()
+    tokens_before = 0
+    snippets_before = 0
+
+    for item in transcript_list:
+        text, start, duration = snippet_fields(item)
+        snippets_before += 1
+        tokens_before += estimate_tokens(text)
+
+        original_words = normalize_text(text).split()
+        words = _drop_rolling_overlap(previous_words, original_words)
+        previous_words = original_words
+        if not words:
+            continue
+
+        cleaned = " ".join(words)
+        if cleaned.lower() in seen:
+            continue
+        seen.add(cleaned.lower())
+        snippets.append({"text": cleaned, "start": start, "duration": duration})
+
+    if max_tokens > 0 and sum(estimate_tokens(s["text"]) for s in snippets) > max_tokens:
+        snippets = _rank_snippets(snippets, max_tokens)
+
+    filtered = CompactTranscript.from_snippets(snippets)
+    report = {
+        "tokensBefore": tokens_before,
+        "tokensAfter": sum(estimate_tokens(s["text"]) for s in snippets),
+        "snippetsBefore": snippets_before,
+        "snippetsAfter": len(snippets),
+    }
+    return filtered, report
@@ -0,0 +1,22 @@
+"""
+=============================================================================
+[Transcript Provider]
+설명: youtube_service가 자막을 받아올 때 쓰는 "제공자"를 갈아 끼울 수 있게 합니다.
+      - YouTubeTranscriptProvider : 실제 유튜브 (youtube_service.py)
+      - StubTranscriptProvider    : 네트워크 없이 지연/에러를 흉내 내는 부하 테스트용 (stub_backends.py)
+선택: 설정값 TRANSCRIPT_PROVIDER ("youtube" | "stub")
+      (인터페이스만 따로 둔 이유: youtube_service가 만들어질 때 스텁을 불러오므로
+       스텁이 youtube_service를 다시 import하면 순환 import가 됨)
+=============================================================================
+"""
+
+
+class TranscriptProvider:
+    """
+    자막 제공자 인터페이스 (스레드에서 호출되는 동기 함수)
+    fetch()는 language 자막의 {'text', 'start', 'duration'} 조각 리스트(또는 같은 속성의 객체)를 반환하고,
+    자막이 없으면 NoTranscriptException / TranscriptsDisabledException을 발생시킵니다.
+    """
+
+    def fetch(self, video_id: str, language: str = "en"):
+        raise NotImplementedError
@@ -0,0 +1,274 @@
+"""
+=============================================================================
+[Transcript Store]
+설명: 유튜브에서 받아온 자막을 video_id 기준으로 보관합니다.
+핵심: - 자막 조각(snippet) 객체 리스트 대신, 시작/길이 배열 + 텍스트 버퍼 하나로
+        압축해서 저장합니다. (영상당 메모리 사용량 감소)
+      - TTL이 지나면 만료, 최대 개수를 넘으면 오래 안 쓴 것부터 제거합니다.
+      - "자막 없음" / "자막 꺼짐" 결과도 잠시 기억해서(네거티브 캐시)
+        같은 영상으로 유튜브를 다시 두드리지 않습니다.
+      - 공용 저장소(backend)를 주면 워커 프로세스끼리도 공유합니다.
+        (메모리에 없으면 공용 저장소 -> 그래도 없으면 유튜브, 배열은 바이트 그대로 저장)
+=============================================================================
+"""
+
+import logging
+import struct
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional, Union
+
+from app.core.exceptions import NoTranscriptException, TranscriptsDisabledException
+from app.core.metrics import run_in_thread
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 조각 사이 구분자 (full_text를 만들 때 쓰는 공백과 동일)
+_SEPARATOR = " "
+# 공용 저장소에 쓰는 바이트 형식: 버전(1) + 바이트 순서(1) + offsets 원소 크기(1) + 조각 수(4)
+#                                   + starts + durations + offsets + UTF-8 텍스트
+_HEADER = struct.Struct("<BBBI")
+_FORMAT_VERSION = 1
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+
+def snippet_fields(item) -> tuple[str, float, float]:
+    """자막 조각 하나에서 (text, start, duration) 추출 (dict / FetchedTranscriptSnippet 객체 모두 지원)"""
+    if isinstance(item, dict):
+        return item.get("text", ""), item.get("start", 0.0), item.get("duration", 0.0)
+    return getattr(item, "text", ""), getattr(item, "start", 0.0), getattr(item, "duration", 0.0)
+
+
+class CompactTranscript:
+    """
+    자막 한 편을 압축해서 들고 있는 객체
+
+    starts[i], durations[i] : i번째 조각의 시작 시각 / 길이 (초)
+    offsets[i]              : i번째 조각 텍스트가 text 버퍼에서 시작하는 위치
+    text                    : 모든 조각을 공백으로 이어 붙인 문자열 (= full_text)
+
+    리스트처럼 순회하면 기존과 같은 {'text', 'start', 'duration'} dict를 돌려줍니다.
+    """
+    __slots__ = ("starts", "durations", "offsets", "text")
+
+    def __init__(self, starts: array, durations: array, offsets: array, text: str):
+        self.starts = starts
+        self.durations = durations
+        self.offsets = offsets
+        self.text = text
+
+    @classmethod
+    def from_snippets(cls, snippets: Iterable) -> "CompactTranscript":
+        """youtube-transcript-api 결과(객체) 또는 dict 리스트로부터 생성"""
+        starts = array("d")
+        durations = array("d")
+        offsets = array("I")
+        texts = []
+        position = 0
+        for item in snippets:
+            text, start, duration = snippet_fields(item)
+            starts.append(float(start))
+            durations.append(float(duration))
+            offsets.append(position)
+            texts.append(text)
+            position += len(text) + len(_SEPARATOR)
+        return cls(starts, durations, offsets, _SEPARATOR.join(texts))
+
+    def to_bytes(self) -> bytes:
+        """공용 저장소용 직렬화 (배열은 메모리 그대로 복사 -> JSON보다 작고 빠름)"""
+        return b"".join((
+            _HEADER.pack(_FORMAT_VERSION, _BYTE_ORDER, self.offsets.itemsize, len(self.starts)),
+            self.starts.tobytes(),
+            self.durations.tobytes(),
+            self.offsets.tobytes(),
+            self.text.encode("utf-8"),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompactTranscript":
+        version, byte_order, offset_size, count = _HEADER.unpack_from(data)
+        if version != _FORMAT_VERSION or byte_order != _BYTE_ORDER or offset_size != array("I").itemsize:
+            raise ValueError("지원하지 않는 자막 저장 형식")
+        view = memoryview(data)
+        position = _HEADER.size
+        arrays = []
+        for typecode in ("d", "d", "I"):
+            values = array(typecode)
+            length = count * values.itemsize
+            values.frombytes(view[position:position + length])
+            arrays.append(values)
+            position += length
+        return cls(*arrays, bytes(view[position:]).decode("utf-8"))
+
+    @property
+    def full_text(self) -> str:
+        return self.text
+
+    def text_at(self, index: int) -> str:
+        begin = self.offsets[index]
+        end = self.offsets[index + 1] - len(_SEPARATOR) if index + 1 < len(self.offsets) else len(self.text)
+        return self.text[begin:end]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return {"text": self.text_at(index), "start": self.starts[index], "duration": self.durations[index]}
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+# 네거티브 캐시에 저장하는 "이 영상은 자막이 없다" 표시
+_NEGATIVE_RESULTS = (NoTranscriptException, TranscriptsDisabledException)
+_Entry = Union[CompactTranscript, type]
+
+
+_NEGATIVE_BY_NAME = {error.__name__: error for error in _NEGATIVE_RESULTS}
+
+
+class TranscriptStore:
+    """
+    video_id -> CompactTranscript (또는 실패 종류) 저장소
+    get / put은 이 프로세스 메모리만, lookup / save는 공용 저장소(backend)까지 봅니다.
+    backend: CacheBackend처럼 get / set을 가진 객체 (자막은 bytes, "자막 없음"은 예외 이름 str로 저장)
+    """
+
+    def __init__(self, ttl_seconds: float, negative_ttl_seconds: float, max_entries: int, backend=None):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.backend = backend
+        # video_id -> (자막 또는 예외 클래스, 만료 시각)
+        self._entries: "OrderedDict[str, tuple[_Entry, float]]" = OrderedDict()
+
+        self.hits = 0
+        # hits 중 다른 워커가 공용 저장소에 넣어둔 자막을 가져온 수
+        self.shared_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, video_id: str) -> Optional[CompactTranscript]:
+        """
+        저장된 자막을 반환합니다.
+        - 없으면 None
+        - "자막 없음/꺼짐"으로 기억된 영상이면 해당 커스텀 에러를 다시 발생
+        """
+        entry = self._entries.get(video_id)
+        if entry is None or entry[1] <= time.time():
+            # 만료된 자막은 YouTube 장애 때 대신 쓸 수 있도록 남겨둠 (개수 제한으로만 제거)
+            if entry is not None and not isinstance(entry[0], CompactTranscript):
+                del self._entries[video_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(video_id)
+        value = entry[0]
+        if isinstance(value, CompactTranscript):
+            self.hits += 1
+            return value
+
+        self.negative_hits += 1
+        raise value()
+
+    def get_stale(self, video_id: str) -> Optional[CompactTranscript]:
+        """만료 여부와 상관없이 저장된 자막 반환 (YouTube 서킷이 열렸을 때의 대체용)"""
+        entry = self._entries.get(video_id)
+        if entry is not None and isinstance(entry[0], CompactTranscript):
+            return entry[0]
+        return None
+
+    def put(self, video_id: str, transcript: CompactTranscript) -> None:
+        self._set(video_id, transcript, self.ttl_seconds)
+
+    def put_negative(self, video_id: str, error: Exception) -> None:
+        """자막 없음 / 꺼짐 결과만 기억합니다 (네트워크 오류 등은 저장하지 않음)"""
+        if isinstance(error, _NEGATIVE_RESULTS):
+            self._set(video_id, type(error), self.negative_ttl_seconds)
+
+    def _set(self, video_id: str, value: _Entry, ttl: float) -> None:
+        self._remember(video_id, value, time.time() + ttl)
+
+    def _remember(self, video_id: str, value: _Entry, expires_at: float) -> None:
+        self._entries[video_id] = (value, expires_at)
+        self._entries.move_to_end(video_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ---------------------------------------------------------
+    # 공용 저장소 (워커 프로세스끼리 공유)
+    # ---------------------------------------------------------
+    async def _load_shared(self, video_id: str) -> Optional[tuple[_Entry, float]]:
+        """공용 저장소에서 읽어 메모리에도 올림 -> (자막 또는 예외 클래스, 만료 시각)"""
+        if self.backend is None:
+            return None
+        try:
+            record = await run_in_thread(self.backend.get, video_id)
+            if record is None:
+                return None
+            payload, expires_at = record
+            if isinstance(payload, str):
+                value = _NEGATIVE_BY_NAME.get(payload)
+                if value is None:
+                    return None
+            else:
+                value = CompactTranscript.from_bytes(payload)
+        except Exception as e:
+            # 캐시 장애가 분석 자체를 막으면 안 되므로 로그만 남기고 미스 처리
+            logger.error(f"공용 자막 캐시 조회 실패: {str(e)}")
+            return None
+        self._remember(video_id, value, expires_at)
+        return value, expires_at
+
+    async def _save_shared(self, video_id: str, payload: Union[bytes, str], expires_at: float) -> None:
+        if self.backend is None:
+            return
+        try:
+            await run_in_thread(self.backend.set, video_id, payload, expires_at)
+        except Exception as e:
+            logger.error(f"공용 자막 캐시 저장 실패: {str(e)}")
+
+    async def lookup(self, video_id: str) -> Optional[CompactTranscript]:
+        """get()과 같지만 메모리에 없거나 만료됐으면 공용 저장소(다른 워커가 받아둔 자막)까지 확인"""
+        entry = self._entries.get(video_id)
+        if self.backend is not None and (entry is None or entry[1] <= time.time()):
+            loaded = await self._load_shared(video_id)
+            if loaded is not None and loaded[1] > time.time():
+                self.shared_hits += 1
+        return self.get(video_id)
+
+    async def lookup_stale(self, video_id: str) -> Optional[CompactTranscript]:
+        """get_stale()과 같지만 메모리에 없으면 공용 저장소까지 확인"""
+        stale = self.get_stale(video_id)
+        if stale is None:
+            loaded = await self._load_shared(video_id)
+            if loaded is not None and isinstance(loaded[0], CompactTranscript):
+                stale = loaded[0]
+        return stale
+
+    async def save(self, video_id: str, transcript: CompactTranscript) -> None:
+        self.put(video_id, transcript)
+        await self._save_shared(video_id, transcript.to_bytes(), time.time() + self.ttl_seconds)
+
+    async def save_negative(self, video_id: str, error: Exception) -> None:
+        if isinstance(error, _NEGATIVE_RESULTS):
+            self.put_negative(video_id, error)
+            await self._save_shared(video_id, type(error).__name__, time.time() + self.negative_ttl_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "sharedHits": self.shared_hits,
+            "negativeHits": self.negative_hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "shared": self.backend is not None,
+        }
@@ -0,0 +1,108 @@
+"""
+=============================================================================
+[Video URL Parser]
+설명: 유튜브 링크를 한 번만 파싱해서 VideoRef(영상 ID + 링크 종류)로 만듭니다.
+지원: https://www.youtube.com/watch?v=ID      (www. / m. / music. 포함)
+      https://www.youtube.com/shorts/ID
+      https://www.youtube.com/embed/ID       (youtube-nocookie.com 포함)
+      https://www.youtube.com/live/ID
+      https://youtu.be/ID
+      (http/https 생략 가능, 뒤에 붙은 ?si=..., &t=..., #... 는 무시)
+핵심: 정해진 호스트/경로 모양이 아니면 바로 InvalidLinkException
+      -> 아무 링크의 11글자 경로를 영상 ID로 착각해서 유튜브를 헛되이 부르지 않음
+=============================================================================
+"""
+
+import re
+from functools import lru_cache
+from typing import Union
+from urllib.parse import parse_qs, urlsplit
+
+from app.core.exceptions import InvalidLinkException
+from app.models.schemas import VideoRef
+
+_VIDEO_ID_RE = re.compile(r"[0-9A-Za-z_-]{11}")
+
+# 이보다 긴 입력은 파싱하지 않고 바로 거절 (비정상 요청 방어)
+MAX_URL_LENGTH = 2048
+
+# 앞에 붙어도 되는 하위 도메인
+_HOST_PREFIXES = ("www.", "m.", "music.")
+_YOUTUBE_HOSTS = ("youtube.com", "youtube-nocookie.com")
+_SHORT_HOST = "youtu.be"
+
+# youtube.com/<경로>/<ID> 형태의 경로 -> 링크 종류
+_PATH_KINDS = {"shorts": "shorts", "embed": "embed", "live": "live", "v": "embed"}
+
+
+def _host(netloc: str) -> str:
+    """사용자 정보/포트를 떼고 소문자로, 허용된 하위 도메인 하나를 제거"""
+    host = netloc.rsplit("@", 1)[-1].split(":", 1)[0].lower().rstrip(".")
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+
+def _valid_id(value: str) -> str:
+    if not _VIDEO_ID_RE.fullmatch(value):
+        raise InvalidLinkException()
+    return value
+
+
+@lru_cache(maxsize=4096)
+def parse_video_url(url: str) -> VideoRef:
+    """
+    유튜브 링크 -> VideoRef (같은 링크는 다시 파싱하지 않고 캐시된 결과 재사용)
+    유튜브 영상 링크가 아니면 InvalidLinkException
+    """
+    url = url.strip()
+    if not url or len(url) > MAX_URL_LENGTH:
+        raise InvalidLinkException()
+    if "://" not in url:
+        # "youtu.be/ID", "www.youtube.com/watch?v=ID" 처럼 스킴이 빠진 링크
+        url = "https://" + url
+
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        # 괄호가 안 맞는 IPv6 주소 등
+        raise InvalidLinkException()
+    if parts.scheme.lower() not in ("http", "https"):
+        raise InvalidLinkException()
+
+    host = _host(parts.netloc)
+    segments = [segment for segment in parts.path.split("/") if segment]
+
+    if host == _SHORT_HOST:
+        if len(segments) != 1:
+            raise InvalidLinkException()
+        return VideoRef(video_id=_valid_id(segments[0]), kind="short_link")
+
+    if host not in _YOUTUBE_HOSTS:
+        raise InvalidLinkException()
+
+    if segments == ["watch"]:
+        values = parse_qs(parts.query).get("v")
+        if not values:
+            raise InvalidLinkException()
+        return VideoRef(video_id=_valid_id(values[0]), kind="watch")
+
+    if len(segments) == 2 and segments[0] in _PATH_KINDS:
+        return VideoRef(video_id=_valid_id(segments[1]), kind=_PATH_KINDS[segments[0]])
+
+    raise InvalidLinkException()
+
+
+def parse_video_urls(urls: list[str]) -> list[Union[VideoRef, InvalidLinkException]]:
+    """
+    여러 링크를 한꺼번에 검증 (배치 요청용, 네트워크 호출 전에 실행)
+    순서대로 VideoRef 또는 InvalidLinkException을 담아 반환합니다.
+    """
+    results: list[Union[VideoRef, InvalidLinkException]] = []
+    for url in urls:
+        try:
+            results.append(parse_video_url(url))
+        except InvalidLinkException as e:
+            results.append(e)
+    return results
@@ -7,81 +7,279 @@
 =============================================================================
 """
 
-import re
 import asyncio
+import itertools
 import logging
-from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from youtube_transcript_api import (
+    YouTubeTranscriptApi,
+    NoTranscriptFound,
+    TranscriptsDisabled,
+    YouTubeRequestFailed,
+    RequestBlocked,
+)
+from youtube_transcript_api.proxies import GenericProxyConfig
+
+from app.core.config import settings
+from app.core.metrics import run_in_thread, span
+from app.core.adaptive_limit import AdaptiveLimiter
+from app.core.deadline import stage_timeout
+from app.core.resilience import CircuitBreaker, TransientUpstreamError, retry_async
+from app.services.shared_cache import shared_cache
+from app.services.transcript_store import CompactTranscript, TranscriptStore
+from app.services.transcript_provider import TranscriptProvider
+from app.services.video_url import parse_video_url
+from app.models.schemas import VideoRef
 
 # 커스텀 에러 임포트
 from app.core.exceptions import (
     NoTranscriptException, 
     TranscriptsDisabledException, 
     YouTubeUnknownException,
-    InvalidLinkException
+    InvalidLinkException,
+    ServerBusyException,
+    UpstreamUnavailableException,
+    DeadlineExceededException
 )
 
 # 로거 설정
 logger = logging.getLogger(__name__)
 
+# 받아온 자막 저장소 (프롬프트를 바꾸거나 재분석해도 유튜브를 다시 부르지 않도록)
+# -> 워커 공용 캐시에도 저장해서 다른 워커 프로세스도 같은 자막을 다시 받지 않음
+transcript_store = TranscriptStore(
+    ttl_seconds=settings.transcript_cache_ttl_seconds,
+    negative_ttl_seconds=settings.transcript_negative_ttl_seconds,
+    max_entries=settings.transcript_cache_max_entries,
+    backend=shared_cache.namespace("transcript") if settings.transcript_cache_shared else None,
+)
+
+# 자막 동시 다운로드 수 제한 (스레드 풀이 자막 다운로드로 꽉 차지 않도록)
+# -> 유튜브가 느려지거나 실패하면 한도를 자동으로 줄이고, 자리가 안 나면 503
+youtube_limiter = AdaptiveLimiter(
+    "youtube",
+    min_limit=settings.youtube_min_concurrency,
+    max_limit=settings.youtube_max_concurrency,
+    latency_target=settings.youtube_latency_target_seconds,
+    queue_timeout=settings.upstream_queue_timeout_seconds,
+    max_queue=settings.upstream_max_queue,
+    # 자막 없음/꺼짐은 유튜브 장애가 아님
+    ignore_errors=(NoTranscriptException, TranscriptsDisabledException),
+)
+
+# 유튜브가 연달아 실패하면 잠시 호출을 멈추고 바로 503 (저장소의 만료된 자막으로 대체 시도)
+youtube_breaker = CircuitBreaker(
+    "youtube",
+    failure_threshold=settings.circuit_failure_threshold,
+    reset_timeout=settings.circuit_reset_seconds,
+    ignore_errors=(
+        NoTranscriptException,
+        TranscriptsDisabledException,
+        ServerBusyException,
+        DeadlineExceededException,
+    ),
+)
+
+# 잠시 뒤 다시 시도하면 성공할 수 있는 오류 (네트워크 끊김, 시간 초과, 유튜브 5xx/429)
+RETRYABLE_YOUTUBE_ERRORS = (
+    TransientUpstreamError,
+    YouTubeRequestFailed,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    asyncio.TimeoutError,
+)
+if settings.youtube_proxy_urls:
+    # 프록시를 돌려 쓰는 경우 IP 차단은 다음 시도(다른 프록시)로 넘어가면 풀릴 수 있음
+    RETRYABLE_YOUTUBE_ERRORS += (RequestBlocked,)
+
 def extract_video_id(url: str) -> str:
     """
     [기능 1] 유튜브 링크에서 '영상 ID'만 쏙 뽑아냅니다.
-    예: https://youtu.be/abc12345 -> abc12345
+    예: https://youtu.be/abc12345678 -> abc12345678
+    (watch / shorts / embed / youtu.be 등 지원하는 링크 모양은 video_url.py 참고)
     """
-    patterns = [
-        r'(?:v=|\/)([0-9A-Za-z_-]{11}).*', 
-    ]
+    return parse_video_url(url).video_id
 
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-            
-    # ID 추출 실패 시 커스텀 에러 발생
-    raise InvalidLinkException()
 
+def _language_candidates(language: str) -> list[str]:
+    """자막 언어 코드 후보 (영어는 지역 표기 자막도 허용)"""
+    if language == "en":
+        return ["en", "en-US", "en-GB"]
+    return [language]
 
 
-def _fetch_transcript_sync(video_id: str):
+def _parse_proxy_urls(value: str) -> list[str]:
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+class YouTubeTranscriptProvider(TranscriptProvider):
     """
-    [동기 함수] 실제 자막을 다운로드합니다.
-    ★ 중요: 영어 학습 앱이므로 '영어 자막'이 없으면 에러 처리합니다.
+    youtube-transcript-api로 실제 유튜브에서 자막을 받아옵니다.
+
+    - YouTubeTranscriptApi(내부 requests.Session)는 스레드 안전하지 않으므로
+      전용 풀의 스레드마다 하나씩 만들어 계속 재사용합니다.
+      -> 같은 스레드의 다음 요청은 keep-alive 연결을 그대로 써서 TLS 연결 비용이 없음
+    - 프록시가 여러 개면 요청마다 돌아가며 사용하고, 스레드는 프록시별 세션을 따로 둡니다.
+      (한 IP에 요청이 몰려 차단되는 것 방지)
     """
-    try:
-        transcript_list = YouTubeTranscriptApi().list(video_id)
-        
-        # [수정 포인트]
-        # 사용자가 요청한 언어(targetLang)와 상관없이, 
-        # 원본 소스는 무조건 '영어(English)'여야만 함.
-        # 한국어 자막만 있는 영상이라면 여기서 NoTranscriptFound 에러가 터짐 -> 아래 catch 블록으로 이동
-        transcript = transcript_list.find_transcript(['en', 'en-US', 'en-GB'])
-        
-        return transcript.fetch()
 
-    except TranscriptsDisabled:
-        # 자막 기능이 꺼진 경우
-        raise TranscriptsDisabledException()
+    def __init__(self, proxy_urls: Optional[list[str]] = None, pool_maxsize: int = 4):
+        self.proxy_urls = proxy_urls or []
+        self.pool_maxsize = pool_maxsize
+        self._proxy_cycle = itertools.cycle(self.proxy_urls or [None])
+        self._proxy_lock = threading.Lock()
+        self._local = threading.local()
+        self.sessions_created = 0
+
+    def _next_proxy(self) -> Optional[str]:
+        with self._proxy_lock:
+            return next(self._proxy_cycle)
+
+    def _client(self, proxy_url: Optional[str]) -> YouTubeTranscriptApi:
+        """현재 스레드 + 프록시 조합의 API 객체 (없으면 만들어 둠)"""
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+        client = clients.get(proxy_url)
+        if client is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_maxsize, pool_maxsize=self.pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            proxy_config = GenericProxyConfig(http_url=proxy_url, https_url=proxy_url) if proxy_url else None
+            client = clients[proxy_url] = YouTubeTranscriptApi(proxy_config=proxy_config, http_client=session)
+            self.sessions_created += 1
+        return client
+
+    def fetch(self, video_id: str, language: str = "en"):
+        """
+        [동기 함수] 실제 자막을 다운로드합니다.
+        ★ 중요: 영어 학습 앱이므로 원본 언어(기본 '영어') 자막이 없으면 에러 처리합니다.
+        """
+        try:
+            client = self._client(self._next_proxy())
+            with span("youtube_list"):
+                transcript_list = client.list(video_id)
+
+            # [수정 포인트]
+            # 사용자가 요청한 뜻 언어(targetLang)와 상관없이, 
+            # 원본 소스는 자막 원본 언어(TRANSCRIPT_SOURCE_LANG, 기본 '영어')여야만 함.
+            # 한국어 자막만 있는 영상이라면 여기서 NoTranscriptFound 에러가 터짐 -> 아래 catch 블록으로 이동
+            transcript = transcript_list.find_transcript(_language_candidates(language))
+
+            with span("youtube_fetch"):
+                return transcript.fetch()
 
-    except NoTranscriptFound:
-        # [핵심 의도 반영]
-        # 영어가 없으면 (한국어가 있더라도) '자막 없음'으로 처리
-        raise NoTranscriptException()
+        except TranscriptsDisabled:
+            # 자막 기능이 꺼진 경우
+            raise TranscriptsDisabledException()
 
+        except NoTranscriptFound:
+            # [핵심 의도 반영]
+            # 영어가 없으면 (한국어가 있더라도) '자막 없음'으로 처리
+            raise NoTranscriptException()
 
-async def get_transcript_list(video_url: str, language: str = "en") -> list[dict]:
+
+def build_transcript_provider() -> TranscriptProvider:
+    """설정값(TRANSCRIPT_PROVIDER)에 따라 자막 제공자 선택"""
+    if settings.transcript_provider.lower() == "stub":
+        # 부하 테스트 전용 모듈은 필요할 때만 불러옴
+        from app.services.stub_backends import StubTranscriptProvider
+        return StubTranscriptProvider()
+    return YouTubeTranscriptProvider(
+        proxy_urls=_parse_proxy_urls(settings.youtube_proxy_urls),
+        pool_maxsize=settings.youtube_pool_maxsize,
+    )
+
+
+transcript_provider = build_transcript_provider()
+
+# 자막 다운로드 전용 스레드 풀
+# -> 기본 스레드 풀(캐시 파일 읽기 등)과 자리를 다투지 않고, 스레드가 오래 살아 있어서
+#    스레드마다 만든 HTTP 세션(keep-alive 연결)을 계속 재사용할 수 있음
+transcript_executor = ThreadPoolExecutor(
+    max_workers=settings.youtube_fetch_threads or settings.youtube_max_concurrency,
+    thread_name_prefix="transcript",
+)
+
+
+def _fetch_transcript_sync(video_id: str, language: str):
+    """[동기 함수] 설정된 자막 제공자로 자막을 다운로드합니다."""
+    return transcript_provider.fetch(video_id, language)
+
+
+async def _fetch_once(video_id: str, language: str):
+    """
+    자막 다운로드 1회 (동시 실행 수 제한 + 요청 마감 시간 안에서의 시간 제한)
+    남은 시간 중 youtube_budget_share만 쓰고 나머지는 Gemini 호출 몫으로 남겨둡니다.
+    (시간 초과 시 스레드 자체는 끝까지 돌지만 결과는 버림)
+    """
+    timeout = stage_timeout(settings.youtube_timeout_seconds, settings.youtube_budget_share)
+    async with youtube_limiter.slot():
+        return await asyncio.wait_for(
+            run_in_thread(_fetch_transcript_sync, video_id, language, executor=transcript_executor),
+            timeout=timeout,
+        )
+
+
+async def _fetch_with_retry(video_id: str, language: str):
+    """서킷 브레이커 + 일시 오류 재시도로 자막 다운로드"""
+    async with youtube_breaker.guard():
+        return await retry_async(
+            lambda: _fetch_once(video_id, language),
+            name="youtube",
+            attempts=settings.youtube_max_attempts,
+            retryable=RETRYABLE_YOUTUBE_ERRORS,
+            base_delay=settings.upstream_retry_base_seconds,
+            max_delay=settings.upstream_retry_max_seconds,
+        )
+
+
+async def get_transcript_list(video: Union[VideoRef, str], language: str = "en") -> CompactTranscript:
     """
     [메인 함수] 
     외부(Router)에서 호출하는 비동기 함수입니다.
-    (language 파라미터는 추후 확장성을 위해 남겨두지만, 현재 로직에서는 영어만 강제합니다)
+    video는 이미 파싱한 VideoRef를 넘기면 링크를 다시 파싱하지 않습니다. (링크 문자열도 가능)
+    language는 받아올 자막(원본)의 언어입니다. (뜻 언어 targetLang이 아님, 분석은 영어 자막으로)
+
+    반환값은 리스트처럼 순회하면 {'text', 'start', 'duration'} dict가 나오는
+    CompactTranscript 입니다. (저장소에 있으면 유튜브를 호출하지 않음)
     """
     try:
-        # 1. URL에서 ID 추출
-        video_id = extract_video_id(video_url)
-        
-        # 2. 비동기 스레드로 자막 다운로드 실행
-        # _fetch_transcript_sync 함수가 '영어'만 찾으므로, 실패 시 에러가 올라옴
-        transcript_data = await asyncio.to_thread(_fetch_transcript_sync, video_id)
-        
+        # 1. URL에서 ID 추출 (이미 파싱된 경우 그대로 사용)
+        video_id = video.video_id if isinstance(video, VideoRef) else extract_video_id(video)
+        # 저장소 키: 영어 자막은 예전처럼 영상 ID, 다른 언어는 "영상ID:언어"
+        store_key = video_id if language == "en" else f"{video_id}:{language}"
+
+        # 2. 저장소 확인 (자막 없음/꺼짐으로 기억된 영상이면 여기서 바로 에러)
+        transcript_data = await transcript_store.lookup(store_key)
+        if transcript_data is not None:
+            return transcript_data
+
+        # 3. 비동기 스레드로 자막 다운로드 실행
+        # _fetch_transcript_sync 함수가 language 자막만 찾으므로, 실패 시 에러가 올라옴
+        try:
+            snippets = await _fetch_with_retry(video_id, language)
+        except (NoTranscriptException, TranscriptsDisabledException) as e:
+            await transcript_store.save_negative(store_key, e)
+            raise
+        except UpstreamUnavailableException:
+            # 유튜브 서킷이 열림 -> 예전에 받아둔 자막이 있으면 만료됐어도 그걸로 분석
+            stale = await transcript_store.lookup_stale(store_key)
+            if stale is None:
+                raise
+            logger.warning(f"유튜브 장애로 만료된 자막을 대신 사용합니다. ({video_id})")
+            return stale
+
+        # 4. 압축해서 저장 후 반환
+        with span("transcript_compact"):
+            transcript_data = CompactTranscript.from_snippets(snippets)
+        await transcript_store.save(store_key, transcript_data)
         return transcript_data
 
 
@@ -89,7 +287,14 @@ async def get_transcript_list(video_url: str, language: str = "en") -> list[dict
     # --- [에러 처리 구간] ---
     
     # CASE 1: 이미 우리가 의도한대로 변환된 커스텀 에러들
-    except (InvalidLinkException, NoTranscriptException, TranscriptsDisabledException) as e:
+    except (
+        InvalidLinkException,
+        NoTranscriptException,
+        TranscriptsDisabledException,
+        ServerBusyException,
+        UpstreamUnavailableException,
+        DeadlineExceededException,
+    ) as e:
         # 로그에는 경고 수준으로 남기고 그대로 던짐 -> Video Router가 받아서 400 응답
         logger.warning(f"예상된 에러 발생 ({type(e).__name__}): {str(e)}")
         raise e
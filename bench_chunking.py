@@ -0,0 +1,78 @@
+"""
+긴 자막 분할 분석(Map-Reduce) 벤치마크
+
+Gemini 호출을 "기본 지연 + 입력 토큰당 지연" 스텁(LLM_BACKEND=stub)으로 흉내 낸 뒤,
+자막 길이별로 한 번에 보내기(single) vs 구간 분할(chunked)의
+소요 시간 / 호출 수 / 결과 표현 수를 비교합니다.
+
+사용법:
+    python bench_chunking.py --lengths 50 200 800 2000 --per-token-ms 0.8
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("STUB_LLM_LATENCY_MS", "300")
+# 워커 공용 캐시(자막/Gemini 응답)가 응답하면 측정이 달라지므로 끔 (bench_shared_cache.py로 따로 측정)
+os.environ.setdefault("TRANSCRIPT_CACHE_SHARED", "false")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+from app.core.config import settings
+from app.services import gemini_service
+
+WORDS = "honestly I was about to call it a day but then we decided to hit the road anyway".split()
+
+
+def make_transcript(snippets: int) -> list[dict]:
+    """자막 조각 n개짜리 가짜 자막 (조각마다 단어 8개, 2초)"""
+    transcript = []
+    for index in range(snippets):
+        words = [WORDS[(index + offset) % len(WORDS)] for offset in range(8)]
+        transcript.append({"text": " ".join(words), "start": index * 2.0, "duration": 2.0})
+    return transcript
+
+
+async def _measure(transcript: list[dict], window_budget: int) -> dict:
+    settings.gemini_window_token_budget = window_budget
+    backend = gemini_service.llm_backend
+    backend.calls = 0
+    backend.prompt_tokens = 0
+    started = time.perf_counter()
+    vocabulary = await gemini_service.extract_vocabulary(transcript)
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "calls": backend.calls,
+        "promptTokens": backend.prompt_tokens,
+        "expressions": len(vocabulary),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", type=int, nargs="+", default=[50, 200, 800, 2000])
+    parser.add_argument("--per-token-ms", type=float, default=0.8)
+    parser.add_argument("--window-budget", type=int, default=settings.gemini_window_token_budget)
+    args = parser.parse_args()
+
+    settings.stub_llm_per_token_ms = args.per_token_ms
+
+    rows = []
+    for snippets in args.lengths:
+        transcript = make_transcript(snippets)
+        single = await _measure(transcript, window_budget=10 ** 9)
+        chunked = await _measure(transcript, window_budget=args.window_budget)
+        rows.append({"snippets": snippets, "single": single, "chunked": chunked})
+        print(
+            f"조각 {snippets:>5}개 | single {single['seconds']:>6.2f}s ({single['expressions']}개) "
+            f"| chunked {chunked['seconds']:>6.2f}s ({chunked['calls']}회 호출, {chunked['expressions']}개)"
+        )
+
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
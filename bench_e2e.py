@@ -0,0 +1,296 @@
+"""
+/v1/video/analyze 전 구간(End-to-End) 벤치마크
+
+YouTube/Gemini를 지연 스텁(LLM_BACKEND=stub, TRANSCRIPT_PROVIDER=stub)으로 바꾼 뒤
+동시 요청 수 x 자막 길이 조합마다 아래 값을 측정해 JSON으로 저장합니다.
+성능 관련 변경 전/후에 같은 옵션으로 돌려서 결과 파일을 비교하면 됩니다.
+
+  - 지연 시간 p50 / p95 / p99 / 최대 (초)
+  - 처리량 (requests/sec)
+  - 이벤트 루프 지연 (in-process 모드만: 10ms 주기 타이머가 늦게 깨어난 정도)
+  - 요청당 메모리 증가량 (RSS 기준, uvicorn 모드는 워커 프로세스 합계)
+
+모드:
+  inprocess : httpx ASGITransport로 앱을 같은 프로세스에서 직접 호출 (네트워크 없음)
+  uvicorn   : uvicorn 워커 여러 개를 띄우고 실제 HTTP로 호출
+
+사용법:
+    python bench_e2e.py --mode inprocess --concurrency 1 8 32 --snippets 40 400
+    python bench_e2e.py --mode uvicorn --workers 4 --concurrency 8 64 --output .cache/bench/after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+# 스텁/메모리 캐시 설정은 app을 불러오기 전에 해야 합니다. (uvicorn 워커에도 그대로 전달됨)
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("TRANSCRIPT_PROVIDER", "stub")
+os.environ.setdefault("RESULT_CACHE_BACKEND", "memory")
+os.environ.setdefault("GEMINI_WARMUP", "false")
+os.environ.setdefault("JOB_WORKERS_ENABLED", "false")
+# 한 클라이언트가 요청을 몰아 보내므로 요청 제한은 끔 (서버 처리 능력 자체를 측정)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+# 표현 색인이 Gemini 호출을 대신하면 측정이 달라지므로 끔 (bench_expression_index.py로 따로 측정)
+os.environ.setdefault("EXPRESSION_INDEX_ENABLED", "false")
+# 워커 공용 캐시(자막/Gemini 응답)가 응답하면 측정이 달라지므로 끔 (bench_shared_cache.py로 따로 측정)
+os.environ.setdefault("TRANSCRIPT_CACHE_SHARED", "false")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+import httpx
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+# 이벤트 루프 지연 측정 주기 (초)
+_LAG_INTERVAL = 0.01
+
+
+def percentile(values: list[float], q: float) -> float:
+    """정렬된 값에서 q(0~100) 백분위 (선형 보간)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _rss_bytes(pid: int) -> int:
+    """프로세스 RSS (리눅스 /proc 기준, 읽을 수 없으면 0)"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def _child_pids(pid: int) -> list[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def _tree_rss(pid: int) -> int:
+    """uvicorn 관리 프로세스 + 워커 프로세스들의 RSS 합계"""
+    return _rss_bytes(pid) + sum(_tree_rss(child) for child in _child_pids(pid))
+
+
+class LoopLagMonitor:
+    """짧게 잠들었다 깨어나는 시각이 얼마나 늦는지로 이벤트 루프 막힘을 측정"""
+
+    def __init__(self):
+        self.samples: list[float] = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + _LAG_INTERVAL
+            await asyncio.sleep(_LAG_INTERVAL)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> dict:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return {
+            "p99Ms": round(percentile(self.samples, 99) * 1000, 2),
+            "maxMs": round(max(self.samples, default=0.0) * 1000, 2),
+        }
+
+
+_request_seq = 0
+
+
+def _next_payload(prefix: str) -> dict:
+    """매번 다른 영상 ID (결과 캐시가 응답하지 않도록)"""
+    global _request_seq
+    _request_seq += 1
+    video_id = f"{prefix}{_request_seq:07d}"[-11:]
+    return {"videoUrl": f"https://www.youtube.com/watch?v={video_id}", "targetLang": "ko"}
+
+
+async def _run_level(client: httpx.AsyncClient, concurrency: int, total: int, prefix: str) -> dict:
+    """동시 요청 수를 concurrency로 유지하면서 total개를 보냄 (closed loop)"""
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            payload = _next_payload(prefix)
+            started = time.perf_counter()
+            try:
+                response = await client.post("/v1/video/analyze", json=payload)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if status != "200":
+                errors[status] = errors.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requestsPerSec": round(total / elapsed, 2),
+        "latency": {
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "max": round(max(latencies, default=0.0), 4),
+        },
+    }
+
+
+async def _bench_inprocess(args) -> list[dict]:
+    from app.core.config import settings
+    from app.main import app
+
+    rows = []
+    monitor = LoopLagMonitor()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for snippets in args.snippets:
+                # 스텁은 호출할 때마다 settings를 읽으므로 실행 중에 바꿔도 반영됩니다.
+                settings.stub_transcript_snippets = snippets
+                for concurrency in args.concurrency:
+                    total = max(args.requests, concurrency)
+                    rss_before = _rss_bytes(os.getpid())
+                    monitor.start()
+                    row = await _run_level(client, concurrency, total, prefix=f"s{snippets}c{concurrency}")
+                    row["loopLag"] = await monitor.stop()
+                    row["memoryPerRequestKb"] = round((_rss_bytes(os.getpid()) - rss_before) / total / 1024, 2)
+                    rows.append({"snippets": snippets, "concurrency": concurrency, **row})
+                    _print_row(rows[-1])
+    return rows
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit("uvicorn 서버가 제한 시간 안에 뜨지 않았습니다.")
+
+
+async def _bench_uvicorn(args) -> list[dict]:
+    rows = []
+    for snippets in args.snippets:
+        # 자막 길이는 워커 프로세스의 환경 변수로 전달해야 하므로 길이마다 서버를 새로 띄움
+        port = _free_port()
+        env = {**os.environ, "STUB_TRANSCRIPT_SNIPPETS": str(snippets)}
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(port),
+                "--workers", str(args.workers), "--log-level", "warning",
+            ],
+            env=env,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            await _wait_ready(base_url)
+            limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+            async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+                for concurrency in args.concurrency:
+                    total = max(args.requests, concurrency)
+                    rss_before = _tree_rss(server.pid)
+                    row = await _run_level(client, concurrency, total, prefix=f"s{snippets}c{concurrency}")
+                    # 서버 이벤트 루프는 다른 프로세스라 여기서 잴 수 없음
+                    row["loopLag"] = None
+                    row["memoryPerRequestKb"] = round((_tree_rss(server.pid) - rss_before) / total / 1024, 2)
+                    rows.append({"snippets": snippets, "concurrency": concurrency, **row})
+                    _print_row(rows[-1])
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return rows
+
+
+def _print_row(row: dict) -> None:
+    latency = row["latency"]
+    lag = f" | 루프 지연 p99 {row['loopLag']['p99Ms']}ms" if row["loopLag"] else ""
+    print(
+        f"조각 {row['snippets']:>5}개 · 동시 {row['concurrency']:>4} | "
+        f"p50 {latency['p50']:.3f}s p95 {latency['p95']:.3f}s p99 {latency['p99']:.3f}s | "
+        f"{row['requestsPerSec']:>8.2f} req/s | 에러 {sum(row['errors'].values())}{lag}"
+    )
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--snippets", type=int, nargs="+", default=[40, 400])
+    parser.add_argument("--requests", type=int, default=64, help="동시 요청 수 조합마다 보낼 요청 수")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn 모드의 워커 프로세스 수")
+    parser.add_argument("--gemini-latency-ms", type=float, default=300)
+    parser.add_argument("--gemini-sigma", type=float, default=0.3)
+    parser.add_argument("--youtube-latency-ms", type=float, default=50)
+    parser.add_argument("--output", default=".cache/bench/e2e.json")
+    args = parser.parse_args()
+
+    # uvicorn 워커에도 전달되도록 환경 변수로 지정
+    os.environ["STUB_LLM_LATENCY_MS"] = str(args.gemini_latency_ms)
+    os.environ["STUB_LLM_LATENCY_SIGMA"] = str(args.gemini_sigma)
+    os.environ["STUB_TRANSCRIPT_LATENCY_MS"] = str(args.youtube_latency_ms)
+
+    if args.mode == "inprocess":
+        rows = await _bench_inprocess(args)
+    else:
+        rows = await _bench_uvicorn(args)
+
+    report = {
+        "mode": args.mode,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "createdAt": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "options": vars(args),
+        "results": rows,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
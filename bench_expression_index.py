@@ -0,0 +1,129 @@
+"""
+표현 색인(ExpressionIndex) 조회 벤치마크
+
+가짜 표현 N개로 색인을 만든 뒤 자막 길이별로 아래 값을 측정해 JSON으로 저장합니다.
+  - 조회 1회 지연 p50 / p99 (밀리초, 자막 하나에서 색인 표현 찾기)
+  - 초당 조회 수
+  - 색인 파일 크기 / 표현 하나당 바이트
+  - 추가(add) 처리량 (카드/초)
+  - 색인을 처음 열 때 표현 집합을 메모리로 읽는 시간
+
+사용법:
+    python bench_expression_index.py --sizes 1000 10000 100000 --snippets 40 400
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+
+from app.services.expression_index import ExpressionIndex
+
+_VOCABULARY = (
+    "call it a day hit the road figure out make sense break a leg to be honest piece of cake "
+    "run out of time at the end hang in there by the way look it up kind of no worries catch up "
+    "get the hang on the same page touch base long time see what is going really actually pretty "
+    "much anyway right now you know I mean sort of whatever literally basically totally"
+).split()
+_TAGS = ("CASUAL", "BUSINESS", "GREETING", "SLANG", "ENCOURAGE")
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))] if ordered else 0.0
+
+
+def make_text(rng: random.Random, snippets: int) -> str:
+    """조각당 단어 8개짜리 가짜 자막 텍스트"""
+    return " ".join(rng.choice(_VOCABULARY) for _ in range(snippets * 8))
+
+
+def make_items(rng: random.Random, count: int) -> list[dict]:
+    """1~4단어짜리 서로 다른 가짜 표현 count개"""
+    items = {}
+    while len(items) < count:
+        phrase = " ".join(rng.choice(_VOCABULARY) for _ in range(rng.randint(1, 4)))
+        # 실제 사전에 없을 법한 표현도 섞이도록 번호 접미사
+        if rng.random() < 0.7:
+            phrase = f"{phrase} w{len(items)}"
+        items[phrase] = {"expression": phrase, "meaning": {"ko": f"{phrase}의 뜻"}, "contextTag": rng.choice(_TAGS)}
+    return list(items.values())
+
+
+def bench_size(size: int, snippet_sizes: list[int], lookups: int, directory: str) -> list[dict]:
+    rng = random.Random(size)
+    path = os.path.join(directory, f"index_{size}.sqlite3")
+    index = ExpressionIndex(path, min_hits=1)
+
+    items = make_items(rng, size)
+    started = time.perf_counter()
+    # 실제로는 영상마다 3개씩 들어오므로 작은 묶음으로 추가
+    for begin in range(0, len(items), 3):
+        index.add(items[begin:begin + 3], make_text(rng, 2))
+    add_seconds = time.perf_counter() - started
+
+    # WAL 내용을 본 파일로 합친 뒤 크기 측정
+    index._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    file_bytes = os.path.getsize(path)
+
+    # 다른 프로세스가 만든 색인을 처음 열 때처럼 표현 집합을 다시 읽는 시간 (조회 지연과 따로 측정)
+    index._data_version = None
+    started = time.perf_counter()
+    index.lookup("", limit=3)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    rows = []
+    for snippets in snippet_sizes:
+        texts = [make_text(rng, snippets) for _ in range(16)]
+        latencies = []
+        found = 0
+        for round_index in range(lookups):
+            started = time.perf_counter()
+            found += len(index.lookup(texts[round_index % len(texts)], limit=3))
+            latencies.append(time.perf_counter() - started)
+        row = {
+            "expressions": size,
+            "snippets": snippets,
+            "lookupP50Ms": round(percentile(latencies, 50) * 1000, 3),
+            "lookupP99Ms": round(percentile(latencies, 99) * 1000, 3),
+            "lookupsPerSec": round(lookups / sum(latencies), 1),
+            "avgFilled": round(found / lookups, 2),
+            "fileBytes": file_bytes,
+            "bytesPerExpression": round(file_bytes / size, 1),
+            "addPerSec": round(size / add_seconds, 1),
+            "loadKnownMs": round(load_ms, 2),
+        }
+        rows.append(row)
+        print(
+            f"표현 {size:>7}개 · 조각 {snippets:>4}개 | 조회 p50 {row['lookupP50Ms']:.3f}ms "
+            f"p99 {row['lookupP99Ms']:.3f}ms ({row['lookupsPerSec']:.0f}/s) | "
+            f"파일 {file_bytes / 1024:.0f}KB ({row['bytesPerExpression']}B/개) | "
+            f"추가 {row['addPerSec']:.0f}/s | 첫 로드 {row['loadKnownMs']:.0f}ms"
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--snippets", type=int, nargs="+", default=[40, 400])
+    parser.add_argument("--lookups", type=int, default=200, help="조합마다 조회 횟수")
+    parser.add_argument("--output", default=".cache/bench/expression_index.json")
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            rows.extend(bench_size(size, args.snippets, args.lookups, directory))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"options": vars(args), "results": rows}, f, indent=2, ensure_ascii=False)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
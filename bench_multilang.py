@@ -0,0 +1,113 @@
+"""
+여러 뜻 언어(targetLang="ko,ja,vi") 생성 방식 벤치마크
+
+Gemini 호출을 "기본 지연 + 입력 토큰당 지연" 스텁(LLM_BACKEND=stub)으로 흉내 낸 뒤,
+자막 길이별로 아래 세 방식의 호출 수 / 입력 토큰 / 소요 시간을 비교합니다.
+  1. 언어별 분석: 언어마다 자막 전체를 보내 따로 분석 (예전 방식을 언어 수만큼 반복)
+  2. 한 번에 분석: 프롬프트 하나로 모든 언어의 뜻을 함께 생성
+  3. 나중에 추가: 첫 언어로 분석해 둔 카드에 나머지 언어의 뜻만 번역 (자막 없이 표현 + 문장만)
+     -> 표에는 추가 언어에 든 비용만 표시
+
+사용법:
+    python bench_multilang.py --lengths 40 200 800 --languages ko ja vi --per-token-ms 0.8
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("STUB_LLM_LATENCY_MS", "300")
+# 워커 공용 캐시(Gemini 응답)가 응답하면 측정이 달라지므로 끔 (bench_shared_cache.py로 따로 측정)
+os.environ.setdefault("TRANSCRIPT_CACHE_SHARED", "false")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+from app.core.config import settings
+from app.services import gemini_service
+from app.services.transcript_anchor import anchor_items
+
+WORDS = "honestly I was about to call it a day but then we decided to hit the road anyway".split()
+
+
+def make_transcript(snippets: int) -> list[dict]:
+    """자막 조각 n개짜리 가짜 자막 (조각마다 단어 8개, 2초)"""
+    transcript = []
+    for index in range(snippets):
+        words = [WORDS[(index + offset) % len(WORDS)] for offset in range(8)]
+        transcript.append({"text": " ".join(words), "start": index * 2.0, "duration": 2.0})
+    return transcript
+
+
+async def _measure(run) -> dict:
+    backend = gemini_service.llm_backend
+    backend.calls = 0
+    backend.prompt_tokens = 0
+    started = time.perf_counter()
+    items = await run()
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "calls": backend.calls,
+        "promptTokens": backend.prompt_tokens,
+        "cards": len(items),
+    }
+
+
+async def measure_length(transcript: list[dict], languages: tuple[str, ...]) -> dict:
+    async def per_language():
+        results = await asyncio.gather(
+            *(gemini_service.extract_vocabulary(transcript, languages=(code,)) for code in languages)
+        )
+        return [item for items in results for item in items]
+
+    async def one_pass():
+        return await gemini_service.extract_vocabulary(transcript, languages=languages)
+
+    # 3. 첫 언어 결과는 미리 만들어 둔 상태 (결과 캐시에 있던 것처럼)
+    first = anchor_items(await gemini_service.extract_vocabulary(transcript, languages=languages[:1]), transcript)
+
+    async def incremental():
+        return await gemini_service.translate_meanings(first, languages[1:])
+
+    return {
+        "perLanguage": await _measure(per_language),
+        "onePass": await _measure(one_pass),
+        "incremental": await _measure(incremental),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", type=int, nargs="+", default=[40, 200, 800])
+    parser.add_argument("--languages", nargs="+", default=["ko", "ja", "vi"])
+    parser.add_argument("--per-token-ms", type=float, default=0.8)
+    parser.add_argument("--output", default=".cache/bench/multilang.json")
+    args = parser.parse_args()
+
+    settings.stub_llm_per_token_ms = args.per_token_ms
+    # 긴 자막도 구간 분할 없이 한 프롬프트로 비교 (분할은 bench_chunking.py에서 따로 측정)
+    settings.gemini_window_token_budget = 10 ** 9
+    gemini_service.llm_backend.start()
+    languages = tuple(args.languages)
+
+    rows = []
+    for snippets in args.lengths:
+        row = {"snippets": snippets, **await measure_length(make_transcript(snippets), languages)}
+        rows.append(row)
+        per_language, one_pass, incremental = row["perLanguage"], row["onePass"], row["incremental"]
+        print(
+            f"조각 {snippets:>5}개 | 언어별 분석 {per_language['calls']}회 {per_language['promptTokens']:>6}토큰 "
+            f"{per_language['seconds']:.2f}s | 한 번에 {one_pass['calls']}회 {one_pass['promptTokens']:>6}토큰 "
+            f"{one_pass['seconds']:.2f}s | 나중에 추가({','.join(languages[1:])}) {incremental['calls']}회 "
+            f"{incremental['promptTokens']:>5}토큰 {incremental['seconds']:.2f}s"
+        )
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"options": vars(args), "results": rows}, f, indent=2, ensure_ascii=False)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+분석 응답 직렬화 / 압축 벤치마크
+
+가짜 단어장으로 응답 하나(카드 N장)와 배치 응답(영상 M개)을 만들어 아래 값을 비교해 JSON으로 저장합니다.
+  - 예전 경로: WordItem(**item) 재검증 -> AnalyzeResponse -> FastAPI 기본 직렬화 (jsonable_encoder + json.dumps)
+  - 새 경로: 응답 모양 dict -> orjson.dumps
+  - 본문 크기: 원본 / gzip / br (brotli가 설치돼 있을 때만)
+
+사용법:
+    python bench_response.py --cards 3 10 --batch 20 --rounds 2000
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.core.responses import brotli, compress
+from app.models.schemas import AnalyzeResponse, WordItem
+from app.routers.video import _analysis_payload
+
+
+def make_items(count: int) -> list[dict]:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "expression": f"hit the road {index}",
+            "meaning": {"ko": "출발하다, 길을 나서다"},
+            "contextTag": "CASUAL",
+            "start": 12.0 + index,
+            "end": 14.0 + index,
+            "sentence": "but then we decided to hit the road anyway, because it was getting late",
+        }
+        for index in range(count)
+    ]
+
+
+def legacy_body(video_id: str, items: list[dict]) -> bytes:
+    response = AnalyzeResponse(
+        video_id=video_id,
+        title="uploaded_url",
+        script_items=[WordItem(**item) for item in items],
+    )
+    # FastAPI 기본 응답 경로와 같은 방식 (별명 키로 변환 후 json.dumps)
+    content = jsonable_encoder(response, by_alias=True)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_body(video_id: str, items: list[dict]) -> bytes:
+    return orjson.dumps(_analysis_payload(video_id, items, ("ko",)))
+
+
+def per_call_us(fn, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1_000_000
+
+
+def sizes(body: bytes) -> dict:
+    row = {"rawBytes": len(body), "gzipBytes": len(compress(body, "gzip")[1])}
+    if brotli is not None:
+        row["brBytes"] = len(compress(body, "br")[1])
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, nargs="+", default=[3, 10])
+    parser.add_argument("--batch", type=int, default=20, help="배치 응답에 담을 영상 수")
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--output", default=".cache/bench/response.json")
+    args = parser.parse_args()
+
+    rows = []
+    for cards in args.cards:
+        items = make_items(cards)
+        row = {
+            "cards": cards,
+            "legacyUs": round(per_call_us(lambda: legacy_body("jNQXAC9IVRw", items), args.rounds), 2),
+            "fastUs": round(per_call_us(lambda: fast_body("jNQXAC9IVRw", items), args.rounds), 2),
+            **sizes(fast_body("jNQXAC9IVRw", items)),
+        }
+        rows.append(row)
+        print(
+            f"카드 {cards:>3}장 | 예전 {row['legacyUs']:.1f}us -> 새 경로 {row['fastUs']:.1f}us "
+            f"(x{row['legacyUs'] / row['fastUs']:.1f}) | {row['rawBytes']}B -> gzip {row['gzipBytes']}B"
+            + (f", br {row['brBytes']}B" if "brBytes" in row else "")
+        )
+
+    batch = {"results": [
+        {"videoUrl": f"https://youtu.be/{index:011d}", "status": "OK",
+         "result": _analysis_payload(f"{index:011d}", make_items(3), ("ko",)), "code": None, "message": None}
+        for index in range(args.batch)
+    ]}
+    batch_body = orjson.dumps(batch)
+    batch_row = {"videos": args.batch, **sizes(batch_body)}
+    print(f"배치 {args.batch}개 | {batch_row['rawBytes']}B -> gzip {batch_row['gzipBytes']}B"
+          + (f", br {batch_row['brBytes']}B" if "brBytes" in batch_row else ""))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"options": vars(args), "results": rows, "batch": batch_row}, f, indent=2, ensure_ascii=False)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+워커 공용 캐시(app/services/shared_cache.py) 벤치마크
+
+임시 파일에 캐시를 만들어 아래 값을 재고 JSON으로 저장합니다.
+  1. 적중률: 요청을 워커 N개에 고르게 나눠 보낼 때
+     워커별 메모리 캐시(LRU)와 공용 캐시의 미스(= YouTube/Gemini 호출) 수 비교
+  2. 여러 프로세스 동시 읽기: fork한 프로세스 P개가 같은 파일에서 결과(JSON)/자막(바이트)을
+     무작위로 읽을 때의 전체 처리량과 읽기 지연 p50/p99 (--write-ratio만큼 쓰기를 섞음)
+  3. 크기 제한/정리: 제한의 2배를 써 넣은 뒤 전체 크기와 compact() 시간
+
+사용법:
+    python bench_shared_cache.py --procs 1 2 4 8 --reads 20000 --keys 2000 --write-ratio 0.02
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from collections import OrderedDict
+
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+
+from app.services.shared_cache import SharedCache
+from app.services.transcript_store import CompactTranscript
+
+_SENTENCE = "but then we decided to hit the road anyway because it was getting late"
+
+
+def make_result(index: int) -> str:
+    items = [
+        {"id": f"{index}-{n}", "expression": f"hit the road {n}", "meaning": {"ko": "출발하다, 길을 나서다"},
+         "contextTag": "CASUAL", "start": 12.0 + n, "end": 14.0 + n, "sentence": _SENTENCE}
+        for n in range(3)
+    ]
+    return json.dumps(items, ensure_ascii=False)
+
+
+def make_transcript(snippets: int) -> bytes:
+    return CompactTranscript.from_snippets(
+        {"text": _SENTENCE, "start": n * 2.0, "duration": 2.0} for n in range(snippets)
+    ).to_bytes()
+
+
+def zipf_keys(rng: random.Random, keys: int, count: int, skew: float) -> list[int]:
+    """인기 영상에 요청이 몰리는 분포 (순위 r의 가중치 1/r^skew)"""
+    weights = [1 / (rank ** skew) for rank in range(1, keys + 1)]
+    return rng.choices(range(keys), weights=weights, k=count)
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+# =============================================================================
+# 1. 적중률: 워커별 메모리 캐시 vs 공용 캐시
+# =============================================================================
+def hit_rate(workers: int, keys: int, requests: int, capacity: int, skew: float) -> dict:
+    rng = random.Random(7)
+    stream = zipf_keys(rng, keys, requests, skew)
+
+    private = [OrderedDict() for _ in range(workers)]
+    private_misses = 0
+    shared = OrderedDict()
+    shared_misses = 0
+    for position, key in enumerate(stream):
+        # 로드밸런서가 요청을 워커들에 차례로 나눠 줌
+        cache = private[position % workers]
+        for lru, is_shared in ((cache, False), (shared, True)):
+            if key in lru:
+                lru.move_to_end(key)
+                continue
+            if is_shared:
+                shared_misses += 1
+            else:
+                private_misses += 1
+            lru[key] = True
+            # 공용 캐시는 워커 메모리를 합친 만큼 (같은 총 용량)
+            limit = capacity * workers if is_shared else capacity
+            while len(lru) > limit:
+                lru.popitem(last=False)
+
+    return {
+        "workers": workers,
+        "privateHitRate": round(1 - private_misses / requests, 4),
+        "sharedHitRate": round(1 - shared_misses / requests, 4),
+        "privateMisses": private_misses,
+        "sharedMisses": shared_misses,
+    }
+
+
+# =============================================================================
+# 2. 여러 프로세스 동시 읽기
+# =============================================================================
+def populate(path: str, keys: int, snippets: int) -> SharedCache:
+    cache = SharedCache(path, max_bytes=1 << 34, compact_every=0, mmap_bytes=256 << 20)
+    expires_at = time.time() + 3600
+    transcript = make_transcript(snippets)
+    for index in range(keys):
+        cache.set("result", f"v{index}", make_result(index), expires_at)
+        cache.set("transcript", f"v{index}", transcript, expires_at)
+    return cache
+
+
+def reader(path: str, seed: int, reads: int, keys: int, write_ratio: float, skew: float,
+           start_event, queue) -> None:
+    """(fork된 프로세스) 무작위 읽기 reads번 -> 지연 표본을 큐로 보냄"""
+    # 워커처럼 프로세스마다 자기 연결로 엶
+    cache = SharedCache(path, max_bytes=1 << 34, compact_every=0, mmap_bytes=256 << 20)
+    rng = random.Random(seed)
+    stream = zipf_keys(rng, keys, reads, skew)
+    cache.get("result", "v0")  # 연결 열기는 측정에서 뺌
+
+    start_event.wait()
+    latencies = []
+    writes = 0
+    started = time.perf_counter()
+    for key in stream:
+        namespace = "transcript" if rng.random() < 0.5 else "result"
+        if rng.random() < write_ratio:
+            cache.set("result", f"v{key}", make_result(key), time.time() + 3600)
+            writes += 1
+            continue
+        begin = time.perf_counter()
+        record = cache.get(namespace, f"v{key}")
+        if namespace == "transcript":
+            CompactTranscript.from_bytes(record[0])
+        else:
+            json.loads(record[0])
+        latencies.append(time.perf_counter() - begin)
+    queue.put({"elapsed": time.perf_counter() - started, "latencies": latencies, "writes": writes})
+
+
+def concurrent_reads(path: str, procs: int, args) -> dict:
+    context = multiprocessing.get_context("fork")
+    start_event = context.Event()
+    queue = context.Queue()
+    workers = [
+        context.Process(target=reader, args=(path, seed, args.reads, args.keys, args.write_ratio, args.skew,
+                                             start_event, queue))
+        for seed in range(procs)
+    ]
+    for worker in workers:
+        worker.start()
+    time.sleep(0.3)
+    started = time.perf_counter()
+    start_event.set()
+    outcomes = [queue.get() for _ in workers]
+    wall = time.perf_counter() - started
+    for worker in workers:
+        worker.join()
+
+    latencies = [value for outcome in outcomes for value in outcome["latencies"]]
+    return {
+        "procs": procs,
+        "reads": len(latencies),
+        "writes": sum(outcome["writes"] for outcome in outcomes),
+        "readsPerSecond": round(len(latencies) / wall),
+        "p50Us": round(percentile(latencies, 0.50) * 1e6, 1),
+        "p99Us": round(percentile(latencies, 0.99) * 1e6, 1),
+    }
+
+
+# =============================================================================
+# 3. 크기 제한 / 정리
+# =============================================================================
+def eviction(path: str, max_bytes: int) -> dict:
+    cache = SharedCache(path, max_bytes=max_bytes, stale_seconds=0, compact_every=0)
+    payload = make_result(0)
+    count = (max_bytes * 2) // len(payload.encode("utf-8"))
+    started = time.perf_counter()
+    for index in range(count):
+        # 절반은 이미 만료된 항목 (정리 때 지워짐)
+        expires_at = time.time() + (3600 if index % 2 else -1)
+        cache.set("result", f"e{index}", payload, expires_at)
+    write_seconds = time.perf_counter() - started
+    before = cache.stats()["totalBytes"]
+    report = cache.compact()
+    after = cache.stats()["totalBytes"]
+    return {
+        "maxBytes": max_bytes,
+        "written": count,
+        "writeUs": round(write_seconds / count * 1e6, 1),
+        "evictedOnWrite": cache.evicted - report["evicted"],
+        "bytesBeforeCompact": before,
+        "bytesAfterCompact": after,
+        "compact": report,
+        "withinLimit": before <= max_bytes and after <= max_bytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--procs", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--reads", type=int, default=20000, help="프로세스당 읽기 수")
+    parser.add_argument("--keys", type=int, default=2000, help="영상 수 (결과 + 자막)")
+    parser.add_argument("--snippets", type=int, default=400, help="자막 한 편의 조각 수")
+    parser.add_argument("--write-ratio", type=float, default=0.02)
+    parser.add_argument("--skew", type=float, default=1.0, help="인기 편중 (Zipf 지수)")
+    parser.add_argument("--memory-entries", type=int, default=256, help="적중률 비교: 워커당 메모리 캐시 크기")
+    parser.add_argument("--max-bytes", type=int, default=4 << 20, help="크기 제한 측정에 쓸 제한 (바이트)")
+    parser.add_argument("--output", default=".cache/bench/shared_cache.json")
+    args = parser.parse_args()
+
+    rates = []
+    for workers in args.procs:
+        row = hit_rate(workers, args.keys * 5, 100_000, args.memory_entries, args.skew)
+        rates.append(row)
+        print(f"워커 {workers:>2}개 적중률 | 워커별 메모리 {row['privateHitRate']:.1%} "
+              f"-> 공용 캐시 {row['sharedHitRate']:.1%} (미스 {row['privateMisses']} -> {row['sharedMisses']})")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "shared_cache.sqlite3")
+        started = time.perf_counter()
+        populate(path, args.keys, args.snippets)
+        print(f"캐시 채우기: 영상 {args.keys}개 ({time.perf_counter() - started:.2f}초, "
+              f"파일 {os.path.getsize(path) / 1e6:.1f}MB)")
+
+        reads = []
+        for procs in args.procs:
+            row = concurrent_reads(path, procs, args)
+            reads.append(row)
+            print(f"프로세스 {procs:>2}개 | 읽기 {row['readsPerSecond']:>9,}/s | "
+                  f"p50 {row['p50Us']:.0f}us p99 {row['p99Us']:.0f}us | 쓰기 {row['writes']}")
+
+        evict = eviction(os.path.join(directory, "evict.sqlite3"), args.max_bytes)
+        print(f"크기 제한 {evict['maxBytes'] / 1e6:.1f}MB에 {evict['written']}개 쓰기 (쓰기당 {evict['writeUs']:.0f}us) | "
+              f"정리 전 {evict['bytesBeforeCompact'] / 1e6:.2f}MB -> 후 {evict['bytesAfterCompact'] / 1e6:.2f}MB "
+              f"(만료 {evict['compact']['expired']}개, {evict['compact']['seconds'] * 1000:.1f}ms) -> "
+              + ("통과" if evict["withinLimit"] else "실패"))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"options": vars(args), "hitRate": rates, "reads": reads, "eviction": evict},
+                  f, indent=2, ensure_ascii=False)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
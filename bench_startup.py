@@ -0,0 +1,188 @@
+"""
+서버 시작 / 종료 벤치마크 (운영 실행기 app/serve.py)
+
+아래 값을 재서 JSON으로 저장합니다. (LLM/자막은 가짜 백엔드 사용 -> 네트워크/키 불필요)
+  1. import 시간: python -X importtime -c "import app.main" 로 전체 시간과 오래 걸린 모듈 상위 N개
+  2. 콜드 스타트: python -m app.serve 실행 -> /ready가 200이 될 때까지 걸린 시간, 첫 분석 요청 시간
+  3. 정상 종료(drain): 느린 분석 요청이 진행 중일 때 SIGTERM -> 요청이 200으로 끝나는지,
+     서버가 종료 대기 시간 안에 정상 코드(0)로 끝나는지
+
+사용법:
+    python bench_startup.py --workers 2 --port 8799 --slow-ms 3000
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# 가짜 백엔드 + 외부 상태(파일 캐시/색인) 없이 실행
+BENCH_ENV = {
+    "GEMINI_API_KEY": "bench",
+    "LLM_BACKEND": "stub",
+    "TRANSCRIPT_PROVIDER": "stub",
+    "STUB_TRANSCRIPT_LATENCY_MS": "1",
+    "RESULT_CACHE_BACKEND": "memory",
+    "EXPRESSION_INDEX_ENABLED": "false",
+    "TRANSCRIPT_CACHE_SHARED": "false",
+    "LLM_CACHE_ENABLED": "false",
+    "RATE_LIMIT_ENABLED": "false",
+}
+
+
+def import_times(top: int) -> dict:
+    """-X importtime 출력(stderr)에서 누적 시간이 큰 모듈 상위 N개"""
+    env = {**os.environ, **BENCH_ENV, "PYTHONPATH": "."}
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - started
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = line.replace("import time:", "|", 1).split("|")
+        modules.append({"module": name[1:].rstrip(), "selfMs": int(self_us) / 1000, "cumulativeMs": int(cumulative_us) / 1000})
+
+    # 최상위 import(들여쓰기 없는 모듈)만 더하면 전체 import 시간
+    total_ms = sum(row["cumulativeMs"] for row in modules if not row["module"].startswith(" "))
+    heaviest = sorted(modules, key=lambda row: row["cumulativeMs"], reverse=True)[:top]
+    return {"wallSeconds": round(wall, 3), "importMs": round(total_ms, 1), "top": heaviest}
+
+
+def http(method: str, url: str, body: dict = None, timeout: float = 30.0) -> tuple[int, dict]:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def wait_ready(base: str, proc: subprocess.Popen, timeout: float) -> float:
+    """/ready가 200이 될 때까지 기다림 -> 걸린 시간 (초)"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError(f"서버가 시작 중에 종료됨 (코드 {proc.returncode})")
+        try:
+            status, _ = http("GET", f"{base}/ready", timeout=1.0)
+            if status == 200:
+                return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.02)
+    raise TimeoutError("서버가 준비되지 않음")
+
+
+def start_server(args, latency_ms: int) -> subprocess.Popen:
+    env = {**os.environ, **BENCH_ENV, "PYTHONPATH": ".", "STUB_LLM_LATENCY_MS": str(latency_ms)}
+    command = [sys.executable, "-m", "app.serve", "--workers", str(args.workers), "--port", str(args.port),
+               "--host", "127.0.0.1", "--log-level", "warning"]
+    if not args.preload:
+        command.append("--no-preload")
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def cold_start(args, base: str) -> dict:
+    proc = start_server(args, latency_ms=args.fast_ms)
+    try:
+        ready_seconds = wait_ready(base, proc, args.timeout)
+        _, ready = http("GET", f"{base}/ready")
+
+        started = time.perf_counter()
+        status, _ = http("POST", f"{base}/v1/video/analyze", {"videoUrl": "https://youtu.be/aaaaaaaaaaa"})
+        first_ms = (time.perf_counter() - started) * 1000
+        return {
+            "readySeconds": round(ready_seconds, 3),
+            "workerImportSeconds": ready.get("importSeconds"),
+            "workerBootSeconds": ready.get("bootSeconds"),
+            "warm": ready.get("warm"),
+            "firstRequestStatus": status,
+            "firstRequestMs": round(first_ms, 1),
+        }
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=args.timeout)
+
+
+def graceful_drain(args, base: str) -> dict:
+    proc = start_server(args, latency_ms=args.slow_ms)
+    result: dict = {}
+    try:
+        wait_ready(base, proc, args.timeout)
+
+        def slow_request():
+            started = time.perf_counter()
+            try:
+                status, _ = http("POST", f"{base}/v1/video/analyze", {"videoUrl": "https://youtu.be/bbbbbbbbbbb"},
+                                 timeout=args.timeout)
+            except Exception as e:
+                status = f"{type(e).__name__}: {e}"
+            result["inflightStatus"] = status
+            result["inflightMs"] = round((time.perf_counter() - started) * 1000, 1)
+
+        worker = threading.Thread(target=slow_request)
+        worker.start()
+        # 요청이 워커에 들어가 LLM 응답을 기다리는 중에 종료 신호
+        time.sleep(min(1.0, args.slow_ms / 3000))
+        signal_at = time.perf_counter()
+        proc.send_signal(signal.SIGTERM)
+
+        worker.join(timeout=args.timeout)
+        proc.wait(timeout=args.timeout)
+        result["exitSeconds"] = round(time.perf_counter() - signal_at, 3)
+        result["exitCode"] = proc.returncode
+        result["drained"] = result.get("inflightStatus") == 200 and proc.returncode == 0
+        return result
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--fast-ms", type=int, default=50, help="콜드 스타트 측정 때 가짜 LLM 지연")
+    parser.add_argument("--slow-ms", type=int, default=3000, help="drain 측정 때 가짜 LLM 지연")
+    parser.add_argument("--top", type=int, default=10, help="import 시간 상위 모듈 수")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", default=".cache/bench/startup.json")
+    args = parser.parse_args()
+    base = f"http://127.0.0.1:{args.port}"
+
+    imports = import_times(args.top)
+    print(f"import app.main: {imports['importMs']:.0f}ms (프로세스 전체 {imports['wallSeconds']:.2f}초)")
+    for row in imports["top"]:
+        print(f"  {row['cumulativeMs']:>8.1f}ms  {row['module'].strip()}")
+
+    cold = cold_start(args, base)
+    print(f"콜드 스타트 (워커 {args.workers}개, preload={args.preload}): /ready까지 {cold['readySeconds']:.2f}초, "
+          f"첫 분석 요청 {cold['firstRequestStatus']} {cold['firstRequestMs']:.0f}ms")
+
+    drain = graceful_drain(args, base)
+    print(f"정상 종료: 진행 중 요청 {drain.get('inflightStatus')} ({drain.get('inflightMs')}ms), "
+          f"서버 종료 {drain['exitSeconds']:.2f}초 (코드 {drain['exitCode']}) -> "
+          + ("통과" if drain["drained"] else "실패"))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"options": vars(args), "imports": imports, "coldStart": cold, "drain": drain},
+                  f, indent=2, ensure_ascii=False)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+유튜브 링크 파싱 마이크로 벤치마크
+
+예전 정규식 추출(re.search)과 새 파서(parse_video_url)를 링크 모양별로 비교해 JSON으로 저장합니다.
+  - 예전 정규식: 1회당 마이크로초
+  - 새 파서 (캐시 없음): 매번 cache_clear() 뒤 파싱
+  - 새 파서 (캐시 적중): 같은 링크를 반복 파싱
+  - 예전 정규식이 통과시켰지만 새 파서는 거절하는 링크 수 (헛된 유튜브 호출이 줄어드는 정도)
+
+사용법:
+    python bench_video_url.py --rounds 20000
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+
+from app.core.exceptions import InvalidLinkException
+from app.services.video_url import parse_video_url
+
+# 예전 youtube_service.extract_video_id가 쓰던 정규식
+_LEGACY_RE = re.compile(r"(?:v=|\/)([0-9A-Za-z_-]{11}).*")
+
+SAMPLES = {
+    "watch": "https://www.youtube.com/watch?v=jNQXAC9IVRw&t=10s",
+    "short_link": "https://youtu.be/jNQXAC9IVRw?si=abcdefgh",
+    "shorts": "https://youtube.com/shorts/jNQXAC9IVRw?feature=share",
+    "embed": "https://www.youtube-nocookie.com/embed/jNQXAC9IVRw",
+    "invalid_host": "https://example.com/abcdefghijk",
+    "channel": "https://www.youtube.com/channel/UCabcdefghijk",
+}
+
+
+def legacy_extract(url: str):
+    match = _LEGACY_RE.search(url)
+    return match.group(1) if match else None
+
+
+def new_extract(url: str):
+    try:
+        return parse_video_url(url).video_id
+    except InvalidLinkException:
+        return None
+
+
+def per_call_us(fn, url: str, rounds: int, clear_cache: bool = False) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if clear_cache:
+            parse_video_url.cache_clear()
+        fn(url)
+    return (time.perf_counter() - started) / rounds * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=20000, help="링크 모양마다 반복 횟수")
+    parser.add_argument("--output", default=".cache/bench/video_url.json")
+    args = parser.parse_args()
+
+    # cache_clear() 자체의 비용은 캐시 없는 측정에서 빼기 위해 따로 잼
+    clear_us = per_call_us(lambda _: None, "", args.rounds, clear_cache=True)
+
+    rows = []
+    false_accepts = 0
+    for kind, url in SAMPLES.items():
+        legacy_id = legacy_extract(url)
+        new_id = new_extract(url)
+        if legacy_id is not None and new_id is None:
+            false_accepts += 1
+
+        row = {
+            "kind": kind,
+            "legacyUs": round(per_call_us(legacy_extract, url, args.rounds), 3),
+            "uncachedUs": round(max(0.0, per_call_us(new_extract, url, args.rounds, clear_cache=True) - clear_us), 3),
+            "cachedUs": round(per_call_us(new_extract, url, args.rounds), 3),
+            "legacyId": legacy_id,
+            "newId": new_id,
+        }
+        rows.append(row)
+        print(
+            f"{kind:>12} | 정규식 {row['legacyUs']:.2f}us | 새 파서 {row['uncachedUs']:.2f}us "
+            f"(캐시 {row['cachedUs']:.2f}us) | 정규식 {legacy_id} / 새 파서 {new_id}"
+        )
+    print(f"예전 정규식만 통과시킨 링크: {false_accepts}개")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {"options": vars(args), "falseAccepts": false_accepts, "results": rows},
+            f, indent=2, ensure_ascii=False,
+        )
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
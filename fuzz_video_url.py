@@ -0,0 +1,176 @@
+"""
+유튜브 링크 파서(parse_video_url) 퍼즈 검사
+
+1. 알려진 링크 표: 지원하는 모양은 올바른 ID/종류로, 아닌 것은 INVALID_LINK로 끝나는지
+2. 무작위 퍼즈: 올바른 링크를 조금씩 망가뜨리거나 아무 문자열을 만들어 넣었을 때
+   - InvalidLinkException 외의 예외가 절대 나오지 않는지
+   - 통과한 결과의 ID는 항상 11글자 규칙을 지키는지
+   - 표준 링크(VideoRef.url)를 다시 파싱하면 같은 ID가 나오는지
+   - youtube.com / youtu.be가 아닌 호스트는 절대 통과하지 않는지
+
+사용법:
+    python fuzz_video_url.py --iterations 200000 --seed 1
+"""
+import argparse
+import random
+import re
+import string
+import sys
+from urllib.parse import urlsplit
+
+from app.core.exceptions import InvalidLinkException
+from app.services.video_url import parse_video_url
+
+_ID_RE = re.compile(r"[0-9A-Za-z_-]{11}")
+_ID_CHARS = string.ascii_letters + string.digits + "-_"
+
+# (입력, 기대 ID 또는 None=거절, 기대 종류)
+KNOWN_CASES = [
+    ("https://www.youtube.com/watch?v=jNQXAC9IVRw", "jNQXAC9IVRw", "watch"),
+    ("https://youtube.com/watch?v=jNQXAC9IVRw&t=10s", "jNQXAC9IVRw", "watch"),
+    ("https://m.youtube.com/watch?feature=share&v=jNQXAC9IVRw", "jNQXAC9IVRw", "watch"),
+    ("https://music.youtube.com/watch?v=jNQXAC9IVRw&list=RDAMVM", "jNQXAC9IVRw", "watch"),
+    ("www.youtube.com/watch?v=jNQXAC9IVRw", "jNQXAC9IVRw", "watch"),
+    ("  https://www.youtube.com/watch?v=jNQXAC9IVRw  ", "jNQXAC9IVRw", "watch"),
+    ("HTTPS://WWW.YOUTUBE.COM/watch?v=jNQXAC9IVRw", "jNQXAC9IVRw", "watch"),
+    ("https://youtu.be/jNQXAC9IVRw", "jNQXAC9IVRw", "short_link"),
+    ("https://youtu.be/jNQXAC9IVRw?si=abcdef&t=3", "jNQXAC9IVRw", "short_link"),
+    ("youtu.be/jNQXAC9IVRw", "jNQXAC9IVRw", "short_link"),
+    ("https://www.youtube.com/shorts/jNQXAC9IVRw", "jNQXAC9IVRw", "shorts"),
+    ("https://youtube.com/shorts/jNQXAC9IVRw?feature=share", "jNQXAC9IVRw", "shorts"),
+    ("https://m.youtube.com/shorts/jNQXAC9IVRw/", "jNQXAC9IVRw", "shorts"),
+    ("https://www.youtube.com/embed/jNQXAC9IVRw?autoplay=1", "jNQXAC9IVRw", "embed"),
+    ("https://www.youtube-nocookie.com/embed/jNQXAC9IVRw", "jNQXAC9IVRw", "embed"),
+    ("https://www.youtube.com/live/jNQXAC9IVRw", "jNQXAC9IVRw", "live"),
+    ("https://www.youtube.com/watch?v=jNQXAC9IVRw#comments", "jNQXAC9IVRw", "watch"),
+    # 거절해야 하는 것들 (예전 정규식은 아래 중 상당수를 통과시켰음)
+    ("https://example.com/abcdefghijk", None, None),
+    ("https://evil.com/watch?v=jNQXAC9IVRw", None, None),
+    ("https://youtube.com.evil.com/watch?v=jNQXAC9IVRw", None, None),
+    ("https://www.youtube.com/channel/UCabcdefghijk", None, None),
+    ("https://www.youtube.com/watch?v=short", None, None),
+    ("https://www.youtube.com/watch?v=jNQXAC9IVRwXX", None, None),
+    ("https://www.youtube.com/watch?list=PL123", None, None),
+    ("https://www.youtube.com/shorts/", None, None),
+    ("https://youtu.be/", None, None),
+    ("https://youtu.be/jNQXAC9IVRw/extra", None, None),
+    ("ftp://youtu.be/jNQXAC9IVRw", None, None),
+    ("javascript:alert(1)//youtu.be/jNQXAC9IVRw", None, None),
+    ("jNQXAC9IVRw", None, None),
+    ("", None, None),
+    ("https://[::1/watch?v=jNQXAC9IVRw", None, None),
+    ("https://www.youtube.com/watch?v=" + "a" * 5000, None, None),
+]
+
+_MUTATIONS = ("delete", "insert", "replace", "duplicate", "swap_host", "truncate")
+_NOISE = string.printable + "가나다ñ\x00%/?#&=:@[]"
+
+
+def random_id(rng: random.Random) -> str:
+    return "".join(rng.choice(_ID_CHARS) for _ in range(11))
+
+
+def random_valid_url(rng: random.Random) -> str:
+    video_id = random_id(rng)
+    return rng.choice([
+        f"https://www.youtube.com/watch?v={video_id}",
+        f"https://m.youtube.com/watch?v={video_id}&t=1",
+        f"https://youtu.be/{video_id}",
+        f"https://youtube.com/shorts/{video_id}",
+        f"https://www.youtube.com/embed/{video_id}",
+        f"youtu.be/{video_id}?si=x",
+    ])
+
+
+def mutate(rng: random.Random, url: str) -> str:
+    kind = rng.choice(_MUTATIONS)
+    position = rng.randrange(len(url) + 1)
+    if kind == "delete" and url:
+        return url[:position] + url[position + 1:]
+    if kind == "insert":
+        return url[:position] + rng.choice(_NOISE) + url[position:]
+    if kind == "replace" and url:
+        return url[:position] + rng.choice(_NOISE) + url[position + 1:]
+    if kind == "duplicate":
+        return url + url[position:]
+    if kind == "swap_host":
+        return url.replace("youtube.com", rng.choice(["youtube.co", "yotube.com", "example.com", "youtube.com.x"]))
+    return url[:position]
+
+
+def _allowed_host(url: str) -> bool:
+    """통과한 입력의 호스트가 허용 목록에 있는지 (검사용, 파서와 별개로 느슨하게 구현)"""
+    if "://" not in url.strip():
+        url = "https://" + url.strip()
+    host = urlsplit(url).netloc.rsplit("@", 1)[-1].split(":", 1)[0].lower().rstrip(".")
+    return host in {
+        "youtu.be", "youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com",
+        "youtube-nocookie.com", "www.youtube-nocookie.com",
+    }
+
+
+def check_known_cases() -> int:
+    failures = 0
+    for url, expected_id, expected_kind in KNOWN_CASES:
+        try:
+            ref = parse_video_url(url)
+            result = (ref.video_id, ref.kind)
+        except InvalidLinkException:
+            result = (None, None)
+        if result != (expected_id, expected_kind):
+            failures += 1
+            print(f"[실패] {url[:80]!r}: 기대 {(expected_id, expected_kind)}, 결과 {result}")
+    print(f"알려진 링크 {len(KNOWN_CASES)}개 중 실패 {failures}개")
+    return failures
+
+
+def fuzz(iterations: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    accepted = 0
+    for _ in range(iterations):
+        if rng.random() < 0.1:
+            url = "".join(rng.choice(_NOISE) for _ in range(rng.randint(0, 80)))
+        else:
+            url = random_valid_url(rng)
+            for _ in range(rng.randint(0, 3)):
+                url = mutate(rng, url)
+
+        try:
+            ref = parse_video_url(url)
+        except InvalidLinkException:
+            continue
+        except Exception as e:
+            failures += 1
+            print(f"[실패] 예상 밖 예외 {type(e).__name__}: {url!r}")
+            continue
+
+        accepted += 1
+        problems = []
+        if not _ID_RE.fullmatch(ref.video_id):
+            problems.append("ID 형식")
+        if parse_video_url(ref.url).video_id != ref.video_id:
+            problems.append("표준 링크 재파싱")
+        if not _allowed_host(url):
+            problems.append("허용되지 않은 호스트")
+        if problems:
+            failures += 1
+            print(f"[실패] {', '.join(problems)}: {url!r} -> {ref.video_id}")
+
+    print(f"퍼즈 {iterations}회 (통과 {accepted}회) 중 실패 {failures}개")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = check_known_cases() + fuzz(args.iterations, args.seed)
+    print("PASSED" if failures == 0 else "FAILED")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+/v1/video/analyze 동시성 부하 테스트
+
+YouTube/Gemini 호출을 고정 지연 스텁(LLM_BACKEND=stub, TRANSCRIPT_PROVIDER=stub)으로 대체한 뒤,
+요청 1개와 요청 N개를 동시에 보냈을 때의 소요 시간을 비교합니다.
+Gemini 호출이 이벤트 루프를 막지 않는다면 N개도 대략 1개 시간 안에 끝나야 합니다.
+(N이 GEMINI_MAX_CONCURRENCY보다 크면 그만큼 여러 번에 나눠 처리됩니다)
+
+사용법:
+    python load_test.py --concurrency 8 --gemini-latency 2.0
+"""
+import argparse
+import asyncio
+import math
+import os
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "load-test")
+# 결과 캐시가 응답하면 측정이 의미 없으므로 메모리 캐시만 쓰고, 영상 ID도 매번 다르게 보냅니다.
+os.environ.setdefault("RESULT_CACHE_BACKEND", "memory")
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("TRANSCRIPT_PROVIDER", "stub")
+# 한 클라이언트가 요청을 몰아 보내므로 요청 제한은 끔 (서버 처리 능력 자체를 측정)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+# 표현 색인이 Gemini 호출을 대신하면 측정이 달라지므로 끔 (bench_expression_index.py로 따로 측정)
+os.environ.setdefault("EXPRESSION_INDEX_ENABLED", "false")
+# 워커 공용 캐시(자막/Gemini 응답)가 응답하면 측정이 달라지므로 끔 (bench_shared_cache.py로 따로 측정)
+os.environ.setdefault("TRANSCRIPT_CACHE_SHARED", "false")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+import httpx
+
+from app.core.config import settings
+from app.main import app
+
+def _configure_stubs(gemini_latency: float, youtube_latency: float):
+    # 스텁은 호출할 때마다 settings를 읽으므로 import 뒤에 바꿔도 반영됩니다.
+    settings.stub_llm_latency_ms = gemini_latency * 1000
+    settings.stub_transcript_latency_ms = youtube_latency * 1000
+
+
+_request_seq = 0
+
+
+def _next_payload() -> dict:
+    global _request_seq
+    _request_seq += 1
+    video_id = f"load{_request_seq:07d}"
+    return {"videoUrl": f"https://www.youtube.com/watch?v={video_id}", "targetLang": "ko"}
+
+
+async def _fire(client: httpx.AsyncClient, n: int) -> float:
+    payloads = [_next_payload() for _ in range(n)]
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(client.post("/v1/video/analyze", json=p) for p in payloads))
+    elapsed = time.perf_counter() - started
+    failed = [r.status_code for r in responses if r.status_code != 200]
+    if failed:
+        raise SystemExit(f"실패한 요청이 있습니다: {failed}")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=settings.gemini_max_concurrency)
+    parser.add_argument("--gemini-latency", type=float, default=1.0)
+    parser.add_argument("--youtube-latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    _configure_stubs(args.gemini_latency, args.youtube_latency)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        single = await _fire(client, 1)
+        burst = await _fire(client, args.concurrency)
+
+    waves = math.ceil(args.concurrency / settings.gemini_max_concurrency)
+    print(f"요청 1개:  {single:.2f}s")
+    print(f"요청 {args.concurrency}개: {burst:.2f}s (x{burst / single:.2f}, 예상 x{waves})")
+    if burst > single * waves * 1.5:
+        raise SystemExit("동시 요청이 직렬로 처리되고 있습니다 (이벤트 루프 블로킹 의심)")
+    print("PASSED")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -7,8 +7,8 @@ def test_analyze():
     # A short video or one with transcripts enabled.
     # https://www.youtube.com/watch?v=jNQXAC9IVRw (Me at the zoo - very short)
     payload = {
-        "video_url": "https://www.youtube.com/watch?v=jNQXAC9IVRw",
-        "language": "en"
+        "videoUrl": "https://www.youtube.com/watch?v=jNQXAC9IVRw",
+        "targetLang": "ko"
     }
     
     print(f"Sending request to {url} with payload: {payload}")
@@ -21,19 +21,15 @@ def test_analyze():
         print(json.dumps(data, indent=2, ensure_ascii=False))
         
         # Validation
-        assert "video_url" in data
-        assert "script" in data
-        assert isinstance(data["script"], list)
-        if len(data["script"]) > 0:
-            assert "text" in data["script"][0]
-            assert "start" in data["script"][0]
-        
-        assert "words" in data
-        assert isinstance(data["words"], list)
-        if len(data["words"]) > 0:
-            assert "word" in data["words"][0]
-            assert "meaning" in data["words"][0]
-            assert "example" in data["words"][0]
+        # Response shape: AnalyzeResponse (app/models/schemas.py)
+        assert data["videoId"] == "jNQXAC9IVRw"
+        assert "title" in data
+        assert isinstance(data["scriptItems"], list)
+        for item in data["scriptItems"]:
+            assert "id" in item
+            assert "expression" in item
+            assert "meaningKr" in item
+            assert "contextTag" in item
             
         print("Verification PASSED!")
         